@@ -52,9 +52,9 @@ redirect_uris = {
     'salesforce': os.getenv("REDIRECT_URI_SALESFORCE")
 }
 
-# Define token URLs
+# Define token URLs, the Salesforce login server can be a local fake org for the load tests
 token_urls = {
-    'salesforce': 'https://login.salesforce.com/services/oauth2/token',
+    'salesforce': f'{os.getenv("SALESFORCE_LOGIN_URL", "https://login.salesforce.com").rstrip("/")}/services/oauth2/token',
     'altru': 'https://oauth2.sky.blackbaud.com/token'
 }
 
@@ -104,8 +104,8 @@ def generate_report():
     """
     Generates a report of data submitted and returns a ZIP file containing CSV reports.
 
-    This endpoint processes each report listed in `reports_of_sent_data`, converts associated
-    text files to JSON, generates a report from the data, and collects CSV files. Finally, it
+    This endpoint processes each report listed in `reports_of_sent_data`, generates a report from
+    its JSON Lines response log, and collects CSV files. Finally, it
     creates a ZIP file containing all the CSV reports and returns it as an attachment.
 
     Returns:
@@ -114,15 +114,12 @@ def generate_report():
     all_csv_paths = []
 
     for report in reports_of_sent_data:
-        txt_path = ABS_PATH.format(f'logs/{report}.txt')
-        json_path = ABS_PATH.format(f'logs/{report}.json')
+        results_path = ABS_PATH.format(f'logs/{report}.jsonl')
         csv_path = ABS_PATH.format(f'reports/{report}.csv')
         
-        processor = ReportProcessor(txt_path, json_path, csv_path)
+        processor = ReportProcessor(results_path, csv_path)
         
-        processor.convert_to_json()
-        
-        processor.generate_report_send_data(report)
+        processor.generate_report_send_data()
         
         all_csv_paths.append(csv_path)
 
@@ -295,7 +292,7 @@ def get_salesforce_token():
         with open(f'data/{service}_token.txt', 'w') as f:
             f.write(access_token)
         logger.info(access_token)
-        token_url = "https://login.salesforce.com/services/oauth2/token"
+        token_url = token_urls[service]
         token_data = {
             "grant_type": "authorization_code",
             "code": access_token,
@@ -11,9 +11,11 @@ def auth_salesforce():
     client_id = os.getenv("CLIENT_ID_SALESFORCE")
     redirect_uri = os.getenv("REDIRECT_URI_SALESFORCE")
     response_type = os.getenv("RESPONSE_TYPE_SALESFORCE")
+    # Login server, a local fake org (ex: http://127.0.0.1:8765) for the load tests
+    login_url = os.getenv("SALESFORCE_LOGIN_URL", "https://login.salesforce.com").rstrip('/')
 
     # Salesforce authentication URL
-    url = f"https://login.salesforce.com/services/oauth2/authorize?response_type={response_type}&client_id={client_id}&redirect_uri={redirect_uri}"
+    url = f"{login_url}/services/oauth2/authorize?response_type={response_type}&client_id={client_id}&redirect_uri={redirect_uri}"
 
     # Define the payload and headers (both are empty in this case)
     headers = {}
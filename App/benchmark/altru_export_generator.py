@@ -0,0 +1,376 @@
+import argparse
+import csv
+import hashlib
+import logging
+import os
+import random
+import uuid
+from contextlib import ExitStack
+from typing import Callable, Dict, Iterator, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Columns of every report of the Altru export, in the order Altru writes them
+report_columns: Dict[str, List[str]] = {
+    "Veevart Organizations Report test": [
+        'Lookup ID', 'Name', 'Web address', 'Email Addresses\\Email address', 'Email Addresses\\Do not email'],
+    "Veevart Organizations Relationships report test": [
+        'Lookup ID', 'Relationships\\Related Constituent\\Lookup ID', 'Relationships\\Is primary contact',
+        'Relationships\\Reciprocal relationship type', 'QUERYRECID'],
+    "Veevart Organization Phones Report test": [
+        'Lookup ID', 'Phones\\Number', 'QUERYRECID', 'Phones\\Primary phone number', 'Phones\\Do not call'],
+    "Veevart Organization Addresses Report test": [
+        'Lookup ID', 'Addresses\\Address', 'Addresses\\City', 'Addresses\\State', 'Addresses\\ZIP', 'Addresses\\Country',
+        'Addresses\\Primary address', 'Addresses\\Do not mail', 'QUERYRECID'],
+    "Veevart HouseHolds Report test": ['Name', 'QUERYRECID'],
+    "Veevart Contacts Report test": [
+        'Lookup ID', 'Title', 'First name', 'Last/Organization/Group/Household name',
+        'Households Belonging To\\Household Record ID', 'Households Belonging To\\Is primary contact',
+        'Deceased', 'Gives anonymously'],
+    "Veevart Contacts Report Phones test": [
+        'Lookup ID', 'Phones\\Number', 'QUERYRECID', 'Phones\\Primary phone number', 'Phones\\Do not call'],
+    "Veevart Contacts Report Email test": [
+        'Lookup ID', 'Email Addresses\\Email address', 'QUERYRECID', 'Email Addresses\\Primary email address',
+        'Email Addresses\\Do not email'],
+    "Veevart Contacts Report Address test": [
+        'Lookup ID', 'Addresses\\Address', 'Addresses\\City', 'Addresses\\State', 'Addresses\\ZIP', 'Addresses\\Country',
+        'Addresses\\Primary address', 'Addresses\\Do not mail', 'QUERYRECID'],
+    "Veevart Contacts Relationships report test": [
+        'Lookup ID', 'Relationships\\Is primary contact', 'Relationships\\Reciprocal relationship type', 'QUERYRECID'],
+}
+
+# Number of members of a household, drawn uniformly from the list
+household_sizes = [1, 2, 2, 2, 3, 4]
+
+# Share of the contacts that do not belong to a household
+no_household_rate = 0.1
+
+# Organizations generated per contact
+organizations_per_contact = 0.1
+
+# Share of the contacts with a second (not primary) phone, email or address
+second_entry_rate = 0.2
+
+titles = ['Mr.', 'Mrs.', 'Ms.', 'Dr.', '']
+first_names = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David', 'Elizabeth',
+               'Maria', 'Jose', 'Ana', 'Luis', 'Carmen', 'Daniel', 'Laura', 'Carlos', 'Sofia', 'Andres']
+last_names = ['Smith', 'Johnson', 'Williams', 'Brown', 'Jones', 'Garcia', 'Miller', 'Davis', 'Rodriguez', 'Martinez',
+              'Hernandez', 'Lopez', 'Gonzalez', 'Wilson', 'Anderson', 'Thomas', 'Taylor', 'Moore', 'Jackson', 'Martin']
+organization_words = ['Museum', 'Foundation', 'Arts', 'Trust', 'Society', 'Partners', 'Council', 'Group']
+streets = ['Main St', 'Oak Ave', 'Maple Dr', 'Cedar Ln', 'Park Blvd', 'Elm St', 'Pine Rd', 'Lake Shore Dr']
+cities = [('Chicago', 'IL'), ('New York', 'NY'), ('Boston', 'MA'), ('Austin', 'TX'), ('Denver', 'CO'), ('Seattle', 'WA')]
+relationship_types = ['Employee', 'Board Member', 'Volunteer', 'Member', 'Donor']
+contact_relationship_types = ['Spouse', 'Sibling', 'Friend', 'Parent', 'Child']
+
+def contact_lookup_id(number: int) -> str:
+    """
+    Get the Lookup ID of a contact, the external id of the contact in Salesforce.
+
+    Args:
+        number (int): position of the contact in the contacts report.
+
+    Returns:
+        str: The Lookup ID.
+    """
+    return f'8-{number + 1}'
+
+def organization_lookup_id(number: int) -> str:
+    """
+    Get the Lookup ID of an organization, the external id of the organization in Salesforce.
+
+    Args:
+        number (int): position of the organization in the organizations report.
+
+    Returns:
+        str: The Lookup ID.
+    """
+    return f'9-{number + 1}'
+
+def yes_no(value: bool) -> str:
+    """
+    Format a flag the way Altru exports it.
+
+    Args:
+        value (bool): the flag.
+
+    Returns:
+        str: 'Yes' or 'No'.
+    """
+    return 'Yes' if value else 'No'
+
+class AltruExportGenerator:
+    """
+    Generator of a synthetic Altru export with the reports read by the migration. The reports are
+    consistent with each other: the phones, emails, addresses and relationships point to the Lookup
+    IDs of existing contacts and organizations, and the contacts to the QUERYRECIDs of existing
+    households. The rows are written as they are generated, so the size of the export is not
+    limited by memory, and the same seed always generates the same export.
+    """
+    def __init__(self, rows: int, seed: int = 0) -> None:
+        """
+        Initialize the generator.
+
+        Args:
+            rows (int): number of contacts, the rest of the reports are sized after it.
+            seed (int): seed of the generated values.
+
+        Returns:
+            None
+        """
+        self.rows = rows
+        self.seed = seed
+        self.organizations = max(1, int(rows * organizations_per_contact))
+        self.random = random.Random(seed)
+
+    def query_record_id(self, report: str, number: int) -> str:
+        """
+        Get the QUERYRECID of a row, a GUID that only depends on the seed, the report and the row.
+
+        Args:
+            report (str): short name of the report.
+            number (int): position of the row in the report.
+
+        Returns:
+            str: The QUERYRECID.
+        """
+        digest = hashlib.md5(f'{self.seed}-{report}-{number}'.encode()).digest()
+        return str(uuid.UUID(bytes=digest, version=4)).upper()
+
+    def phone(self) -> str:
+        """
+        Get a random phone number.
+
+        Returns:
+            str: The phone number.
+        """
+        return f'({self.random.randint(200, 999)}) {self.random.randint(200, 999)}-{self.random.randint(0, 9999):04d}'
+
+    def address(self) -> List[str]:
+        """
+        Get a random address.
+
+        Returns:
+            List[str]: The street, city, state, ZIP and country.
+        """
+        city, state = self.random.choice(cities)
+        return [f'{self.random.randint(1, 9999)} {self.random.choice(streets)}', city, state,
+                f'{self.random.randint(10000, 99999)}', 'United States']
+
+    def entries(self, owners: int) -> Iterator[Tuple[int, int, bool]]:
+        """
+        Get the entries of a phones, emails or addresses report: a primary entry for every owner,
+        and a second one for some of them.
+
+        Args:
+            owners (int): number of contacts or organizations.
+
+        Returns:
+            Iterator[Tuple[int, int, bool]]: Position of the entry, position of its owner and if it is primary.
+        """
+        counter = 0
+        for owner in range(owners):
+            yield counter, owner, True
+            counter += 1
+            if self.random.random() < second_entry_rate:
+                yield counter, owner, False
+                counter += 1
+
+    def households_and_contacts(self, households: csv.writer, contacts: csv.writer) -> Dict[str, int]:
+        """
+        Write the households and their members, every household has at least one member.
+
+        Args:
+            households (csv.writer): writer of the households report.
+            contacts (csv.writer): writer of the contacts report.
+
+        Returns:
+            Dict[str, int]: Rows written to each report.
+        """
+        household = 0
+        contact = 0
+        while contact < self.rows:
+            last_name = self.random.choice(last_names)
+            if self.random.random() < no_household_rate:
+                members, record_id = 1, ''
+            else:
+                members = min(self.random.choice(household_sizes), self.rows - contact)
+                record_id = self.query_record_id('households', household)
+                households.writerow([f'{last_name} Household', record_id])
+                household += 1
+
+            for member in range(members):
+                contacts.writerow([
+                    contact_lookup_id(contact), self.random.choice(titles), self.random.choice(first_names), last_name,
+                    record_id, yes_no(bool(record_id) and member == 0),
+                    yes_no(self.random.random() < 0.02), yes_no(self.random.random() < 0.05)])
+                contact += 1
+        return {"Veevart HouseHolds Report test": household, "Veevart Contacts Report test": contact}
+
+    def organizations_report(self, writer: csv.writer) -> int:
+        """
+        Write the organizations.
+
+        Args:
+            writer (csv.writer): writer of the organizations report.
+
+        Returns:
+            int: Rows written.
+        """
+        for organization in range(self.organizations):
+            name = f'{self.random.choice(last_names)} {self.random.choice(organization_words)} {organization + 1}'
+            slug = name.lower().replace(' ', '')
+            writer.writerow([organization_lookup_id(organization), name, f'https://www.{slug}.org',
+                             f'info@{slug}.org', yes_no(self.random.random() < 0.1)])
+        return self.organizations
+
+    def organizations_relationships(self, writer: csv.writer) -> int:
+        """
+        Write two relationships of contacts with every organization, the first one is the primary contact.
+
+        Args:
+            writer (csv.writer): writer of the relationships report of the organizations.
+
+        Returns:
+            int: Rows written.
+        """
+        counter = 0
+        for organization in range(self.organizations):
+            for member in range(min(2, self.rows)):
+                writer.writerow([contact_lookup_id(self.random.randrange(self.rows)), organization_lookup_id(organization),
+                                 yes_no(member == 0), self.random.choice(relationship_types),
+                                 self.query_record_id('organization-relationships', counter)])
+                counter += 1
+        return counter
+
+    def phones(self, writer: csv.writer, owners: int, lookup_id: Callable[[int], str], report: str) -> int:
+        """
+        Write the phones of the contacts or the organizations.
+
+        Args:
+            writer (csv.writer): writer of the phones report.
+            owners (int): number of contacts or organizations.
+            lookup_id (Callable[[int], str]): Lookup ID of an owner.
+            report (str): short name of the report, for the QUERYRECIDs.
+
+        Returns:
+            int: Rows written.
+        """
+        counter = 0
+        for counter, owner, primary in self.entries(owners):
+            writer.writerow([lookup_id(owner), self.phone(), self.query_record_id(report, counter), yes_no(primary),
+                             yes_no(self.random.random() < 0.05)])
+            counter += 1
+        return counter
+
+    def addresses(self, writer: csv.writer, owners: int, lookup_id: Callable[[int], str], report: str) -> int:
+        """
+        Write the addresses of the contacts or the organizations.
+
+        Args:
+            writer (csv.writer): writer of the addresses report.
+            owners (int): number of contacts or organizations.
+            lookup_id (Callable[[int], str]): Lookup ID of an owner.
+            report (str): short name of the report, for the QUERYRECIDs.
+
+        Returns:
+            int: Rows written.
+        """
+        counter = 0
+        for counter, owner, primary in self.entries(owners):
+            writer.writerow([lookup_id(owner), *self.address(), yes_no(primary), yes_no(self.random.random() < 0.05),
+                             self.query_record_id(report, counter)])
+            counter += 1
+        return counter
+
+    def emails(self, writer: csv.writer) -> int:
+        """
+        Write the emails of the contacts.
+
+        Args:
+            writer (csv.writer): writer of the emails report.
+
+        Returns:
+            int: Rows written.
+        """
+        counter = 0
+        for counter, owner, primary in self.entries(self.rows):
+            domain = 'example.org' if primary else 'example.com'
+            writer.writerow([contact_lookup_id(owner), f'contact{owner + 1}@{domain}',
+                             self.query_record_id('contacts-emails', counter), yes_no(primary),
+                             yes_no(self.random.random() < 0.05)])
+            counter += 1
+        return counter
+
+    def contacts_relationships(self, writer: csv.writer) -> int:
+        """
+        Write a relationship for every fourth contact.
+
+        Args:
+            writer (csv.writer): writer of the relationships report of the contacts.
+
+        Returns:
+            int: Rows written.
+        """
+        counter = 0
+        for contact in range(0, self.rows, 4):
+            writer.writerow([contact_lookup_id(contact), yes_no(False), self.random.choice(contact_relationship_types),
+                             self.query_record_id('contacts-relationships', counter)])
+            counter += 1
+        return counter
+
+    def generate(self, folder: str) -> Dict[str, int]:
+        """
+        Write every report of the export to a folder, as Altru exports them (semicolon separated,
+        UTF-8 with BOM).
+
+        Args:
+            folder (str): folder of the reports, `<report>.csv` is written for every report.
+
+        Returns:
+            Dict[str, int]: Rows written to each report.
+        """
+        os.makedirs(folder, exist_ok=True)
+        with ExitStack() as stack:
+            writers = {}
+            for report_name, columns in report_columns.items():
+                f = stack.enter_context(open(os.path.join(folder, f'{report_name}.csv'), 'w', newline='', encoding='utf-8-sig'))
+                writers[report_name] = csv.writer(f, delimiter=';')
+                writers[report_name].writerow(columns)
+
+            rows = self.households_and_contacts(writers["Veevart HouseHolds Report test"], writers["Veevart Contacts Report test"])
+            rows["Veevart Organizations Report test"] = self.organizations_report(writers["Veevart Organizations Report test"])
+            rows["Veevart Organizations Relationships report test"] = self.organizations_relationships(
+                writers["Veevart Organizations Relationships report test"])
+            rows["Veevart Organization Phones Report test"] = self.phones(
+                writers["Veevart Organization Phones Report test"], self.organizations, organization_lookup_id, 'organization-phones')
+            rows["Veevart Organization Addresses Report test"] = self.addresses(
+                writers["Veevart Organization Addresses Report test"], self.organizations, organization_lookup_id, 'organization-addresses')
+            rows["Veevart Contacts Report Phones test"] = self.phones(
+                writers["Veevart Contacts Report Phones test"], self.rows, contact_lookup_id, 'contacts-phones')
+            rows["Veevart Contacts Report Email test"] = self.emails(writers["Veevart Contacts Report Email test"])
+            rows["Veevart Contacts Report Address test"] = self.addresses(
+                writers["Veevart Contacts Report Address test"], self.rows, contact_lookup_id, 'contacts-addresses')
+            rows["Veevart Contacts Relationships report test"] = self.contacts_relationships(
+                writers["Veevart Contacts Relationships report test"])
+
+        logger.info(f"Generated {sum(rows.values())} rows for {self.rows} contacts in {folder}")
+        return rows
+
+def main() -> None:
+    """
+    Write a synthetic Altru export from the command line.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description='Generate the reports of a synthetic Altru export.')
+    parser.add_argument('folder', help='folder of the reports')
+    parser.add_argument('--rows', type=int, default=10000, help='number of contacts')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    AltruExportGenerator(args.rows, args.seed).generate(args.folder)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Optional
+
+import psutil
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Search for the 'App' directory in the path and slice the path up to that directory
+split_path = current_dir.split(os.sep)
+app_index = split_path.index("App")
+base_path = os.sep.join(split_path[:app_index + 1])
+
+# Create the ABS_PATH with a placeholder for future formatting
+ABS_PATH = os.path.join(base_path, "{}")
+
+sys.path.insert(1, base_path)
+from benchmark.altru_export_generator import AltruExportGenerator
+from benchmark.fake_salesforce import FakeOrg, FakeSalesforceServer
+
+logger = logging.getLogger(__name__)
+
+# Stages of the migration, each one runs in its own process so its peak memory is measured alone
+stages = ['cleanup', 'mapping', 'send', 'report']
+
+# Folders of the application that the stages do not need, they are not copied to the work folder
+ignored_folders = ['__pycache__', 'data', 'logs', 'reports', 'test', 'views']
+
+# Seconds between the samples of the memory of a stage
+rss_sample_seconds = 0.05
+
+def run_stage(stage: str) -> None:
+    """
+    Run a stage of the migration over the reports of `data`, called in the process of the stage.
+
+    Args:
+        stage (str): name of the stage.
+
+    Raises:
+        RuntimeError: if the migration wrote an error.
+
+    Returns:
+        None
+    """
+    from controllers import process_controller
+    report_names = process_controller.organizations_report_names + process_controller.contacts_report_names
+
+    if stage == 'cleanup':
+        from models.factories.cleanup_strategy_factory import CleanupStrategyFactory
+        os.makedirs(ABS_PATH.format(process_controller.cleaned_folder), exist_ok=True)
+        CleanupStrategyFactory().called_factory(process_controller.organizations_report_names,
+                                                process_controller.contacts_report_names, process_controller.cleaned_folder)
+    elif stage == 'mapping':
+        from models.factories.mapping_strategy_factory import MappingStrategyFactory, accounts_report_names, contacts_report_names
+        MappingStrategyFactory().called_factory(accounts_report_names, contacts_report_names)
+    elif stage == 'send':
+        process_controller.ProcessController(report_names).sent_data()
+        if os.path.exists(process_controller.error_path):
+            with open(process_controller.error_path, 'r') as f:
+                raise RuntimeError(f"The migration failed: {f.read()}")
+    elif stage == 'report':
+        from util.event_report_data import ReportProcessor
+        for results_path in glob.glob(ABS_PATH.format('logs/*_response.jsonl')):
+            report = os.path.splitext(os.path.basename(results_path))[0]
+            ReportProcessor(results_path, ABS_PATH.format(f'reports/{report}.csv')).generate_report_send_data()
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+
+class BenchmarkRunner:
+    """
+    End-to-end benchmark of the migration. A synthetic Altru export is generated in a copy of the
+    application, and the cleanup, the mapping, the upload (to a local fake org) and the report of
+    the sent data run over it one after another, recording the wall time and the peak memory
+    (RSS, with the processes the stage started) of every stage.
+
+    The send stage maps the reports again, as the migration does, so its time includes the mapping.
+    """
+    def __init__(self, rows: int, seed: int = 0, work_dir: Optional[str] = None, env: Optional[Dict[str, str]] = None,
+                 latency: float = 0, records_per_second: float = 0, lock_error_rate: float = 0) -> None:
+        """
+        Initialize the benchmark.
+
+        Args:
+            rows (int): number of contacts of the export.
+            seed (int): seed of the export and of the fake org.
+            work_dir (Optional[str]): folder of the copy of the application, a temporary folder by default.
+            env (Optional[Dict[str, str]]): environment variables of the stages (ex: MIGRATION_STREAMING).
+            latency (float): seconds the fake org waits before answering a request.
+            records_per_second (float): records the fake org processes per second, 0 is unlimited.
+            lock_error_rate (float): probability of a lock error of a record upserted in parallel.
+
+        Returns:
+            None
+        """
+        self.rows = rows
+        self.seed = seed
+        self.work_dir = work_dir
+        self.env = env or {}
+        self.org = FakeOrg(latency=latency, records_per_second=records_per_second, lock_error_rate=lock_error_rate, seed=seed)
+
+    def prepare(self, work_dir: str) -> Dict[str, int]:
+        """
+        Copy the application to the work folder and generate the export in its `data` folder.
+
+        Args:
+            work_dir (str): folder of the copy of the application.
+
+        Returns:
+            Dict[str, int]: Rows of each report of the export.
+        """
+        app_dir = os.path.join(work_dir, 'App')
+        shutil.rmtree(app_dir, ignore_errors=True)
+        shutil.copytree(base_path, app_dir, ignore=shutil.ignore_patterns(*ignored_folders))
+        for folder in ('logs', 'reports'):
+            os.makedirs(os.path.join(app_dir, folder), exist_ok=True)
+        return AltruExportGenerator(self.rows, self.seed).generate(os.path.join(app_dir, 'data'))
+
+    def run_child(self, app_dir: str, stage: str) -> Dict[str, float]:
+        """
+        Run a stage in a new process, sampling the memory of the process and of its children.
+
+        Args:
+            app_dir (str): folder of the copy of the application.
+            stage (str): name of the stage.
+
+        Raises:
+            RuntimeError: if the stage failed.
+
+        Returns:
+            Dict[str, float]: Wall time of the stage and of its process (with the start of the interpreter and
+            the imports) in seconds, and peak RSS of the process in MB.
+        """
+        env = dict(os.environ, **self.env)
+        # The fake org is served over plain HTTP
+        env['MIGRATION_ALLOW_PLAIN_HTTP'] = 'true'
+        start = time.perf_counter()
+        process = subprocess.Popen([sys.executable, '-m', 'benchmark.benchmark', '--stage', stage],
+                                   cwd=app_dir, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        peak_rss = 0
+
+        def sample() -> None:
+            nonlocal peak_rss
+            try:
+                parent = psutil.Process(process.pid)
+                while process.poll() is None:
+                    rss = 0
+                    for child in [parent] + parent.children(recursive=True):
+                        try:
+                            rss += child.memory_info().rss
+                        except psutil.NoSuchProcess:
+                            pass
+                    peak_rss = max(peak_rss, rss)
+                    time.sleep(rss_sample_seconds)
+            except psutil.NoSuchProcess:
+                pass
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        stdout, stderr = process.communicate()
+        process_seconds = time.perf_counter() - start
+        sampler.join()
+        if process.returncode != 0:
+            raise RuntimeError(f"The {stage} stage failed:\n{stderr.decode(errors='replace')[-3000:]}")
+        seconds = json.loads(stdout.decode().strip().splitlines()[-1])['seconds']
+        return {'seconds': round(seconds, 3), 'process_seconds': round(process_seconds, 3),
+                'peak_rss_mb': round(peak_rss / 1024 / 1024, 1)}
+
+    def run(self) -> Dict:
+        """
+        Generate the export and run every stage against a local fake org.
+
+        Returns:
+            Dict: The results: rows of the export, and wall time, rows per second and peak RSS of every stage.
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            work_dir = self.work_dir or temp_dir
+            start = time.perf_counter()
+            reports = self.prepare(work_dir)
+            generation_seconds = time.perf_counter() - start
+            export_rows = sum(reports.values())
+            app_dir = os.path.join(work_dir, 'App')
+
+            results = {'rows': self.rows, 'export_rows': export_rows, 'reports': reports,
+                       'generation_seconds': round(generation_seconds, 3), 'stages': {}}
+            with FakeSalesforceServer(self.org) as server:
+                with open(os.path.join(app_dir, 'data', 'salesforce_instance.txt'), 'w') as f:
+                    f.write(server.instance_url)
+                with open(os.path.join(app_dir, 'data', 'salesforce_token.txt'), 'w') as f:
+                    f.write('benchmark')
+
+                for stage in stages:
+                    stage_results = self.run_child(app_dir, stage)
+                    stage_results['rows_per_second'] = round(export_rows / stage_results['seconds'], 1)
+                    results['stages'][stage] = stage_results
+                    logger.info(f"{self.rows} rows, {stage}: {stage_results}")
+
+            results['seconds'] = round(sum(stage['seconds'] for stage in results['stages'].values()), 3)
+            results['peak_rss_mb'] = max(stage['peak_rss_mb'] for stage in results['stages'].values())
+            results['salesforce'] = dict(self.org.stats)
+        return results
+
+def compare(results: Dict, baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Compare the results of a benchmark with a baseline.
+
+    Args:
+        results (Dict): results of the benchmark, with a run per number of rows.
+        baseline (Dict): results of the baseline.
+        tolerance (float): allowed relative increase of the wall time and the peak RSS (0.25 is 25%).
+
+    Returns:
+        List[str]: The regressions, empty if there are none.
+    """
+    regressions = []
+    for rows, run in results['runs'].items():
+        base_run = baseline.get('runs', {}).get(rows)
+        if base_run is None:
+            continue
+        for stage, stage_results in run['stages'].items():
+            base_stage = base_run['stages'].get(stage)
+            if base_stage is None:
+                continue
+            for metric in ('seconds', 'peak_rss_mb'):
+                if stage_results[metric] > base_stage[metric] * (1 + tolerance):
+                    regressions.append(f"{rows} rows, {stage}: {metric} went from {base_stage[metric]} to {stage_results[metric]}")
+    return regressions
+
+def main() -> None:
+    """
+    Run the benchmark from the command line, write its results and compare them with the baseline.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the migration against a local fake Salesforce org.')
+    parser.add_argument('--stage', choices=stages, help=argparse.SUPPRESS)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000], help='numbers of contacts of the exports (ex: 10000 100000 1000000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--work-dir', help='folder of the copy of the application, kept after the run')
+    parser.add_argument('--env', nargs='*', default=[], help='environment variables of the migration, as KEY=VALUE')
+    parser.add_argument('--latency', type=float, default=0)
+    parser.add_argument('--records-per-second', type=float, default=0)
+    parser.add_argument('--lock-error-rate', type=float, default=0)
+    parser.add_argument('--output', default=ABS_PATH.format('benchmark/results.json'), help='file of the results')
+    parser.add_argument('--baseline', default=ABS_PATH.format('benchmark/baseline.json'), help='file of the baseline')
+    parser.add_argument('--update-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression of the time and the memory')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s', force=True)
+    if args.stage:
+        start = time.perf_counter()
+        run_stage(args.stage)
+        print(json.dumps({'seconds': time.perf_counter() - start}))
+        return
+
+    env = dict(variable.split('=', 1) for variable in args.env)
+    results = {'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+               'seed': args.seed, 'env': env, 'runs': {}}
+    for rows in args.rows:
+        runner = BenchmarkRunner(rows, args.seed, args.work_dir, env, args.latency, args.records_per_second, args.lock_error_rate)
+        results['runs'][str(rows)] = runner.run()
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"Results written to {args.output}")
+
+    if args.update_baseline:
+        shutil.copyfile(args.output, args.baseline)
+        logger.info(f"Baseline written to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            logger.warning(f"Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        logger.info("No regressions against the baseline")
+    else:
+        logger.info(f"There is no baseline in {args.baseline}, use --update-baseline to write it")
+
+if __name__ == '__main__':
+    main()
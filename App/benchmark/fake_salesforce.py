@@ -0,0 +1,993 @@
+import argparse
+import csv
+import io
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from flask import Flask, Response, jsonify, request
+from werkzeug.serving import make_server
+
+logger = logging.getLogger(__name__)
+
+# API version answered in the job information, the requests can use any version
+api_version = '59.0'
+
+# Records of a page of the REST queries
+query_page_records = 2000
+
+# Records of a request of the sObject Collections API
+collections_max_records = 200
+
+# Records of each batch of a Bulk API 2.0 job, counted in the daily Bulk API batches
+bulk2_batch_records = 10000
+
+# Prefix of the ids of the records of each object, the other objects use `custom_id_prefix`
+id_prefixes = {'Account': '001', 'Contact': '003', 'RecordType': '012'}
+custom_id_prefix = 'a00'
+
+# Active record types of the org
+record_types = [
+    ('organization', 'Organization', 'Account'),
+    ('HH_Account', 'Household Account', 'Account'),
+]
+
+soql_pattern = re.compile(
+    r"^\s*SELECT\s+(?P<fields>.+?)\s+FROM\s+(?P<sobject>\w+)(?:\s+WHERE\s+(?P<where>.+?))?"
+    r"(?:\s+ORDER\s+BY\s+(?P<order>.+?))?(?:\s+LIMIT\s+(?P<limit>\d+))?\s*$",
+    re.IGNORECASE | re.DOTALL
+)
+condition_pattern = re.compile(r"^\s*(?P<field>[\w.]+)\s*(?P<operator>!=|=|NOT\s+IN|IN)\s*(?P<value>.+?)\s*$", re.IGNORECASE | re.DOTALL)
+
+class FakeSalesforceError(Exception):
+    """
+    Error answered by the fake org, with the status and the error code Salesforce would answer.
+    """
+    def __init__(self, status: int, error_code: str, message: str) -> None:
+        """
+        Initialize the error.
+
+        Args:
+            status (int): HTTP status of the response.
+            error_code (str): Salesforce error code (ex: MALFORMED_QUERY).
+            message (str): message of the error.
+
+        Returns:
+            None
+        """
+        super().__init__(message)
+        self.status = status
+        self.error_code = error_code
+        self.message = message
+
+def soql_value(text: str) -> Any:
+    """
+    Parse a literal of a SOQL condition.
+
+    Args:
+        text (str): the literal (ex: 'abc', null, true, 10).
+
+    Returns:
+        Any: The value.
+    """
+    text = text.strip()
+    if text.startswith("'") and text.endswith("'") and len(text) >= 2:
+        return text[1:-1].replace("\\'", "'")
+    if text.lower() == 'null':
+        return None
+    if text.lower() in ('true', 'false'):
+        return text.lower() == 'true'
+    return text
+
+def comparable(value: Any) -> Optional[str]:
+    """
+    Normalize a value of a record or a condition so they can be compared, the values of the
+    JSON requests and of the CSV jobs compare equal.
+
+    Args:
+        value (Any): the value.
+
+    Returns:
+        Optional[str]: The value as text, None for empty values.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+def csv_text(value: Any) -> str:
+    """
+    Format a value for the CSV results of the Bulk API 2.0.
+
+    Args:
+        value (Any): the value.
+
+    Returns:
+        str: The value in the CSV.
+    """
+    value = comparable(value)
+    return '' if value is None else value
+
+def write_csv(columns: List[str], rows: List[List[str]]) -> str:
+    """
+    Write CSV results like the Bulk API 2.0, every value quoted.
+
+    Args:
+        columns (List[str]): header of the CSV.
+        rows (List[List[str]]): rows of the CSV.
+
+    Returns:
+        str: The CSV.
+    """
+    output = io.StringIO()
+    writer = csv.writer(output, quoting=csv.QUOTE_ALL, lineterminator='\n')
+    writer.writerow(columns)
+    writer.writerows(rows)
+    return output.getvalue()
+
+class FakeOrg:
+    """
+    In-memory Salesforce org for offline load tests. It keeps the upserted records by external id,
+    answers simple SOQL queries and simulates the processing time of the Bulk API and the lock
+    errors of the records sent in parallel.
+    """
+    def __init__(self, latency: float = 0.0, records_per_second: float = 0.0, lock_error_rate: float = 0.0, seed: int = 0,
+                 daily_api_requests: int = 1000000, daily_bulk_batches: int = 15000) -> None:
+        """
+        Initialize an org with the active record types and without records.
+
+        Args:
+            latency (float): seconds waited before answering each request.
+            records_per_second (float): records processed per second by a Bulk API batch or job, 0 processes them instantly.
+            lock_error_rate (float): share of the records sent in parallel that fail with UNABLE_TO_LOCK_ROW.
+            seed (int): seed of the lock errors, the same seed fails the same records.
+            daily_api_requests (int): API requests allowed per day, the next ones fail with REQUEST_LIMIT_EXCEEDED.
+            daily_bulk_batches (int): Bulk API batches allowed per day.
+
+        Returns:
+            None
+        """
+        self.latency = latency
+        self.daily_api_requests = daily_api_requests
+        self.daily_bulk_batches = daily_bulk_batches
+        self.records_per_second = records_per_second
+        self.lock_error_rate = lock_error_rate
+        self.random = random.Random(seed)
+        self.lock = threading.RLock()
+        self.records: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.external_ids: Dict[Tuple[str, str, str], str] = {}
+        self.references: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self.fields: Dict[str, Dict[str, None]] = {}
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.cursors: Dict[str, List[Dict[str, Any]]] = {}
+        self.stats: Counter = Counter()
+        self.sequence = 0
+
+        for developer_name, name, sobject_type in record_types:
+            self.save('RecordType', {'DeveloperName': developer_name, 'Name': name, 'SobjectType': sobject_type, 'IsActive': True})
+
+    def count(self, name: str) -> None:
+        """
+        Count a request or a record in the statistics of the org.
+
+        Args:
+            name (str): name of the counter.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.stats[name] += 1
+
+    def next_id(self, prefix: str) -> str:
+        """
+        Get a new 18 character id.
+
+        Args:
+            prefix (str): key prefix of the object.
+
+        Returns:
+            str: The id.
+        """
+        with self.lock:
+            self.sequence += 1
+            return f'{prefix}{self.sequence:012d}AAA'
+
+    def processing_seconds(self, records: int) -> float:
+        """
+        Get the time the Bulk API takes to process some records.
+
+        Args:
+            records (int): number of records.
+
+        Returns:
+            float: The seconds.
+        """
+        return records / self.records_per_second if self.records_per_second > 0 else 0.0
+
+    def save(self, sobject: str, fields: Dict[str, Any], record_id: Optional[str] = None) -> str:
+        """
+        Create or update a record.
+
+        Args:
+            sobject (str): object of the record.
+            fields (Dict[str, Any]): fields of the record, without relationships.
+            record_id (Optional[str]): id of the record to update, a new record by default.
+
+        Returns:
+            str: The id of the record.
+        """
+        with self.lock:
+            records = self.records.setdefault(sobject, {})
+            if record_id is None:
+                record_id = self.next_id(id_prefixes.get(sobject, custom_id_prefix))
+                records[record_id] = {'Id': record_id}
+            records[record_id].update(fields)
+            self.fields.setdefault(sobject, {'Id': None}).update(dict.fromkeys(fields))
+            return record_id
+
+    def resolve(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Replace the relationships of a record referenced by external id with the id of the related record
+        (ex: {'Account': {'Ext__c': '1'}} sets AccountId, {'Parent__r': {'Ext__c': '1'}} sets Parent__c).
+        The org has no schema, a relationship whose name has Contact references a contact and the others
+        reference an account, unless only another object has the external id.
+
+        Args:
+            record (Dict[str, Any]): the record.
+
+        Raises:
+            FakeSalesforceError: if a related record does not exist.
+
+        Returns:
+            Dict[str, Any]: The fields of the record.
+        """
+        fields = {}
+        for field, value in record.items():
+            if field == 'attributes':
+                continue
+            if not isinstance(value, dict):
+                fields[field] = value
+                continue
+            (external_field, external_value), = value.items()
+            if comparable(external_value) is None:
+                continue
+            candidates = self.references.get((external_field, comparable(external_value)), {})
+            related_object = 'Contact' if 'contact' in field.lower() else 'Account'
+            related_id = candidates.get(related_object) or next(iter(candidates.values()), None)
+            if related_id is None:
+                raise FakeSalesforceError(400, 'INVALID_FIELD', f"Foreign key external ID: {external_value} not found for field {external_field} in entity {field}")
+            fields[f'{field[:-3]}__c' if field.endswith('__r') else f'{field}Id'] = related_id
+        return fields
+
+    def upsert_record(self, sobject: str, external_id: str, record: Dict[str, Any], parallel: bool) -> Dict[str, Any]:
+        """
+        Upsert a record by external id.
+
+        Args:
+            sobject (str): object of the record.
+            external_id (str): external id field of the object.
+            record (Dict[str, Any]): the record.
+            parallel (bool): True if the record is processed in parallel with others, so it can fail with a lock error.
+
+        Returns:
+            Dict[str, Any]: The result of the record, like the results of the Bulk API.
+        """
+        with self.lock:
+            if parallel and self.lock_error_rate > 0 and self.random.random() < self.lock_error_rate:
+                self.stats['lock_errors'] += 1
+                message = 'unable to obtain exclusive access to this record or 1 records'
+                return {'success': False, 'created': False, 'id': None, 'errors': [{'statusCode': 'UNABLE_TO_LOCK_ROW', 'message': message, 'fields': []}]}
+
+            key_value = comparable(record.get(external_id))
+            if key_value is None:
+                return {'success': False, 'created': False, 'id': None,
+                        'errors': [{'statusCode': 'MISSING_ARGUMENT', 'message': f'{external_id} not specified', 'fields': []}]}
+            try:
+                fields = self.resolve(record)
+            except FakeSalesforceError as e:
+                return {'success': False, 'created': False, 'id': None, 'errors': [{'statusCode': e.error_code, 'message': e.message, 'fields': []}]}
+
+            key = (sobject, external_id, key_value)
+            record_id = self.external_ids.get(key)
+            created = record_id is None
+            self.external_ids[key] = self.save(sobject, fields, record_id)
+            self.references.setdefault((external_id, key_value), {})[sobject] = self.external_ids[key]
+            self.stats['records'] += 1
+            return {'success': True, 'created': created, 'id': self.external_ids[key], 'errors': []}
+
+    def upsert(self, sobject: str, external_id: str, records: List[Dict[str, Any]], parallel: bool) -> List[Dict[str, Any]]:
+        """
+        Upsert some records by external id.
+
+        Args:
+            sobject (str): object of the records.
+            external_id (str): external id field of the object.
+            records (List[Dict[str, Any]]): the records.
+            parallel (bool): True if the records are processed in parallel with others.
+
+        Returns:
+            List[Dict[str, Any]]: The result of each record.
+        """
+        return [self.upsert_record(sobject, external_id, record, parallel) for record in records]
+
+    def matches(self, record: Dict[str, Any], conditions: List[Tuple[str, str, Any]]) -> bool:
+        """
+        Check if a record meets the conditions of a query.
+
+        Args:
+            record (Dict[str, Any]): the record.
+            conditions (List[Tuple[str, str, Any]]): field, operator and comparable value of each condition,
+                a set of values for IN and NOT IN.
+
+        Returns:
+            bool: True if the record meets every condition.
+        """
+        for field, operator, value in conditions:
+            record_value = comparable(record.get(field))
+            if operator == '=' and record_value != value:
+                return False
+            if operator == '!=' and record_value == value:
+                return False
+            if operator == 'IN' and record_value not in value:
+                return False
+            if operator == 'NOT IN' and record_value in value:
+                return False
+        return True
+
+    def query(self, soql: str, version: str = f'v{api_version}') -> Tuple[List[str], List[Dict[str, Any]]]:
+        """
+        Run a SOQL query. Only conditions joined with AND are supported, without relationship fields.
+
+        Args:
+            soql (str): the query.
+            version (str): API version of the urls of the records.
+
+        Raises:
+            FakeSalesforceError: if the query is not supported.
+
+        Returns:
+            Tuple[List[str], List[Dict[str, Any]]]: The selected fields and the records, with their attributes.
+        """
+        match = soql_pattern.match(soql)
+        if match is None or re.search(r'\sOR\s', match.group('where') or '', re.IGNORECASE):
+            raise FakeSalesforceError(400, 'MALFORMED_QUERY', f'The fake org does not support the query: {soql}')
+
+        conditions = []
+        for condition in re.split(r'\s+AND\s+', match.group('where') or '', flags=re.IGNORECASE):
+            if not condition.strip():
+                continue
+            parts = condition_pattern.match(condition)
+            if parts is None:
+                raise FakeSalesforceError(400, 'MALFORMED_QUERY', f'The fake org does not support the condition: {condition}')
+            operator = ' '.join(parts.group('operator').upper().split())
+            value = parts.group('value')
+            if operator in ('IN', 'NOT IN'):
+                value = {comparable(soql_value(item)) for item in value.strip().lstrip('(').rstrip(')').split(',') if item.strip()}
+            else:
+                value = comparable(soql_value(value))
+            conditions.append((parts.group('field'), operator, value))
+
+        sobject = match.group('sobject')
+        with self.lock:
+            records = self.records.get(sobject, {})
+            ids = next((value for field, operator, value in conditions if field == 'Id' and operator in ('=', 'IN')), None)
+            if ids is not None:
+                # The records of an Id condition are looked up instead of scanning the object
+                ids = ids if isinstance(ids, set) else {ids}
+                candidates = [records[record_id] for record_id in ids if record_id in records]
+                candidates.sort(key=lambda record: record['Id'])
+            else:
+                candidates = records.values()
+            rows = [dict(record) for record in candidates if self.matches(record, conditions)]
+
+        for order in reversed((match.group('order') or '').split(',')):
+            if order.strip():
+                field, *direction = order.split()
+                rows.sort(key=lambda row: comparable(row.get(field)) or '', reverse=bool(direction) and direction[0].upper() == 'DESC')
+        if match.group('limit'):
+            rows = rows[:int(match.group('limit'))]
+
+        fields = [field.strip() for field in match.group('fields').split(',')]
+        if re.fullmatch(r'COUNT\(\s*\w*\s*\)', fields[0], re.IGNORECASE):
+            return ['expr0'], [{'attributes': {'type': 'AggregateResult'}, 'expr0': len(rows)}]
+        return fields, [
+            {'attributes': {'type': sobject, 'url': f"/services/data/{version}/sobjects/{sobject}/{row['Id']}"},
+             **{field: row.get(field) for field in fields}}
+            for row in rows
+        ]
+
+    def query_page(self, soql: str, version: str) -> Dict[str, Any]:
+        """
+        Run a SOQL query and get its first page, like the REST API.
+
+        Args:
+            soql (str): the query.
+            version (str): API version of the request (ex: v59.0).
+
+        Returns:
+            Dict[str, Any]: The first page of the results.
+        """
+        _, rows = self.query(soql, version)
+        with self.lock:
+            cursor = self.next_id('01g')
+            self.cursors[cursor] = rows
+        self.count('queries')
+        return self.cursor_page(cursor, 0, version)
+
+    def cursor_page(self, cursor: str, offset: int, version: str) -> Dict[str, Any]:
+        """
+        Get a page of the results of a query.
+
+        Args:
+            cursor (str): id of the results of the query.
+            offset (int): position of the first record of the page.
+            version (str): API version of the request.
+
+        Raises:
+            FakeSalesforceError: if the query does not exist.
+
+        Returns:
+            Dict[str, Any]: The page, with the url of the next page when the results are not done.
+        """
+        with self.lock:
+            rows = self.cursors.get(cursor)
+        if rows is None:
+            raise FakeSalesforceError(400, 'INVALID_QUERY_LOCATOR', 'invalid query locator')
+        end = offset + query_page_records
+        page = {'totalSize': len(rows), 'done': end >= len(rows), 'records': rows[offset:end]}
+        if end < len(rows):
+            page['nextRecordsUrl'] = f'/services/data/{version}/query/{cursor}-{end}'
+        else:
+            with self.lock:
+                self.cursors.pop(cursor, None)
+        return page
+
+    def limits(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get the daily allocations of the org and what is left of them, like the /limits resource.
+
+        Returns:
+            Dict[str, Dict[str, int]]: The maximum and the remaining of each allocation.
+        """
+        with self.lock:
+            return {
+                'DailyApiRequests': {'Max': self.daily_api_requests, 'Remaining': max(0, self.daily_api_requests - self.stats['api_requests'])},
+                'DailyBulkApiBatches': {'Max': self.daily_bulk_batches, 'Remaining': max(0, self.daily_bulk_batches - self.stats['bulk_batches'])},
+            }
+
+    def describe(self, sobject: str) -> Dict[str, Any]:
+        """
+        Describe an object with the fields of its records.
+
+        Args:
+            sobject (str): the object.
+
+        Returns:
+            Dict[str, Any]: The describe.
+        """
+        with self.lock:
+            fields = list(self.fields.get(sobject, {'Id': None}))
+        return {
+            'name': sobject,
+            'label': sobject,
+            'custom': sobject.endswith('__c'),
+            'fields': [{'name': field, 'type': 'id' if field == 'Id' else 'string'} for field in fields],
+        }
+
+    def subrequest(self, method: str, url: str) -> Tuple[int, Any]:
+        """
+        Answer a subrequest of a composite batch request, only queries and describes are supported.
+
+        Args:
+            method (str): method of the subrequest.
+            url (str): url of the subrequest (ex: v59.0/query?q=...).
+
+        Returns:
+            Tuple[int, Any]: The status and the body of the result.
+        """
+        parts = urlsplit(url)
+        path = parts.path.strip('/')
+        if path.startswith('services/data/'):
+            path = path[len('services/data/'):]
+        version, _, resource = path.partition('/')
+        try:
+            if method == 'GET' and resource in ('query', 'queryAll'):
+                return 200, self.query_page(parse_qs(parts.query)['q'][0], version)
+            describe = re.fullmatch(r'sobjects/(\w+)/describe', resource)
+            if method == 'GET' and describe:
+                return 200, self.describe(describe.group(1))
+        except FakeSalesforceError as e:
+            return e.status, [{'errorCode': e.error_code, 'message': e.message}]
+        return 404, [{'errorCode': 'NOT_FOUND', 'message': f'The fake org does not support {method} {url}'}]
+
+    def create_bulk_batch(self, job: Dict[str, Any], records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Create a batch of a Bulk API job, its records are processed when it is created and it completes after
+        its processing time. The batches of a serial job are processed one after another.
+
+        Args:
+            job (Dict[str, Any]): the job.
+            records (List[Dict[str, Any]]): records of the batch.
+
+        Returns:
+            Dict[str, Any]: The batch.
+        """
+        if self.stats['bulk_batches'] >= self.daily_bulk_batches:
+            raise FakeSalesforceError(400, 'InvalidBatch', 'Exceeded max number of batches allowed in 24 hour period')
+        parallel = job['concurrencyMode'] != 'Serial'
+        results = self.upsert(job['object'], job['externalIdFieldName'], records, parallel)
+
+        with self.lock:
+            start = time.time() if parallel else max(time.time(), job['busy_until'])
+            batch = {
+                'id': self.next_id('751'),
+                'jobId': job['id'],
+                'results': results,
+                'ready_at': start + self.processing_seconds(len(records)),
+            }
+            job['busy_until'] = batch['ready_at']
+            self.batches[batch['id']] = batch
+        self.count('bulk_batches')
+        return batch
+
+    @staticmethod
+    def batch_info(batch: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the information of a batch of a Bulk API job.
+
+        Args:
+            batch (Dict[str, Any]): the batch.
+
+        Returns:
+            Dict[str, Any]: The information, the state is Completed once the batch was processed.
+        """
+        completed = time.time() >= batch['ready_at']
+        return {
+            'id': batch['id'],
+            'jobId': batch['jobId'],
+            'state': 'Completed' if completed else 'InProgress',
+            'numberRecordsProcessed': len(batch['results']) if completed else 0,
+            'numberRecordsFailed': sum(not result['success'] for result in batch['results']) if completed else 0,
+        }
+
+    def ingest(self, job: Dict[str, Any]) -> None:
+        """
+        Process the CSV uploaded to a Bulk API 2.0 job, the job completes after its processing time.
+        Empty values do not change the fields, columns like Parent__r.Ext__c reference records by external id.
+
+        Args:
+            job (Dict[str, Any]): the job.
+
+        Returns:
+            None
+        """
+        rows = list(csv.DictReader(io.StringIO(job['data'])))
+        records = []
+        for row in rows:
+            record: Dict[str, Any] = {}
+            for column, value in row.items():
+                if value == '':
+                    continue
+                if '.' in column:
+                    relationship, field = column.split('.', 1)
+                    record[relationship] = {field: value}
+                else:
+                    record[column] = value
+            records.append(record)
+
+        job['rows'] = rows
+        job['results'] = self.upsert(job['object'], job['externalIdFieldName'], records, parallel=True)
+        job['ready_at'] = time.time() + self.processing_seconds(len(rows))
+        self.count('bulk2_jobs')
+        with self.lock:
+            self.stats['bulk_batches'] += math.ceil(len(rows) / bulk2_batch_records)
+
+    @staticmethod
+    def ingest_info(job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the information of a Bulk API 2.0 job.
+
+        Args:
+            job (Dict[str, Any]): the job.
+
+        Returns:
+            Dict[str, Any]: The information, the state is JobComplete once the job was processed.
+        """
+        state = job['state']
+        results = job.get('results', [])
+        if state == 'UploadComplete':
+            state = 'JobComplete' if time.time() >= job['ready_at'] else 'InProgress'
+        completed = state == 'JobComplete'
+        info = {key: value for key, value in job.items() if key not in ('data', 'rows', 'results', 'ready_at', 'busy_until', 'query_rows', 'fields')}
+        info.update({
+            'state': state,
+            'numberRecordsProcessed': len(results) if completed else 0,
+            'numberRecordsFailed': sum(not result['success'] for result in results) if completed else 0,
+        })
+        return info
+
+    def ingest_results(self, job: Dict[str, Any], results_type: str) -> str:
+        """
+        Get the successful, failed or unprocessed records of a Bulk API 2.0 job.
+
+        Args:
+            job (Dict[str, Any]): the job.
+            results_type (str): successfulresults, failedresults or unprocessedrecords, in lowercase.
+
+        Returns:
+            str: The records as CSV, with the columns of the uploaded CSV.
+        """
+        columns = list(job['rows'][0]) if job.get('rows') else []
+        pairs = list(zip(job.get('rows', []), job.get('results', [])))
+        if results_type == 'successfulresults':
+            return write_csv(['sf__Id', 'sf__Created'] + columns, [
+                [result['id'], csv_text(result['created'])] + [row[column] for column in columns]
+                for row, result in pairs if result['success']
+            ])
+        if results_type == 'failedresults':
+            return write_csv(['sf__Id', 'sf__Error'] + columns, [
+                [result['id'] or '', '; '.join(f"{error['statusCode']}:{error['message']}" for error in result['errors'])] + [row[column] for column in columns]
+                for row, result in pairs if not result['success']
+            ])
+        return write_csv(columns, [])
+
+def error_response(status: int, error_code: str, message: str) -> Response:
+    """
+    Get an error response like the ones of the REST API.
+
+    Args:
+        status (int): HTTP status.
+        error_code (str): Salesforce error code.
+        message (str): message of the error.
+
+    Returns:
+        Response: The response.
+    """
+    response = jsonify([{'errorCode': error_code, 'message': message}])
+    response.status_code = status
+    return response
+
+def create_app(org: FakeOrg) -> Flask:
+    """
+    Create the web application of a fake org. It answers the requests simple_salesforce sends for the
+    Bulk API, the Bulk API 2.0, the SOQL queries, the composite batches, the sObject Collections and the
+    OAuth flow of the login of the migration tool.
+
+    Args:
+        org (FakeOrg): the org.
+
+    Returns:
+        Flask: The application.
+    """
+    app = Flask(__name__)
+
+    def find(items: Dict[str, Dict[str, Any]], item_id: str) -> Dict[str, Any]:
+        item = items.get(item_id)
+        if item is None:
+            raise FakeSalesforceError(404, 'NOT_FOUND', f'{item_id} does not exist')
+        return item
+
+    @app.errorhandler(FakeSalesforceError)
+    def fake_salesforce_error(error: FakeSalesforceError) -> Response:
+        return error_response(error.status, error.error_code, error.message)
+
+    @app.before_request
+    def before_request() -> Optional[Response]:
+        org.count('requests')
+        if org.latency > 0:
+            time.sleep(org.latency)
+        if request.path.startswith('/services/oauth2/'):
+            return None
+        authorization = request.headers.get('Authorization', '')
+        if not authorization.startswith('Bearer ') and not request.headers.get('X-SFDC-Session'):
+            return error_response(401, 'INVALID_SESSION_ID', 'Session expired or invalid')
+        if org.stats['api_requests'] >= org.daily_api_requests:
+            return error_response(403, 'REQUEST_LIMIT_EXCEEDED', 'TotalRequests Limit exceeded.')
+        org.count('api_requests')
+        return None
+
+    @app.after_request
+    def limit_info(response: Response) -> Response:
+        if request.path.startswith('/services/data/'):
+            response.headers['Sforce-Limit-Info'] = f"api-usage={org.stats['api_requests']}/{org.daily_api_requests}"
+        return response
+
+    @app.route('/services/oauth2/token', methods=['POST'])
+    def token() -> Response:
+        return jsonify({
+            'access_token': 'fake-access-token',
+            'refresh_token': 'fake-refresh-token',
+            'instance_url': request.host_url.rstrip('/'),
+            'id': f"{request.host_url}id/00D000000000000AAA/005000000000000AAA",
+            'token_type': 'Bearer',
+            'issued_at': str(int(time.time() * 1000)),
+            'signature': 'fake-signature',
+        })
+
+    @app.route('/services/oauth2/authorize', methods=['GET'])
+    def authorize() -> Response:
+        # The login page of Salesforce is replaced by an automatic redirect to the callback with a code
+        callback = f"{request.args.get('redirect_uri', '/')}?code=fake-code"
+        if 'state' in request.args:
+            callback += f"&state={request.args['state']}"
+        return Response(f'<html><head><meta http-equiv="refresh" content="0; url={callback}"></head>'
+                        f'<body><a href="{callback}">Continue</a></body></html>', mimetype='text/html')
+
+    @app.route('/services/async/<version>/job', methods=['POST'])
+    def create_bulk_job(version: str) -> Response:
+        payload = request.get_json(force=True)
+        if payload.get('operation') != 'upsert':
+            raise FakeSalesforceError(400, 'FeatureNotEnabled', f"The fake org does not support {payload.get('operation')} jobs")
+        job = {
+            'id': org.next_id('750'),
+            'operation': payload['operation'],
+            'object': payload['object'],
+            'externalIdFieldName': payload.get('externalIdFieldName'),
+            # simple_salesforce sends the concurrency mode as 1 (serial) or 0 (parallel)
+            'concurrencyMode': 'Serial' if payload.get('concurrencyMode') in (1, 'Serial') else 'Parallel',
+            'contentType': payload.get('contentType', 'JSON'),
+            'state': 'Open',
+            'apiVersion': float(version),
+            'busy_until': 0.0,
+        }
+        org.jobs[job['id']] = job
+        return jsonify({key: value for key, value in job.items() if key != 'busy_until'})
+
+    @app.route('/services/async/<version>/job/<job_id>', methods=['GET', 'POST'])
+    def bulk_job(version: str, job_id: str) -> Response:
+        job = find(org.jobs, job_id)
+        if request.method == 'POST':
+            job['state'] = request.get_json(force=True).get('state', job['state'])
+        return jsonify({key: value for key, value in job.items() if key != 'busy_until'})
+
+    @app.route('/services/async/<version>/job/<job_id>/batch', methods=['POST'])
+    def create_bulk_batch(version: str, job_id: str) -> Response:
+        job = find(org.jobs, job_id)
+        if job['state'] != 'Open':
+            raise FakeSalesforceError(400, 'InvalidJobState', f"Job {job_id} is {job['state']}")
+        return jsonify(org.batch_info(org.create_bulk_batch(job, request.get_json(force=True))))
+
+    @app.route('/services/async/<version>/job/<job_id>/batch/<batch_id>', methods=['GET'])
+    def bulk_batch(version: str, job_id: str, batch_id: str) -> Response:
+        return jsonify(org.batch_info(find(org.batches, batch_id)))
+
+    @app.route('/services/async/<version>/job/<job_id>/batch/<batch_id>/result', methods=['GET'])
+    def bulk_batch_result(version: str, job_id: str, batch_id: str) -> Response:
+        batch = find(org.batches, batch_id)
+        if org.batch_info(batch)['state'] != 'Completed':
+            raise FakeSalesforceError(400, 'InvalidBatch', f'Batch {batch_id} is not completed')
+        return jsonify(batch['results'])
+
+    @app.route('/services/data/<version>/jobs/ingest', methods=['POST'])
+    def create_ingest_job(version: str) -> Response:
+        payload = request.get_json(force=True)
+        if payload.get('operation') != 'upsert':
+            raise FakeSalesforceError(400, 'FEATURENOTENABLED', f"The fake org does not support {payload.get('operation')} jobs")
+        job = {
+            'id': org.next_id('750'),
+            'operation': 'upsert',
+            'object': payload['object'],
+            'externalIdFieldName': payload.get('externalIdFieldName'),
+            'contentType': 'CSV',
+            'columnDelimiter': payload.get('columnDelimiter', 'COMMA'),
+            'lineEnding': payload.get('lineEnding', 'LF'),
+            'state': 'Open',
+            'apiVersion': float(version.lstrip('v')),
+            'data': '',
+        }
+        org.jobs[job['id']] = job
+        return jsonify(org.ingest_info(job))
+
+    @app.route('/services/data/<version>/jobs/ingest/<job_id>', methods=['GET', 'PATCH', 'DELETE'])
+    def ingest_job(version: str, job_id: str) -> Response:
+        job = find(org.jobs, job_id)
+        if request.method == 'DELETE':
+            org.jobs.pop(job_id, None)
+            return Response(status=204)
+        if request.method == 'PATCH':
+            state = request.get_json(force=True).get('state')
+            if state == 'UploadComplete' and job['state'] == 'Open':
+                org.ingest(job)
+            job['state'] = state
+        return jsonify(org.ingest_info(job))
+
+    @app.route('/services/data/<version>/jobs/ingest/<job_id>/batches', methods=['PUT'])
+    def upload_ingest_data(version: str, job_id: str) -> Response:
+        job = find(org.jobs, job_id)
+        if job['state'] != 'Open':
+            raise FakeSalesforceError(400, 'INVALIDJOBSTATE', f"Job {job_id} is {job['state']}")
+        job['data'] += request.get_data(as_text=True)
+        return Response(status=201)
+
+    @app.route('/services/data/<version>/jobs/ingest/<job_id>/<results_type>', methods=['GET'])
+    def ingest_results(version: str, job_id: str, results_type: str) -> Response:
+        job = find(org.jobs, job_id)
+        if results_type.lower() not in ('successfulresults', 'failedresults', 'unprocessedrecords'):
+            raise FakeSalesforceError(404, 'NOT_FOUND', f'{results_type} does not exist')
+        return Response(org.ingest_results(job, results_type.lower()), mimetype='text/csv')
+
+    @app.route('/services/data/<version>/jobs/query', methods=['POST'])
+    def create_query_job(version: str) -> Response:
+        payload = request.get_json(force=True)
+        fields, rows = org.query(payload['query'], version)
+        job = {
+            'id': org.next_id('750'),
+            'operation': payload.get('operation', 'query'),
+            'object': soql_pattern.match(payload['query']).group('sobject'),
+            'state': 'UploadComplete',
+            'apiVersion': float(version.lstrip('v')),
+            'fields': fields,
+            'query_rows': rows,
+            'ready_at': time.time() + org.processing_seconds(len(rows)),
+        }
+        org.jobs[job['id']] = job
+        org.count('queries')
+        return jsonify(org.ingest_info(job))
+
+    @app.route('/services/data/<version>/jobs/query/<job_id>', methods=['GET'])
+    def query_job(version: str, job_id: str) -> Response:
+        job = find(org.jobs, job_id)
+        info = org.ingest_info(job)
+        info['numberRecordsProcessed'] = len(job['query_rows']) if info['state'] == 'JobComplete' else 0
+        return jsonify(info)
+
+    @app.route('/services/data/<version>/jobs/query/<job_id>/results', methods=['GET'])
+    def query_job_results(version: str, job_id: str) -> Response:
+        job = find(org.jobs, job_id)
+        start = int(request.args.get('locator') or 0)
+        end = start + int(request.args.get('maxRecords') or 50000)
+        rows = job['query_rows'][start:end]
+        body = write_csv(job['fields'], [[csv_text(row.get(field)) for field in job['fields']] for row in rows])
+        headers = {
+            'Sforce-Locator': str(end) if end < len(job['query_rows']) else 'null',
+            'Sforce-NumberOfRecords': str(len(rows)),
+        }
+        return Response(body, mimetype='text/csv', headers=headers)
+
+    @app.route('/services/data/<version>/query', methods=['GET'])
+    @app.route('/services/data/<version>/query/', methods=['GET'])
+    @app.route('/services/data/<version>/queryAll', methods=['GET'])
+    @app.route('/services/data/<version>/queryAll/', methods=['GET'])
+    def query(version: str) -> Response:
+        return jsonify(org.query_page(request.args['q'], version))
+
+    @app.route('/services/data/<version>/query/<locator>', methods=['GET'])
+    @app.route('/services/data/<version>/queryAll/<locator>', methods=['GET'])
+    def query_more(version: str, locator: str) -> Response:
+        cursor, _, offset = locator.rpartition('-')
+        return jsonify(org.cursor_page(cursor, int(offset), version))
+
+    @app.route('/services/data/<version>/limits', methods=['GET'])
+    @app.route('/services/data/<version>/limits/', methods=['GET'])
+    def limits(version: str) -> Response:
+        return jsonify(org.limits())
+
+    @app.route('/services/data/<version>/sobjects/<sobject>/describe', methods=['GET'])
+    def describe(version: str, sobject: str) -> Response:
+        return jsonify(org.describe(sobject))
+
+    @app.route('/services/data/<version>/composite/batch', methods=['POST'])
+    def composite_batch(version: str) -> Response:
+        results = [
+            {'statusCode': status, 'result': body}
+            for status, body in (org.subrequest(subrequest.get('method', 'GET'), subrequest['url'])
+                                 for subrequest in request.get_json(force=True)['batchRequests'])
+        ]
+        org.count('composite')
+        return jsonify({'hasErrors': any(result['statusCode'] >= 400 for result in results), 'results': results})
+
+    @app.route('/services/data/<version>/composite/sobjects/<sobject>/<external_id>', methods=['PATCH'])
+    def collections(version: str, sobject: str, external_id: str) -> Response:
+        records = request.get_json(force=True)['records']
+        if len(records) > collections_max_records:
+            raise FakeSalesforceError(400, 'EXCEEDED_ID_LIMIT', f'record limit reached. cannot submit more than {collections_max_records} records into this call')
+        org.count('collections')
+        return jsonify([
+            {'id': result['id'], 'success': result['success'], 'created': result['created'], 'errors': result['errors']}
+            for result in org.upsert(sobject, external_id, records, parallel=True)
+        ])
+
+    return app
+
+class FakeSalesforceServer:
+    """
+    HTTP server of a fake org, run in a background thread. The migration uses it when the
+    Salesforce instance file has its instance url (ex: http://127.0.0.1:8765).
+    """
+    def __init__(self, org: Optional[FakeOrg] = None, host: str = '127.0.0.1', port: int = 0) -> None:
+        """
+        Initialize the server, bound to its port but not started.
+
+        Args:
+            org (Optional[FakeOrg]): the org, an empty org without latency by default.
+            host (str): host of the server.
+            port (int): port of the server, 0 uses a free port.
+
+        Returns:
+            None
+        """
+        self.org = org if org is not None else FakeOrg()
+        # The requests of the load tests are not logged one by one
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server(host, port, create_app(self.org), threaded=True)
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def instance_url(self) -> str:
+        """
+        Get the url of the fake org, the content of the Salesforce instance file.
+
+        Returns:
+            str: The url.
+        """
+        return f'http://{self.server.host}:{self.server.port}'
+
+    def start(self) -> str:
+        """
+        Start serving the requests.
+
+        Returns:
+            str: The url of the fake org.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, name='fake-salesforce', daemon=True)
+        self.thread.start()
+        return self.instance_url
+
+    def stop(self) -> None:
+        """
+        Stop the server.
+
+        Returns:
+            None
+        """
+        self.server.shutdown()
+        self.server.server_close()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> 'FakeSalesforceServer':
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+def main() -> None:
+    """
+    Serve a fake org until the process is stopped.
+
+    Returns:
+        None
+    """
+    parser = argparse.ArgumentParser(description='Local stand-in of the Salesforce APIs used by the migration.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds waited before answering each request')
+    parser.add_argument('--records-per-second', type=float, default=0.0, help='records processed per second by a Bulk API batch or job, 0 is instant')
+    parser.add_argument('--lock-error-rate', type=float, default=0.0, help='share of the records sent in parallel that fail with UNABLE_TO_LOCK_ROW')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the lock errors')
+    parser.add_argument('--daily-api-requests', type=int, default=1000000, help='API requests allowed per day')
+    parser.add_argument('--daily-bulk-batches', type=int, default=15000, help='Bulk API batches allowed per day')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    org = FakeOrg(args.latency, args.records_per_second, args.lock_error_rate, args.seed, args.daily_api_requests, args.daily_bulk_batches)
+    server = FakeSalesforceServer(org, args.host, args.port)
+    logger.info(f"Fake Salesforce org on {server.instance_url}, write it to data/salesforce_instance.txt to migrate to it")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info(f"Requests served: {dict(org.stats)}")
+
+if __name__ == '__main__':
+    main()
@@ -4,6 +4,7 @@ from typing import List
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.migration.accounts_and_contacts_migration_group import AccountsAndContactsMigrationGroup
 from models.factories.cleanup_strategy_factory import CleanupStrategyFactory
+from models.cache.fingerprint_cache import FingerprintCache
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -18,13 +19,13 @@ ABS_PATH = os.path.join(base_path, "{}")
 finish_path = ABS_PATH.format('data/finish.txt')
 error_path = ABS_PATH.format('data/error.txt')
 
-# Delete the 'finish.txt' file if it exists
-if os.path.exists(finish_path):
-    os.remove(finish_path)
+# The cleanup is applied while the reports are mapped, the cleaned reports are only
+# written (to data/cleaned) when they are needed for auditing
+materialize_cleanup = os.getenv('MIGRATION_MATERIALIZE_CLEANUP', 'false').lower() == 'true'
+cleaned_folder = 'data/cleaned'
 
-# Delete the 'error.txt' file if it exists
-if os.path.exists(error_path):
-    os.remove(error_path)
+# Reports that did not change since the last run are not cleaned or mapped again (data/cache)
+use_cache = os.getenv('MIGRATION_CACHE', 'true').lower() == 'true'
 
 organizations_report_names = [
     "Veevart Organizations Report test",
@@ -70,10 +71,14 @@ class ProcessController:
         """
         try:
             # Process the data
-            accounts_and_contacts_factory = CleanupStrategyFactory()
-            accounts_and_contacts_factory.called_factory(organizations_report_names, contacts_report_names)
-            contacts_accounts = AccountsAndContactsMigrationGroup(self.report_names)
+            cache = FingerprintCache() if use_cache else None
+            if materialize_cleanup:
+                os.makedirs(ABS_PATH.format(cleaned_folder), exist_ok=True)
+                accounts_and_contacts_factory = CleanupStrategyFactory(cache=cache)
+                accounts_and_contacts_factory.called_factory(organizations_report_names, contacts_report_names, cleaned_folder)
+            contacts_accounts = AccountsAndContactsMigrationGroup(self.report_names, cache=cache)
             contacts_accounts.process_data()
+            contacts_accounts.strategy.pool.log_stats()
 
             # Write 'finish' to the 'finish.txt' file
             with open(finish_path, 'w') as f:
@@ -83,6 +88,17 @@ class ProcessController:
             with open(error_path, 'w') as f:
                 f.write(str(e))
 
-report_names = organizations_report_names + contacts_report_names
-controller = ProcessController(report_names)
-controller.sent_data()
\ No newline at end of file
+# The migration only runs when the file is executed, the worker processes of the
+# parallel mapping import this module without running it again
+if __name__ == '__main__':
+    # Delete the 'finish.txt' file if it exists
+    if os.path.exists(finish_path):
+        os.remove(finish_path)
+
+    # Delete the 'error.txt' file if it exists
+    if os.path.exists(error_path):
+        os.remove(error_path)
+
+    report_names = organizations_report_names + contacts_report_names
+    controller = ProcessController(report_names)
+    controller.sent_data()
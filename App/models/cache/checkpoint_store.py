@@ -0,0 +1,275 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Search for the 'App' directory in the path and slice the path up to that directory
+split_path = current_dir.split(os.sep)
+app_index = split_path.index("App")
+base_path = os.sep.join(split_path[:app_index + 1])
+
+# Create the ABS_PATH with a placeholder for future formatting
+ABS_PATH = os.path.join(base_path, "{}")
+
+logger = logging.getLogger(__name__)
+
+# The progress of the loads is written to data/checkpoint/checkpoint.jsonl
+checkpoint_enabled = os.getenv('MIGRATION_CHECKPOINT', 'true').lower() == 'true'
+
+# Resume mode skips the loads and batches confirmed by the previous run of the same reports
+resume_mode = os.getenv('MIGRATION_RESUME', 'false').lower() == 'true'
+
+def run_key(*values: str) -> str:
+    """
+    Get the key of a run, the checkpoint of a run can only be resumed by a run with the same key.
+
+    Args:
+        *values (str): values the batches of the run depend on (ex: hash of the reports, batch size).
+
+    Returns:
+        str: The key.
+    """
+    digest = hashlib.sha256()
+    for value in values:
+        digest.update(value.encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+class CheckpointStore:
+    """
+    Durable journal of the progress of a migration. Every line records that a batch of a load was
+    submitted, that a batch was confirmed (its results are final, with the ids of its successful
+    records and the size of the response log once its results are logged) or that a load finished. Each line is flushed to disk before the migration goes on.
+
+    A resumed run reads the journal of the previous run with the same key, and appends to it.
+    """
+    def __init__(self, key: str, resume: bool = False, path: str = ABS_PATH.format('data/checkpoint/checkpoint.jsonl')) -> None:
+        """
+        Initialize the store, starting a new journal unless a run with the same key is resumed.
+
+        Args:
+            key (str): key of the run.
+            resume (bool): continue the journal of the previous run if it has the same key.
+            path (str): path of the journal.
+
+        Returns:
+            None
+        """
+        self.key = key
+        self.path = path
+        self.lock = threading.Lock()
+        self.confirmed: Dict[str, Dict[int, List[str]]] = {}
+        self.log_offsets: Dict[str, int] = {}
+        self.done: Set[str] = set()
+        self.size = 0
+
+        resumed = resume and self.read()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.file = open(path, 'a' if resumed else 'w', encoding='utf-8')
+        if resumed:
+            # Drop the cut last line so the new entries start on a line of their own
+            self.file.truncate(self.size)
+            logger.info(f"Resuming: {len(self.done)} loads finished, "
+                        f"{sum(len(batches) for batches in self.confirmed.values())} batches confirmed")
+        else:
+            self.write({'run': key})
+
+    def read(self) -> bool:
+        """
+        Read the journal of the previous run.
+
+        Returns:
+            bool: True if the journal belongs to a run with the same key.
+        """
+        if not os.path.exists(self.path):
+            logger.info("There is no checkpoint to resume, starting a new run")
+            return False
+
+        with open(self.path, 'rb') as f:
+            lines = iter(f)
+            header_line = next(lines, b'')
+            try:
+                header = json.loads(header_line)
+            except ValueError:
+                header = {}
+            if header.get('run') != self.key:
+                logger.warning("The checkpoint belongs to other reports or settings, starting a new run")
+                return False
+            self.size = len(header_line)
+
+            for line in lines:
+                try:
+                    if not line.endswith(b'\n'):
+                        raise ValueError('cut line')
+                    entry = json.loads(line)
+                except ValueError:
+                    # The last line is cut if the run was killed while writing it
+                    break
+                self.size += len(line)
+                if entry.get('state') == 'confirmed':
+                    self.confirmed.setdefault(entry['load'], {})[entry['batch']] = entry['ids']
+                    if entry.get('log_offset') is not None:
+                        self.log_offsets[entry['load']] = max(self.log_offsets.get(entry['load'], 0), entry['log_offset'])
+                elif entry.get('state') == 'done':
+                    self.done.add(entry['load'])
+        return True
+
+    def write(self, entry: Dict[str, Any]) -> None:
+        """
+        Append an entry to the journal and flush it to disk.
+
+        Args:
+            entry (Dict[str, Any]): the entry.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.file.write(json.dumps(entry) + '\n')
+            self.file.flush()
+            os.fsync(self.file.fileno())
+
+    def submit(self, load: str, batch: int, records: int) -> None:
+        """
+        Record that a batch of a load is being sent.
+
+        Args:
+            load (str): name of the load.
+            batch (int): position of the batch in the load.
+            records (int): number of records of the batch.
+
+        Returns:
+            None
+        """
+        self.write({'load': load, 'batch': batch, 'state': 'submitted', 'records': records})
+
+    def confirm(self, load: str, batch: int, ids: List[str], log_offset: Optional[int] = None) -> None:
+        """
+        Record that the results of a batch of a load are final.
+
+        Args:
+            load (str): name of the load.
+            batch (int): position of the batch in the load.
+            ids (List[str]): ids of the records of the batch upserted successfully.
+            log_offset (Optional[int]): size in bytes of the response log of the load once the results of the batch are logged.
+
+        Returns:
+            None
+        """
+        entry = {'load': load, 'batch': batch, 'state': 'confirmed', 'ids': ids}
+        if log_offset is not None:
+            entry['log_offset'] = log_offset
+        self.write(entry)
+        with self.lock:
+            self.confirmed.setdefault(load, {})[batch] = ids
+            if log_offset is not None:
+                self.log_offsets[load] = max(self.log_offsets.get(load, 0), log_offset)
+
+    def finish(self, load: str) -> None:
+        """
+        Record that every batch of a load was sent.
+
+        Args:
+            load (str): name of the load.
+
+        Returns:
+            None
+        """
+        self.write({'load': load, 'state': 'done'})
+        with self.lock:
+            self.done.add(load)
+
+    def is_confirmed(self, load: str, batch: int) -> bool:
+        """
+        Check if a batch of a load was confirmed.
+
+        Args:
+            load (str): name of the load.
+            batch (int): position of the batch in the load.
+
+        Returns:
+            bool: True if the batch does not need to be sent again.
+        """
+        with self.lock:
+            return batch in self.confirmed.get(load, {})
+
+    def is_started(self, load: str) -> bool:
+        """
+        Check if some batch of a load was confirmed.
+
+        Args:
+            load (str): name of the load.
+
+        Returns:
+            bool: True if some batch of the load does not need to be sent again.
+        """
+        with self.lock:
+            return bool(self.confirmed.get(load))
+
+    def log_offset(self, load: str) -> int:
+        """
+        Get the size of the response log of a load with the results of its confirmed batches.
+
+        Args:
+            load (str): name of the load.
+
+        Returns:
+            int: The size in bytes, the results after it belong to batches that are sent again.
+        """
+        with self.lock:
+            return self.log_offsets.get(load, 0)
+
+    def confirmed_ids(self, load: str, batch: int) -> List[str]:
+        """
+        Get the ids of the successful records of a confirmed batch.
+
+        Args:
+            load (str): name of the load.
+            batch (int): position of the batch in the load.
+
+        Returns:
+            List[str]: The ids.
+        """
+        with self.lock:
+            return list(self.confirmed.get(load, {}).get(batch, []))
+
+    def is_done(self, load: str) -> bool:
+        """
+        Check if every batch of a load was sent.
+
+        Args:
+            load (str): name of the load.
+
+        Returns:
+            bool: True if the load does not need to be sent again.
+        """
+        with self.lock:
+            return load in self.done
+
+    def done_ids(self, load: str) -> List[str]:
+        """
+        Get the ids of the successful records of every batch of a load.
+
+        Args:
+            load (str): name of the load.
+
+        Returns:
+            List[str]: The ids, in the order of the batches.
+        """
+        with self.lock:
+            batches = self.confirmed.get(load, {})
+            return [record_id for batch in sorted(batches) for record_id in batches[batch]]
+
+    def close(self) -> None:
+        """
+        Close the journal.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.file.close()
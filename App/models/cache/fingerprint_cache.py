@@ -0,0 +1,174 @@
+import glob
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Search for the 'App' directory in the path and slice the path up to that directory
+split_path = current_dir.split(os.sep)
+app_index = split_path.index("App")
+base_path = os.sep.join(split_path[:app_index + 1])
+
+# Create the ABS_PATH with a placeholder for future formatting
+ABS_PATH = os.path.join(base_path, "{}")
+
+# Packages whose code changes the cleanup and the mappings, a change in them invalidates the cache
+versioned_packages = ['models/cleanup', 'models/mappings', 'models/factories']
+
+# Size of the chunks read to hash a file
+chunk_size = 1024 * 1024
+
+def file_hash(path: str) -> str:
+    """
+    Get the hash of the content of a file.
+
+    Args:
+        path (str): path of the file.
+
+    Returns:
+        str: The sha256 of the content of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def code_version() -> str:
+    """
+    Get the version of the code of the cleanup and the mappings.
+
+    Returns:
+        str: The sha256 of the source files of `versioned_packages`.
+    """
+    digest = hashlib.sha256()
+    for package in versioned_packages:
+        for path in sorted(glob.glob(ABS_PATH.format(f'{package}/*.py'))):
+            digest.update(os.path.relpath(path, base_path).encode())
+            digest.update(file_hash(path).encode())
+    return digest.hexdigest()
+
+class FingerprintCache:
+    """
+    Cache of the cleanup and the mappings of the reports, keyed by the hash of the content of the
+    reports and the version of the code, so unchanged uploads are not cleaned or mapped again.
+    """
+    def __init__(self, cache_dir: str = ABS_PATH.format('data/cache')) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): folder of the cache.
+
+        Returns:
+            None
+        """
+        self.cache_dir = cache_dir
+        self.mapping_dir = os.path.join(cache_dir, 'mapping')
+        self.cleanup_path = os.path.join(cache_dir, 'cleanup.json')
+        self.code_version = code_version()
+        os.makedirs(self.mapping_dir, exist_ok=True)
+
+    def fingerprint(self, paths: List[str], *extra: str) -> str:
+        """
+        Get the fingerprint of some files for the current version of the code.
+
+        Args:
+            paths (List[str]): paths of the files.
+            *extra (str): other values the result depends on (ex: Salesforce instance).
+
+        Returns:
+            str: The fingerprint.
+        """
+        digest = hashlib.sha256(self.code_version.encode())
+        for value in extra:
+            digest.update(value.encode())
+        for path in paths:
+            digest.update(file_hash(path).encode())
+        return digest.hexdigest()
+
+    def load_mapping(self, name: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Load the mapping of a report if it was stored with the given fingerprint.
+
+        Args:
+            name (str): name of the report.
+            key (str): fingerprint of the mapping.
+
+        Returns:
+            Optional[Dict[str, Any]]: The mapping, None if it is not in the cache or the report changed.
+        """
+        path = os.path.join(self.mapping_dir, f'{name}.pickle')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            entry = pickle.load(f)
+        return entry['mapping'] if entry['key'] == key else None
+
+    def store_mapping(self, name: str, key: str, mapping: Dict[str, Any]) -> None:
+        """
+        Store the mapping of a report with the given fingerprint. A report has a single entry, the
+        entry of a previous version of the report is replaced.
+
+        Args:
+            name (str): name of the report.
+            key (str): fingerprint of the mapping.
+            mapping (Dict[str, Any]): the mapping.
+
+        Returns:
+            None
+        """
+        path = os.path.join(self.mapping_dir, f'{name}.pickle')
+        temp_path = f'{path}.tmp'
+        with open(temp_path, 'wb') as f:
+            pickle.dump({'key': key, 'mapping': mapping}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+    def _read_cleanup(self) -> Dict[str, Dict[str, str]]:
+        """
+        Read the fingerprints of the cleaned reports.
+
+        Returns:
+            Dict[str, Dict[str, str]]: {output csv: {'input': hash, 'output': hash, 'code': version}}
+        """
+        if not os.path.exists(self.cleanup_path):
+            return {}
+        with open(self.cleanup_path, 'r') as f:
+            return json.load(f)
+
+    def is_cleaned(self, input_csv: str, output_csv: str) -> bool:
+        """
+        Check if a report was already cleaned up into the output CSV with the current version of the code.
+
+        Args:
+            input_csv (str): path of the report.
+            output_csv (str): path of the cleaned report (can be the report itself).
+
+        Returns:
+            bool: True if the cleanup can be skipped.
+        """
+        entry = self._read_cleanup().get(output_csv)
+        if entry is None or entry['code'] != self.code_version or not os.path.exists(output_csv):
+            return False
+        if file_hash(output_csv) != entry['output']:
+            return False
+        return file_hash(input_csv) in (entry['input'], entry['output'])
+
+    def mark_cleaned(self, output_csv: str, input_hash: str) -> None:
+        """
+        Register a cleaned report.
+
+        Args:
+            output_csv (str): path of the cleaned report.
+            input_hash (str): hash of the report before the cleanup.
+
+        Returns:
+            None
+        """
+        entries = self._read_cleanup()
+        entries[output_csv] = {'input': input_hash, 'output': file_hash(output_csv), 'code': self.code_version}
+        with open(self.cleanup_path, 'w') as f:
+            json.dump(entries, f)
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlencode
+from typing import Any, Dict, List, Optional
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Search for the 'App' directory in the path and slice the path up to that directory
+split_path = current_dir.split(os.sep)
+app_index = split_path.index("App")
+base_path = os.sep.join(split_path[:app_index + 1])
+
+# Create the ABS_PATH with a placeholder for future formatting
+ABS_PATH = os.path.join(base_path, "{}")
+
+logger = logging.getLogger(__name__)
+
+# Seconds the metadata of an org is reused before it is loaded again from Salesforce, 0 always loads it
+metadata_ttl = int(os.getenv('MIGRATION_METADATA_TTL', '86400'))
+
+# Objects described with the record types, the objects loaded by the migration
+described_sobjects = ['Account', 'Contact', 'npsp__Address__c', 'vnfp__Legacy_Data__c', 'npe5__Affiliation__c', 'npe4__Relationship__c']
+
+record_types_query = "SELECT Id, DeveloperName, SobjectType FROM RecordType WHERE IsActive = true ORDER BY SobjectType, DeveloperName"
+
+class MetadataCache:
+    """
+    Cache of the metadata of the Salesforce orgs: the active record types and the describes of the
+    migrated objects. The metadata of an org is loaded in a single composite request, and kept in
+    memory and in a file per org instance for `ttl` seconds.
+    """
+    def __init__(self, cache_dir: str = ABS_PATH.format('data/cache/metadata'), ttl: int = metadata_ttl,
+                 sobjects: Optional[List[str]] = None) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            cache_dir (str): folder of the files of the orgs.
+            ttl (int): seconds the metadata of an org is reused.
+            sobjects (Optional[List[str]]): objects to describe, `described_sobjects` by default.
+
+        Returns:
+            None
+        """
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.sobjects = sobjects if sobjects is not None else described_sobjects
+        self.orgs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def path(self, instance: str) -> str:
+        """
+        Get the file of the metadata of an org.
+
+        Args:
+            instance (str): Salesforce instance of the org.
+
+        Returns:
+            str: The path of the file.
+        """
+        return os.path.join(self.cache_dir, f'{hashlib.sha256(instance.encode()).hexdigest()}.json')
+
+    def is_fresh(self, metadata: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check if some metadata can still be used.
+
+        Args:
+            metadata (Optional[Dict[str, Any]]): metadata of an org.
+
+        Returns:
+            bool: True if the metadata was loaded less than `ttl` seconds ago with the objects of this cache.
+        """
+        return (metadata is not None and time.time() - metadata['loaded_at'] < self.ttl
+                and set(self.sobjects) <= set(metadata['sobjects']))
+
+    def read(self, instance: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the metadata of an org from its file.
+
+        Args:
+            instance (str): Salesforce instance of the org.
+
+        Returns:
+            Optional[Dict[str, Any]]: The metadata, None if the file does not exist or is unreadable.
+        """
+        try:
+            with open(self.path(instance), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(self, instance: str, metadata: Dict[str, Any]) -> None:
+        """
+        Write the metadata of an org to its file.
+
+        Args:
+            instance (str): Salesforce instance of the org.
+            metadata (Dict[str, Any]): metadata of the org.
+
+        Returns:
+            None
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self.path(instance)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f)
+        os.replace(temp_path, path)
+
+    def fetch(self, sf: Any) -> Dict[str, Any]:
+        """
+        Load the metadata of an org from Salesforce with a composite batch request.
+
+        Args:
+            sf (Salesforce): client of the org.
+
+        Raises:
+            ValueError: if the record types could not be queried.
+
+        Returns:
+            Dict[str, Any]: {'loaded_at': time, 'sobjects': described objects, 'record_types': [{'Id', 'DeveloperName', 'SobjectType'}],
+            'describes': {object: describe}}, the objects the org does not have are not in the describes.
+        """
+        version = f'v{sf.sf_version}'
+        batch_requests = [{'method': 'GET', 'url': f"{version}/query?{urlencode({'q': record_types_query})}"}]
+        batch_requests.extend({'method': 'GET', 'url': f'{version}/sobjects/{sobject}/describe'} for sobject in self.sobjects)
+        response = sf.restful('composite/batch', method='POST', json={'batchRequests': batch_requests})
+        query_result, *describe_results = response['results']
+
+        if query_result['statusCode'] != 200:
+            raise ValueError(f"The record types could not be queried: {query_result['result']}")
+        query = query_result['result']
+        records = list(query['records'])
+        while not query['done']:
+            query = sf.query_more(query['nextRecordsUrl'], identifier_is_url=True)
+            records.extend(query['records'])
+
+        describes = {}
+        for sobject, result in zip(self.sobjects, describe_results):
+            if result['statusCode'] == 200:
+                describes[sobject] = result['result']
+            else:
+                logger.warning(f"{sobject} could not be described: {result['result']}")
+
+        record_types = [
+            {'Id': record['Id'], 'DeveloperName': record['DeveloperName'], 'SobjectType': record['SobjectType']}
+            for record in records
+        ]
+        return {'loaded_at': time.time(), 'sobjects': self.sobjects, 'record_types': record_types, 'describes': describes}
+
+    def load(self, sf: Any, instance: str) -> Dict[str, Any]:
+        """
+        Get the metadata of an org, from memory, from its file or from Salesforce in that order.
+
+        Args:
+            sf (Salesforce): client of the org.
+            instance (str): Salesforce instance of the org.
+
+        Returns:
+            Dict[str, Any]: The metadata of the org.
+        """
+        with self.lock:
+            metadata = self.orgs.get(instance)
+            if self.is_fresh(metadata):
+                return metadata
+
+            metadata = self.read(instance)
+            if not self.is_fresh(metadata):
+                metadata = self.fetch(sf)
+                self.write(instance, metadata)
+                logger.info(f"Loaded {len(metadata['record_types'])} record types and {len(metadata['describes'])} describes of {instance}")
+
+            self.orgs[instance] = metadata
+            return metadata
+
+    def record_type_id(self, sf: Any, instance: str, developer_name: str, sobject_type: Optional[str] = None) -> str:
+        """
+        Get the ID of an active record type.
+
+        Args:
+            sf (Salesforce): client of the org.
+            instance (str): Salesforce instance of the org.
+            developer_name (str): developer name of the record type.
+            sobject_type (Optional[str]): object of the record type, any object by default.
+
+        Raises:
+            ValueError: if the org has no such active record type.
+
+        Returns:
+            str: The ID of the record type.
+        """
+        for record_type in self.load(sf, instance)['record_types']:
+            if record_type['DeveloperName'] == developer_name and sobject_type in (None, record_type['SobjectType']):
+                return record_type['Id']
+        raise ValueError(f"There is no active record type {developer_name}" + (f" for {sobject_type}" if sobject_type else ''))
+
+    def describe(self, sf: Any, instance: str, sobject: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the describe of an object.
+
+        Args:
+            sf (Salesforce): client of the org.
+            instance (str): Salesforce instance of the org.
+            sobject (str): name of the object, one of the described objects.
+
+        Returns:
+            Optional[Dict[str, Any]]: The describe, None if the org does not have the object.
+        """
+        return self.load(sf, instance)['describes'].get(sobject)
+
+# Metadata shared by every SalesforceStrategy of the process
+metadata_cache = MetadataCache()
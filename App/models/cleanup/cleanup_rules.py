@@ -0,0 +1,108 @@
+from typing import Callable, Dict, List
+
+class ValueTranslation:
+    """
+    Translation of the values of a column, values that are not in the table get the default value.
+    """
+    def __init__(self, table: Dict[str, str], default: str) -> None:
+        """
+        Initialize the translation.
+
+        Args:
+            table (Dict[str, str]): new value of each known value.
+            default (str): value of the unknown values.
+
+        Returns:
+            None
+        """
+        self.table = table
+        self.default = default
+
+    def __call__(self, value: str) -> str:
+        """
+        Translate a value.
+
+        Args:
+            value (str): value of the cell.
+
+        Returns:
+            str: The translated value.
+        """
+        return self.table.get(value, self.default)
+
+# 'Yes'/'No' of Altru to 'True'/'False'. Values already converted are kept, so a report can be cleaned more than once
+yes_no_to_bool = ValueTranslation({'Yes': 'True', 'True': 'True'}, 'False')
+
+# Cleanup rules of each report: {report: {column: translation}}. Adding a report only needs a new rule
+cleanup_rules: Dict[str, Dict[str, ValueTranslation]] = {
+    "Veevart Organizations Report test": {
+        'Email Addresses\\Do not email': yes_no_to_bool,
+    },
+    "Veevart Organizations Relationships report test": {
+        'Relationships\\Is primary contact': yes_no_to_bool,
+    },
+    "Veevart Organization Phones Report test": {
+        'Phones\\Do not call': yes_no_to_bool,
+        'Phones\\Primary phone number': yes_no_to_bool,
+    },
+    "Veevart Organization Addresses Report test": {
+        'Addresses\\Primary address': yes_no_to_bool,
+        'Addresses\\Do not mail': yes_no_to_bool,
+    },
+    "Veevart Contacts Report test": {
+        'Households Belonging To\\Is primary contact': yes_no_to_bool,
+        'Deceased': yes_no_to_bool,
+        'Gives anonymously': yes_no_to_bool,
+    },
+    "Veevart Contacts Report Phones test": {
+        'Phones\\Do not call': yes_no_to_bool,
+        'Phones\\Primary phone number': yes_no_to_bool,
+    },
+    "Veevart Contacts Report Email test": {
+        'Email Addresses\\Do not email': yes_no_to_bool,
+        'Email Addresses\\Primary email address': yes_no_to_bool,
+    },
+    "Veevart Contacts Report Address test": {
+        'Addresses\\Primary address': yes_no_to_bool,
+        'Addresses\\Do not mail': yes_no_to_bool,
+    },
+    "Veevart Contacts Relationships report test": {
+        'Relationships\\Is primary contact': yes_no_to_bool,
+    },
+}
+
+def column_transforms(report_name: str) -> Dict[str, Callable[[str], str]]:
+    """
+    Get the cleanup transform of each column of a report.
+
+    Args:
+        report_name (str): name of the report.
+
+    Returns:
+        Dict[str, Callable[[str], str]]: The transform of each column, empty if the report has no cleanup.
+    """
+    return dict(cleanup_rules.get(report_name, {}))
+
+def compile_row_cleanup(headers: List[str], rules: Dict[str, ValueTranslation]) -> Callable[[List[str]], List[str]]:
+    """
+    Compile the rules of a report into a single function that cleans up a whole row. The
+    columns are looked up once, so each row only does a table lookup per cleaned cell.
+
+    Args:
+        headers (List[str]): headers of the report.
+        rules (Dict[str, ValueTranslation]): translation of each column.
+
+    Raises:
+        ValueError: if a column of the rules is not in the headers.
+
+    Returns:
+        Callable[[List[str]], List[str]]: function that cleans up a row in place and returns it.
+    """
+    steps = tuple((headers.index(column), translation.table.get, translation.default) for column, translation in rules.items())
+
+    def clean_row(row: List[str]) -> List[str]:
+        for index, translate, default in steps:
+            row[index] = translate(row[index], default)
+        return row
+
+    return clean_row
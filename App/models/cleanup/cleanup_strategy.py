@@ -1,4 +1,11 @@
 from abc import ABC, abstractmethod
+from typing import List
+import csv
+import logging
+import os
+import tempfile
+
+logger = logging.getLogger(__name__)
 
 class CleanupStrategy(ABC):
     """
@@ -11,22 +18,83 @@ class CleanupStrategy(ABC):
         Args:
             input_csv (str): The path to the input CSV file.
             output_csv (str): The path to the output CSV file.
-        
+
         Returns:
             None
         """
         self.input_csv = input_csv
         self.output_csv = output_csv
-    
-    @abstractmethod
-    def cleanup(self) -> None:
+
+    def cleanup(self) -> bool:
         """
-        Abstract method to perform the cleanup operation. Must be implemented by subclasses.
+        Clean up the input CSV row by row into a temporary file, which then replaces the output CSV.
+
+        Only one row is kept in memory, and the output CSV is replaced atomically, so it is never
+        left half written (even when it is the same file as the input CSV).
 
         Args:
             None
 
+        Raises:
+            ValueError: if the input CSV is empty or its delimiter is incorrect.
+            Exception: any error of the cleanup, after it is logged. The output CSV is left untouched.
+
+        Returns:
+            bool: True once the output CSV was written.
+        """
+        temp_path = None
+        try:
+            with open(self.input_csv, 'r', encoding='utf-8-sig', newline='') as f:
+                reader = csv.reader(f, delimiter=';')
+                headers = next(reader, None)
+
+                if not headers:
+                    raise ValueError("The file is empty or the delimiter is incorrect.")
+
+                self.set_columns(headers)
+
+                output_dir = os.path.dirname(os.path.abspath(self.output_csv))
+                with tempfile.NamedTemporaryFile('w', newline='', encoding='utf-8-sig', dir=output_dir,
+                                                 suffix='.tmp', delete=False) as temp_file:
+                    temp_path = temp_file.name
+                    writer = csv.writer(temp_file, delimiter=';')
+                    writer.writerow(headers)
+                    for row in reader:
+                        writer.writerow(self.clean_row(row))
+
+            os.replace(temp_path, self.output_csv)
+            temp_path = None
+            return True
+
+        except Exception:
+            logger.exception(f"Cleanup of {self.input_csv} failed")
+            raise
+        finally:
+            if temp_path is not None and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    @abstractmethod
+    def set_columns(self, headers: List[str]) -> None:
+        """
+        Abstract method to find the columns to clean up in the headers of the CSV. Must be implemented by subclasses.
+
+        Args:
+            headers (List[str]): The headers of the CSV.
+
         Returns:
             None
         """
         pass
+
+    @abstractmethod
+    def clean_row(self, row: List[str]) -> List[str]:
+        """
+        Abstract method to clean up a row of the CSV. Must be implemented by subclasses.
+
+        Args:
+            row (List[str]): The row of the CSV.
+
+        Returns:
+            List[str]: The cleaned row.
+        """
+        pass
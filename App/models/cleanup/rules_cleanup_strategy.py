@@ -0,0 +1,47 @@
+from models.cleanup.cleanup_strategy import CleanupStrategy
+from models.cleanup.cleanup_rules import ValueTranslation, compile_row_cleanup
+from typing import Callable, Dict, List, Optional
+
+class RulesCleanupStrategy(CleanupStrategy):
+    """
+    Concrete implementation of CleanupStrategy that cleans up a report with its rules of `cleanup_rules`.
+    """
+    def __init__(self, input_csv: str, output_csv: str, rules: Dict[str, ValueTranslation]) -> None:
+        """
+        Initialize the strategy with the rules of the report.
+
+        Args:
+            input_csv (str): The path to the input CSV file.
+            output_csv (str): The path to the output CSV file.
+            rules (Dict[str, ValueTranslation]): translation of each column of the report.
+
+        Returns:
+            None
+        """
+        super().__init__(input_csv, output_csv)
+        self.rules = rules
+        self.row_cleanup: Optional[Callable[[List[str]], List[str]]] = None
+
+    def set_columns(self, headers: List[str]) -> None:
+        """
+        Compile the rules of the report for the columns of the CSV.
+
+        Args:
+            headers (List[str]): The headers of the CSV.
+
+        Returns:
+            None
+        """
+        self.row_cleanup = compile_row_cleanup(headers, self.rules)
+
+    def clean_row(self, row: List[str]) -> List[str]:
+        """
+        Clean up a row of the CSV with the compiled rules.
+
+        Args:
+            row (List[str]): The row of the CSV.
+
+        Returns:
+            List[str]: The cleaned row.
+        """
+        return self.row_cleanup(row)
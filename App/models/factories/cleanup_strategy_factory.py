@@ -1,14 +1,15 @@
 
+import logging
 import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.cleanup import cleanup_strategy
-from models.cleanup import organizations_cleanup_strategy
-from models.cleanup import relationship_cleanup_strategy
-from models.cleanup import phone_cleanup_strategy
-from models.cleanup import email_cleanup_strategy
-from models.cleanup import contacts_cleanup_strategy
-from models.cleanup import address_cleanup_strategy
+from models.cleanup.cleanup_rules import cleanup_rules
+from models.cleanup.rules_cleanup_strategy import RulesCleanupStrategy
+from models.cache.fingerprint_cache import FingerprintCache, file_hash
+from typing import Optional, Tuple
 from models.entities import origin_platform
 from entities import object
 
@@ -18,6 +19,11 @@ app_index = split_path.index("App")
 base_path = os.sep.join(split_path[:app_index + 1])
 ABS_PATH = os.path.join(base_path, "{}")
 
+logger = logging.getLogger(__name__)
+
+# Number of processes used to clean up the reports, 1 cleans them one after another
+cleanup_workers = int(os.getenv('MIGRATION_CLEANUP_WORKERS', '1'))
+
 organizations_report_names = [
             "Veevart Organizations Report test",
             "Veevart Organizations Relationships report test",
@@ -33,71 +39,116 @@ contacts_report_names = [
             "Veevart Contacts Relationships report test"
 ]
 
+def cleanup_report(entity_type: object.SalesforceObject, data_origin: origin_platform.OriginPlatform, report_name: str, input_csv: str, output_csv: str) -> Tuple[bool, float]:
+    """
+    Clean up a single report, it is run in the worker processes of the parallel cleanup.
+
+    Args:
+        entity_type (SalesforceObject): principal object of the report.
+        data_origin (OriginPlatform): platform of the report.
+        report_name (str): name of the report.
+        input_csv (str): path of the report.
+        output_csv (str): path of the cleaned report.
+
+    Returns:
+        Tuple[bool, float]: if the report was cleaned up, and the seconds it took.
+    """
+    start = time.perf_counter()
+    cleaned = CleanupStrategyFactory.create_strategy(entity_type, data_origin, report_name, input_csv, output_csv)
+    return cleaned, time.perf_counter() - start
+
 class CleanupStrategyFactory:
     """
     Factory class for creating instances of CleanupStrategy based on the provided entity type,
     data origin, and report name.
     """
+    def __init__(self, workers: int = cleanup_workers, cache: Optional[FingerprintCache] = None) -> None:
+        """
+        Initialize the factory.
+
+        Args:
+            workers (int): number of processes used to clean up the reports, 1 cleans them one after another.
+            cache (Optional[FingerprintCache]): cache used to skip the reports already cleaned up.
+
+        Returns:
+            None
+        """
+        self.workers = workers
+        self.cache = cache
 
     @staticmethod
-    def create_strategy(entity_type: str, data_origin: origin_platform, report_name: str, input_csv: str, output_csv: str) -> cleanup_strategy:
+    def create_strategy(entity_type: str, data_origin: origin_platform, report_name: str, input_csv: str, output_csv: str) -> bool:
         """
         Static method to create and return an appropriate CleanupStrategy instance based on the
-        provided entity type, data origin, and report name.
+        provided entity type, data origin, and report name. The report is cleaned up with its
+        rules of `cleanup_rules`, the result of the cleanup is returned.
         """
-        if entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organizations Report test":
-            strategy = organizations_cleanup_strategy.OrganizationsCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organizations Relationships report test":
-            strategy = relationship_cleanup_strategy.OrganizationsRelationshipCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organization Phones Report test":
-            strategy = phone_cleanup_strategy.OrganizationsPhoneCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organization Addresses Report test":
-            strategy = address_cleanup_strategy.OrganizationsAddressCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Report test":
-            strategy = contacts_cleanup_strategy.ContactsCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Report Phones test":
-            strategy = phone_cleanup_strategy.ContactsPhoneCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Report Email test":
-            strategy = email_cleanup_strategy.ContactsEmailCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
-        elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Report Address test":
-            strategy = address_cleanup_strategy.ContactsAddressCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()            
-        elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Relationships report test":
-            strategy = relationship_cleanup_strategy.ContactsRelationshipsCleanupStrategy(input_csv, output_csv)
-            strategy.cleanup()
+        if data_origin == origin_platform.OriginPlatform.Altru and report_name in cleanup_rules:
+            strategy = RulesCleanupStrategy(input_csv, output_csv, cleanup_rules[report_name])
+            return strategy.cleanup()
         else: 
             raise ValueError(f"Unknown entity type: {entity_type} {data_origin} {report_name}")
 
-    def called_factory(self, organizations_report_names: list, contacts_report_names: list):
+    def called_factory(self, organizations_report_names: list, contacts_report_names: list, output_folder: str = 'data'):
         """
         Method to create strategies for both organizations and contacts based on provided report names.
 
         Args:
             organizations_report_names (list): List of organization report names.
             contacts_report_names (list): List of contact report names.
+            output_folder (str): folder where the cleaned reports are written, by default the reports are cleaned in place.
+
+        The reports are cleaned up in a pool of `workers` processes when there is more than one worker.
         """
-        for report_name in organizations_report_names:
-            self.create_strategy(
-                object.SalesforceObject.Account, 
-                origin_platform.OriginPlatform.Altru, 
+        reports = [(object.SalesforceObject.Account, report_name) for report_name in organizations_report_names]
+        reports += [(object.SalesforceObject.Contact, report_name) for report_name in contacts_report_names]
+        arguments = [
+            (
+                entity_type,
+                origin_platform.OriginPlatform.Altru,
                 report_name,
                 ABS_PATH.format(f'data/{report_name}.csv'),
-                ABS_PATH.format(f'data/{report_name}.csv')
+                ABS_PATH.format(f'{output_folder}/{report_name}.csv')
             )
+            for entity_type, report_name in reports
+        ]
 
-        for report_name in contacts_report_names:
-            self.create_strategy(
-                object.SalesforceObject.Contact, 
-                origin_platform.OriginPlatform.Altru, 
-                report_name,
-                ABS_PATH.format(f'data/{report_name}.csv'),
-                ABS_PATH.format(f'data/{report_name}.csv')
-            )
+        input_hashes = {}
+        if self.cache is not None:
+            pending = []
+            for args in arguments:
+                if self.cache.is_cleaned(args[3], args[4]):
+                    logger.info(f"{args[2]} already cleaned, skipped")
+                    continue
+                input_hashes[args[4]] = file_hash(args[3])
+                pending.append(args)
+            arguments = pending
+
+        if self.workers > 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = {executor.submit(cleanup_report, *args): args for args in arguments}
+                for future in as_completed(futures):
+                    self.report_cleanup(futures[future], *future.result(), input_hashes)
+        else:
+            for args in arguments:
+                self.report_cleanup(args, *cleanup_report(*args), input_hashes)
 
+    def report_cleanup(self, args: Tuple, cleaned: bool, elapsed: float, input_hashes: dict) -> None:
+        """
+        Log the cleanup of a report and register it in the cache.
+
+        Args:
+            args (Tuple): arguments of `cleanup_report` for the report.
+            cleaned (bool): if the report was cleaned up.
+            elapsed (float): seconds taken to clean up the report.
+            input_hashes (dict): hash of each report before the cleanup, by output CSV.
+
+        Returns:
+            None
+        """
+        if not cleaned:
+            logger.warning(f"{args[2]} could not be cleaned")
+            return
+        logger.info(f"{args[2]} cleaned in {elapsed:.2f}s")
+        if self.cache is not None:
+            self.cache.mark_cleaned(args[4], input_hashes[args[4]])
@@ -1,6 +1,9 @@
+import logging
 import os
 import sys
-from typing import List, Dict
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings import organization_mapping_strategy
 from models.mappings import phone_mapping_strategy
@@ -9,6 +12,8 @@ from models.mappings import households_mapping_strategy
 from models.mappings import relationships_mapping_strategy
 from models.mappings import emails_mapping_strategy
 from models.mappings import contacts_mapping_strategy
+from models.mappings.mapping_strategy import FusedMappingStrategy
+from models.cache.fingerprint_cache import FingerprintCache
 from models.entities import origin_platform
 from entities import object
 
@@ -18,6 +23,16 @@ app_index = split_path.index("App")
 base_path = os.sep.join(split_path[:app_index + 1])
 ABS_PATH = os.path.join(base_path, "{}")
 
+logger = logging.getLogger(__name__)
+
+# Number of processes used to map the reports, 1 maps them one after another
+mapping_workers = int(os.getenv('MIGRATION_MAPPING_WORKERS', '1'))
+
+# Reports whose mapping needs the mapping of another report: {report: report it depends on}
+mapping_dependencies = {
+    "Veevart Contacts Report test": "Veevart HouseHolds Report test",
+}
+
 accounts_report_names = [
             "Veevart Organizations Report test",
             "Veevart Organizations Relationships report test",
@@ -32,12 +47,66 @@ contacts_report_names = [
             "Veevart Contacts Report Email test",
             "Veevart Contacts Relationships report test"
 ]
+
+# Strategy and report of each mapping, used to stream the mappings in batches
+streaming_strategies = {
+    'OrganizationMapping': (organization_mapping_strategy.OrganizationMappingStrategy, "Veevart Organizations Report test"),
+    'organizationRelationMapping': (relationships_mapping_strategy.OrganizationAffilationStrategy, "Veevart Organizations Relationships report test"),
+    'organizationPhoneMapping': (phone_mapping_strategy.PhoneStrategy, "Veevart Organization Phones Report test"),
+    'organizationUpdatePhoneMapping': (phone_mapping_strategy.PhoneUpdateStrategy, "Veevart Organization Phones Report test"),
+    'organizationAddressMapping': (address_mapping_strategy.AddressStrategy, "Veevart Organization Addresses Report test"),
+    'HouseholdsMapping': (households_mapping_strategy.HouseholdsMappingStrategy, "Veevart HouseHolds Report test"),
+    'ContactsMapping': (contacts_mapping_strategy.ContactsMappingStrategy, "Veevart Contacts Report test"),
+    'ContactsPhoneMapping': (phone_mapping_strategy.PhoneStrategy, "Veevart Contacts Report Phones test"),
+    'ContactsPhoneUpdateMapping': (phone_mapping_strategy.PhoneUpdateStrategy, "Veevart Contacts Report Phones test"),
+    'ContactsEmailMapping': (emails_mapping_strategy.EmailStrategy, "Veevart Contacts Report Email test"),
+    'ContactsEmailUpdateMapping': (emails_mapping_strategy.EmailUpdateStrategy, "Veevart Contacts Report Email test"),
+    'ContactAddressMapping': (address_mapping_strategy.ContactsAddressStrategy, "Veevart Contacts Report Address test"),
+    'ContactsRelationshipsMappingStrategy': (relationships_mapping_strategy.ContactsRelationshipStrategy, "Veevart Contacts Relationships report test"),
+}
+
+# Mappings created from the same report, they are created in a single read of the report
+fused_mappings = [
+    ('organizationPhoneMapping', 'organizationUpdatePhoneMapping'),
+    ('ContactsPhoneMapping', 'ContactsPhoneUpdateMapping'),
+    ('ContactsEmailMapping', 'ContactsEmailUpdateMapping'),
+]
+
+def map_report(entity_type: object.SalesforceObject, data_origin: origin_platform.OriginPlatform, report_name: str, input_csv: str, households_external_list: List[str]) -> Dict[str, Any]:
+    """
+    Create the mapping of a single report, it is run in the worker processes of the parallel mapping.
+
+    Args:
+        entity_type (SalesforceObject): principal object of the report.
+        data_origin (OriginPlatform): platform of the report.
+        report_name (str): name of the report.
+        input_csv (str): path of the report.
+        households_external_list (List[str]): external ids of the households, needed by the contacts.
+
+    Returns:
+        Dict[str, Any]: The mapping attributes set by the report, the attributes it did not change are left out.
+    """
+    factory = MappingStrategyFactory(workers=1)
+    factory.households_external_list = households_external_list
+    defaults = dict(vars(factory))
+    factory.create_strategy(entity_type, data_origin, report_name, input_csv)
+    return {name: value for name, value in vars(factory).items() if value is not defaults[name]}
+
 class MappingStrategyFactory:
     """
     Factory class for making mappings between Salesforce and Altru reports based on the provided entity type,
     data origin, and report name.
     """
-    def __init__(self):
+    def __init__(self, workers: int = mapping_workers, cache: Optional[FingerprintCache] = None):
+        """
+        Initialize the factory with empty mappings.
+
+        Args:
+            workers (int): number of processes used to map the reports, 1 maps them one after another.
+            cache (Optional[FingerprintCache]): cache used to reload the mappings of unchanged reports.
+        """
+        self.workers = workers
+        self.cache = cache
         self.OrganizationMapping: List[Dict] = []
         self.organizationRelationMapping: List[Dict] = []
         self.organizationPhoneMapping: List[Dict] = []
@@ -53,6 +122,37 @@ class MappingStrategyFactory:
         self.ContactsRelationshipsMappingStrategy: List[Dict] = []
         self.households_external_list: List[Dict] = []
         self.contacts_ids: List[str] = []
+        self.contacts_accounts_ids: Dict[str, str] = {}
+
+    @staticmethod
+    def fused_strategy(input_csv: str, *strategy_classes) -> FusedMappingStrategy:
+        """
+        Create a strategy that makes the mappings of several strategies reading the report once.
+
+        Args:
+            input_csv (str): path of the report.
+            *strategy_classes: classes of the strategies of the report.
+
+        Returns:
+            FusedMappingStrategy: The fused strategy, its mapping is a tuple with the mapping of each strategy.
+        """
+        return FusedMappingStrategy(input_csv, [strategy_class(input_csv) for strategy_class in strategy_classes])
+
+    @staticmethod
+    def fused_group(mapping: str) -> Tuple[str, ...]:
+        """
+        Get the mappings created in the same read of the report as the given mapping.
+
+        Args:
+            mapping (str): name of the mapping attribute.
+
+        Returns:
+            Tuple[str, ...]: The mappings of the group, or only the given mapping if it is not fused.
+        """
+        for group in fused_mappings:
+            if mapping in group:
+                return group
+        return (mapping,)
 
     def create_strategy(self, entity_type: str, data_origin: origin_platform, report_name: str, input_csv: str) -> None:
         """
@@ -64,8 +164,7 @@ class MappingStrategyFactory:
         elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organizations Relationships report test":
             self.organizationRelationMapping = relationships_mapping_strategy.OrganizationAffilationStrategy(input_csv).make_mapping()
         elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organization Phones Report test":
-            self.organizationPhoneMapping = phone_mapping_strategy.PhoneStrategy(input_csv).make_mapping()
-            self.organizationUpdatePhoneMapping = phone_mapping_strategy.PhoneUpdateStrategy(input_csv).make_mapping()
+            self.organizationPhoneMapping, self.organizationUpdatePhoneMapping = self.fused_strategy(input_csv, phone_mapping_strategy.PhoneStrategy, phone_mapping_strategy.PhoneUpdateStrategy).make_mapping()
         elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Organization Addresses Report test":
             self.organizationAddressMapping = address_mapping_strategy.AddressStrategy(input_csv).make_mapping()
         elif entity_type == object.SalesforceObject.Account and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart HouseHolds Report test":
@@ -75,11 +174,9 @@ class MappingStrategyFactory:
             self.ContactsMapping = contacts_mapping_strategy.ContactsMappingStrategy(input_csv).make_mapping(self.households_external_list)
 
         elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Report Phones test":
-            self.ContactsPhoneMapping = phone_mapping_strategy.PhoneStrategy(input_csv).make_mapping()
-            self.ContactsPhoneUpdateMapping = phone_mapping_strategy.PhoneUpdateStrategy(input_csv).make_mapping()
+            self.ContactsPhoneMapping, self.ContactsPhoneUpdateMapping = self.fused_strategy(input_csv, phone_mapping_strategy.PhoneStrategy, phone_mapping_strategy.PhoneUpdateStrategy).make_mapping()
         elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Report Email test":
-            self.ContactsEmailMapping = emails_mapping_strategy.EmailStrategy(input_csv).make_mapping()
-            self.ContactsEmailUpdateMapping = emails_mapping_strategy.EmailUpdateStrategy(input_csv).make_mapping()
+            self.ContactsEmailMapping, self.ContactsEmailUpdateMapping = self.fused_strategy(input_csv, emails_mapping_strategy.EmailStrategy, emails_mapping_strategy.EmailUpdateStrategy).make_mapping()
         elif entity_type == object.SalesforceObject.Contact and data_origin == origin_platform.OriginPlatform.Altru and report_name == "Veevart Contacts Relationships report test":
             self.ContactsRelationshipsMappingStrategy = relationships_mapping_strategy.ContactsRelationshipStrategy(input_csv).make_mapping()
         else: 
@@ -89,6 +186,19 @@ class MappingStrategyFactory:
         """
         Method to create strategies for both organizations and contacts based on provided report names.
         """
+        reports = [(object.SalesforceObject.Account, report_name) for report_name in accounts_report_names]
+        reports += [(object.SalesforceObject.Contact, report_name) for report_name in contacts_report_names]
+        if self.workers > 1:
+            self.parallel_factory(reports)
+            return
+
+        if self.cache is not None:
+            for entity_type, report_name in reports:
+                if not self.load_cached_mapping(report_name):
+                    mapping = map_report(entity_type, origin_platform.OriginPlatform.Altru, report_name, ABS_PATH.format(f'data/{report_name}.csv'), self.households_external_list)
+                    self.store_mapping(report_name, mapping)
+            return
+
         for report_name in accounts_report_names:
             self.create_strategy(
                 object.SalesforceObject.Account, 
@@ -105,3 +215,157 @@ class MappingStrategyFactory:
                 ABS_PATH.format(f'data/{report_name}.csv')
             )
 
+    def parallel_factory(self, reports: List[Tuple[object.SalesforceObject, str]]) -> None:
+        """
+        Method to map the reports in a pool of processes. A report is mapped as soon as the report
+        it depends on (`mapping_dependencies`) is mapped, the rest of reports are mapped at once.
+
+        Args:
+            reports (List[Tuple[SalesforceObject, str]]): principal object and name of each report.
+
+        Returns:
+            None
+        """
+        report_names = {report_name for _, report_name in reports}
+        dependents: Dict[str, List[Tuple[object.SalesforceObject, str]]] = {}
+        futures = {}
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            def submit(entity_type: object.SalesforceObject, report_name: str) -> None:
+                if self.load_cached_mapping(report_name):
+                    for dependent in dependents.pop(report_name, []):
+                        submit(*dependent)
+                    return
+
+                future = executor.submit(
+                    map_report,
+                    entity_type,
+                    origin_platform.OriginPlatform.Altru,
+                    report_name,
+                    ABS_PATH.format(f'data/{report_name}.csv'),
+                    self.households_external_list
+                )
+                futures[future] = (report_name, time.perf_counter())
+
+            for entity_type, report_name in reports:
+                dependency = mapping_dependencies.get(report_name)
+                if dependency in report_names:
+                    dependents.setdefault(dependency, []).append((entity_type, report_name))
+
+            for entity_type, report_name in reports:
+                if mapping_dependencies.get(report_name) not in report_names:
+                    submit(entity_type, report_name)
+
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report_name, start = futures.pop(future)
+                    self.store_mapping(report_name, future.result())
+                    logger.info(f"{report_name} mapped in {time.perf_counter() - start:.2f}s")
+                    for entity_type, dependent in dependents.pop(report_name, []):
+                        submit(entity_type, dependent)
+
+    def mapping_key(self, report_name: str) -> str:
+        """
+        Get the fingerprint of the mapping of a report: the content of the report (and of the report
+        it depends on), the version of the code and the Salesforce instance of the record types.
+
+        Args:
+            report_name (str): name of the report.
+
+        Returns:
+            str: The fingerprint of the mapping.
+        """
+        paths = [ABS_PATH.format(f'data/{report_name}.csv')]
+        dependency = mapping_dependencies.get(report_name)
+        if dependency:
+            paths.append(ABS_PATH.format(f'data/{dependency}.csv'))
+
+        with open(ABS_PATH.format('data/salesforce_instance.txt'), 'r') as f:
+            instance = f.read().strip()
+
+        return self.cache.fingerprint(paths, report_name, instance)
+
+    def load_cached_mapping(self, report_name: str) -> bool:
+        """
+        Load the mapping of a report from the cache.
+
+        Args:
+            report_name (str): name of the report.
+
+        Returns:
+            bool: True if the mapping was in the cache.
+        """
+        if self.cache is None:
+            return False
+
+        mapping = self.cache.load_mapping(report_name, self.mapping_key(report_name))
+        if mapping is None:
+            return False
+
+        vars(self).update(mapping)
+        logger.info(f"{report_name} loaded from cache")
+        return True
+
+    def store_mapping(self, report_name: str, mapping: Dict[str, Any]) -> None:
+        """
+        Set the mapping attributes of a report, and store them in the cache.
+
+        Args:
+            report_name (str): name of the report.
+            mapping (Dict[str, Any]): The mapping attributes set by the report.
+
+        Returns:
+            None
+        """
+        vars(self).update(mapping)
+        if self.cache is not None:
+            self.cache.store_mapping(report_name, self.mapping_key(report_name), mapping)
+
+    def stream_mapping(self, mapping: str, batch_size: int) -> Iterator[List[Dict]]:
+        """
+        Method to create a mapping in batches while its report is read, instead of keeping
+        the whole mapping in memory.
+
+        The households must be streamed before the contacts, and the accounts of the contacts
+        (`contacts_accounts_ids`) must be set before streaming the address of contacts.
+
+        Args:
+            mapping (str): name of the mapping attribute (ex: 'OrganizationMapping').
+            batch_size (int): maximum number of records per batch.
+
+        Returns:
+            Iterator[List[Dict]]: The batches of the mapping.
+        """
+        strategy_class, report_name = streaming_strategies[mapping]
+        strategy = strategy_class(ABS_PATH.format(f'data/{report_name}.csv'))
+        if mapping == 'ContactsMapping':
+            args = (self.households_external_list,)
+        elif mapping == 'ContactAddressMapping':
+            args = (self.contacts_accounts_ids,)
+        else:
+            args = ()
+
+        yield from strategy.iter_batches(batch_size, *args)
+
+        if mapping == 'HouseholdsMapping':
+            self.households_external_list = strategy.houseHolds_external_ids_list
+
+    def stream_fused_mappings(self, group: Tuple[str, ...], batch_size: int) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Method to create the mappings of a fused group in batches, reading their report once.
+
+        Args:
+            group (Tuple[str, ...]): names of the mapping attributes of the group.
+            batch_size (int): maximum number of records per batch.
+
+        Returns:
+            Iterator[Tuple[str, List[Dict]]]: The name of the mapping and a batch of it.
+        """
+        report_name = streaming_strategies[group[0]][1]
+        strategy = self.fused_strategy(
+            ABS_PATH.format(f'data/{report_name}.csv'),
+            *(streaming_strategies[mapping][0] for mapping in group)
+        )
+        for index, batch in strategy.iter_output_batches(batch_size):
+            yield group[index], batch
@@ -1,9 +1,8 @@
-import csv
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings.mapping_strategy import MappingStrategy
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional
 
 class AddressStrategy(MappingStrategy):
     """
@@ -32,38 +31,149 @@ class AddressStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the address of organizations mappings.
         """ 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    organizations_address_info = {
-                        'npsp__MailingStreet__c': row['Addresses\\Address'],
-                        'npsp__MailingCity__c': row['Addresses\\City'],
-                        'npsp__MailingState__c': row['Addresses\\State'],
-                        'npsp__MailingPostalCode__c': row['Addresses\\ZIP'],
-                        'npsp__MailingCountry__c': row['Addresses\\Country'],
-                        'npsp__Default_Address__c': bool(row['Addresses\\Primary address']),
-                        'vnfp__Implementation_External_ID__c': str(counter) + '-' + 'address' + '-' + 'organization' + '-' + row['QUERYRECID'],
-                        'npsp__Household_Account__r': {'Auctifera__Implementation_External_ID__c': lookup_id}
-                    }
-                    self.object_address_list.append(organizations_address_info)
-
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    organizations_address_info = {
-                        'npsp__MailingStreet__c': row['Addresses\\Address'],
-                        'npsp__MailingCity__c': row['Addresses\\City'],
-                        'npsp__MailingState__c': row['Addresses\\State'],
-                        'npsp__MailingPostalCode__c': row['Addresses\\ZIP'],
-                        'npsp__MailingCountry__c': row['Addresses\\Country'],
-                        'npsp__Default_Address__c': bool(row['Addresses\\Primary address']),
-                        'vnfp__Implementation_External_ID__c': str(counter) + '-' + 'address' + '-' + 'organization' + '-' + row['QUERYRECID'],
-                        'npsp__Household_Account__r': {'Auctifera__Implementation_External_ID__c': lookup_id}
-                    }
-                    self.object_address_list.append(organizations_address_info)
- 
-        return self.object_address_list
\ No newline at end of file
+        self.object_address_list.extend(self.map_rows())
+        return self.object_address_list
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the addresses report to an Address.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row.
+        """
+        lookup_id = row['Lookup ID']
+        organizations_address_info = {
+            'npsp__MailingStreet__c': row['Addresses\\Address'],
+            'npsp__MailingCity__c': row['Addresses\\City'],
+            'npsp__MailingState__c': row['Addresses\\State'],
+            'npsp__MailingPostalCode__c': row['Addresses\\ZIP'],
+            'npsp__MailingCountry__c': row['Addresses\\Country'],
+            'npsp__Default_Address__c': bool(row['Addresses\\Primary address']),
+            'vnfp__Implementation_External_ID__c': str(counter) + '-' + 'address' + '-' + 'organization' + '-' + row['QUERYRECID'],
+            'npsp__Household_Account__r': {'Auctifera__Implementation_External_ID__c': lookup_id}
+        }
+        return organizations_address_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole addresses report to Addresses.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the rows.
+        """
+        return self.frame_records(frame, {
+            'npsp__MailingStreet__c': frame['Addresses\\Address'],
+            'npsp__MailingCity__c': frame['Addresses\\City'],
+            'npsp__MailingState__c': frame['Addresses\\State'],
+            'npsp__MailingPostalCode__c': frame['Addresses\\ZIP'],
+            'npsp__MailingCountry__c': frame['Addresses\\Country'],
+            'npsp__Default_Address__c': frame['Addresses\\Primary address'] != '',
+            'vnfp__Implementation_External_ID__c': self.counter_ids(frame, 'address-organization'),
+            'npsp__Household_Account__r': self.external_id_references(frame['Lookup ID'])
+        })
+
+class ContactsAddressStrategy(MappingStrategy):
+    """
+    A class used to represent an address of contacts mapping strategy.
+    """
+    
+    def __init__(self, input_csv: str) -> None:
+        """
+        Initialize the mapping strategy with the input CSV file.
+
+        Args:
+            input_csv (str): Path to the input CSV file.
+        Returns:
+            None
+        """
+        super().__init__(input_csv)
+        self.object_address_list: List[Dict] = []
+        self.contacts_accounts_id: Dict[str, str] = {}
+
+    def make_mapping(self, contacts_accounts_id: Dict[str, str]) -> List[Dict]:
+        """
+        Processes the input CSV file and creates a mapping of address of contacts data.
+        
+        The address of a contact is related to the household account of the contact,
+        rows of contacts without account are skipped.
+
+        Args:
+            contacts_accounts_id (Dict[str, str]): hash table like: {'Auctifera__Implementation_External_ID__c': 'AccountId'}
+
+        Returns:
+            List[Dict]: A list of dictionaries representing the address of contacts mappings.
+        """ 
+        self.object_address_list.extend(self.iter_mapping(contacts_accounts_id))
+        return self.object_address_list
+
+    def iter_mapping(self, contacts_accounts_id: Dict[str, str]) -> Iterator[Dict]:
+        """
+        Lazily map the address of contacts report.
+
+        Args:
+            contacts_accounts_id (Dict[str, str]): hash table like: {'Auctifera__Implementation_External_ID__c': 'AccountId'}
+
+        Returns:
+            Iterator[Dict]: The address of contacts mappings.
+        """
+        self.contacts_accounts_id = contacts_accounts_id
+        return self.map_rows()
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the address of contacts report to an Address.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row, or None if the contact has no account.
+        """
+        account_id = self.contacts_accounts_id.get(row['Lookup ID'])
+        if not account_id:
+            return None
+
+        contacts_address_info = {
+            'npsp__MailingStreet__c': row['Addresses\\Address'],
+            'npsp__MailingCity__c': row['Addresses\\City'],
+            'npsp__MailingState__c': row['Addresses\\State'],
+            'npsp__MailingPostalCode__c': row['Addresses\\ZIP'],
+            'npsp__MailingCountry__c': row['Addresses\\Country'],
+            'npsp__Default_Address__c': bool(row['Addresses\\Primary address']),
+            'vnfp__Implementation_External_ID__c': str(counter) + '-' + 'address' + '-' + 'contact' + '-' + row['QUERYRECID'],
+            'npsp__Household_Account__c': account_id
+        }
+        return contacts_address_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole address of contacts report to Addresses, skipping the contacts without account.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the rows of contacts with account.
+        """
+        account_ids = frame['Lookup ID'].map(self.contacts_accounts_id)
+        with_account = account_ids.notna() & account_ids.astype(bool)
+        frame = frame[with_account]
+        return self.frame_records(frame, {
+            'npsp__MailingStreet__c': frame['Addresses\\Address'],
+            'npsp__MailingCity__c': frame['Addresses\\City'],
+            'npsp__MailingState__c': frame['Addresses\\State'],
+            'npsp__MailingPostalCode__c': frame['Addresses\\ZIP'],
+            'npsp__MailingCountry__c': frame['Addresses\\Country'],
+            'npsp__Default_Address__c': frame['Addresses\\Primary address'] != '',
+            'vnfp__Implementation_External_ID__c': self.counter_ids(frame, 'address-contact'),
+            'npsp__Household_Account__c': account_ids[with_account]
+        })
+
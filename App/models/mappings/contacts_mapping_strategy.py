@@ -1,11 +1,10 @@
-import csv
 import os
 import re
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
-from models.mappings.mapping_strategy import MappingStrategy
+from models.mappings.mapping_strategy import MappingStrategy, paused_gc
 from models.strategies.salesforce_strategy import SalesforceStrategy
-from typing import List, Dict
+from typing import Iterator, List, Dict
 
 class ContactsMappingStrategy(MappingStrategy):
     """
@@ -26,6 +25,7 @@ class ContactsMappingStrategy(MappingStrategy):
         self.contacts_list: List[Dict] = []
         self.contacts_id_list : List[str] = []
         self.contacts_accounts_id : Dict[str, str] = {}
+        self.households_ids : Dict[str, str] = {}
         self.salesforce_strategy = SalesforceStrategy()
     
     def find_households_id(self, HouseHoldslist):
@@ -58,52 +58,101 @@ class ContactsMappingStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the contact mappings.
         """
-        dic = self.find_households_id(HouseHoldslist) 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for row in reader:
-                    account = row.get('Households Belonging To\\Household Record ID', '')
-                    contacts_info = {
-                        'Salutation' : row['Title'],
-                        'FirstName' : row['First name'],
-                        'LastName' : row['Last/Organization/Group/Household name'],
-                        'Auctifera__Implementation_External_ID__c' : row['Lookup ID'],
-                    }
-                    if account and account in dic:
-                        contacts_info['Account'] = {'Auctifera__Implementation_External_ID__c': dic[account]}
-
-                    self.contacts_list.append(contacts_info)
- 
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for row in reader:
-                    account = row.get('Households Belonging To\\Household Record ID', '')
-                    contacts_info = {
-                        'Salutation' : row['Title'],
-                        'FirstName' : row['First name'],
-                        'LastName' : row['Last/Organization/Group/Household name'],
-                        'Auctifera__Implementation_External_ID__c' : row['Lookup ID'],
-                    }
-                    if account and account in dic:
-                        contacts_info['Account'] = {'Auctifera__Implementation_External_ID__c': dic[account]}
-
-                    self.contacts_list.append(contacts_info)
- 
+        self.contacts_list.extend(self.iter_mapping(HouseHoldslist))
         return self.contacts_list
+
+    def iter_mapping(self, HouseHoldslist: List[str]) -> Iterator[Dict]:
+        """
+        Lazily map the contacts report, linking each contact to its household.
+
+        Args:
+            HouseHoldslist (List[str]): external ids of the households.
+
+        Returns:
+            Iterator[Dict]: The contact mappings.
+        """
+        self.households_ids = self.find_households_id(HouseHoldslist)
+        return self.map_rows()
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Dict:
+        """
+        Map a row of the contacts report to a Contact, linked to its household when it exists.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Dict: The contact mapping.
+        """
+        account = row.get('Households Belonging To\\Household Record ID', '')
+        contacts_info = {
+            'Salutation' : row['Title'],
+            'FirstName' : row['First name'],
+            'LastName' : row['Last/Organization/Group/Household name'],
+            'Auctifera__Implementation_External_ID__c' : row['Lookup ID'],
+        }
+        if account and account in self.households_ids:
+            contacts_info['Account'] = {'Auctifera__Implementation_External_ID__c': self.households_ids[account]}
+
+        return contacts_info
     
-    def process_contacts_ids(self, results) -> Dict[str, str]:
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
         """
-        Processes the results of the contacts uploded and get id of accounts associates with contact            
-            Returns:
-                List[Dict]: A list of dictionaries representing the contact mappings.
+        Map the whole contacts report to Contacts, linked to their household when it exists.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The contacts mapping.
+        """
+        records = self.frame_records(frame, {
+            'Salutation' : frame['Title'],
+            'FirstName' : frame['First name'],
+            'LastName' : frame['Last/Organization/Group/Household name'],
+            'Auctifera__Implementation_External_ID__c' : frame['Lookup ID'],
+        })
+        if 'Households Belonging To\\Household Record ID' not in frame:
+            return records
+
+        with paused_gc():
+            for contacts_info, account in zip(records, frame['Households Belonging To\\Household Record ID'].tolist()):
+                if account and account in self.households_ids:
+                    contacts_info['Account'] = {'Auctifera__Implementation_External_ID__c': self.households_ids[account]}
+
+        return records
+
+    def collect_contacts_ids(self, results: List[Dict]) -> None:
+        """
+        Keep the ids of the contacts uploaded successfully in a batch.
+
+        Args:
+            results (List[Dict]): results of the upsert of a batch of contacts.
+
+        Returns:
+            None
         """
         for result in results:
             if result['success']:
                 self.contacts_id_list.append(result['id'])
 
-        self.contacts_accounts_id = self.salesforce_strategy.get_account_id()
-        
+    def get_contacts_accounts_id(self) -> Dict[str, str]:
+        """
+        Get the id of the accounts associated with the uploaded contacts.
+
+        Returns:
+            Dict[str, str]: hash table like: {'Auctifera__Implementation_External_ID__c': 'AccountId'}
+        """
+        self.contacts_accounts_id = self.salesforce_strategy.get_account_id(self.contacts_id_list)
         return self.contacts_accounts_id
-        
+
+    def process_contacts_ids(self, results) -> Dict[str, str]:
+        """
+        Processes the results of the contacts uploded and get id of accounts associates with contact            
+            Returns:
+                List[Dict]: A list of dictionaries representing the contact mappings.
+        """
+        self.collect_contacts_ids(results)
+        return self.get_contacts_accounts_id()
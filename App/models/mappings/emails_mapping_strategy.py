@@ -1,9 +1,8 @@
-import csv
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings.mapping_strategy import MappingStrategy
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class EmailStrategy(MappingStrategy):
     """
@@ -33,34 +32,46 @@ class EmailStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the emails of contacts mappings.
         """ 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    contacts_emails_info = {
-                    'vnfp__Type__c' : 'Email',
-                    'vnfp__value__c' : row['Email Addresses\\Email address'],
-                    'vnfp__Contact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                    'vnfp__Implementation_External_ID__c' : str(str(counter)+ '-' + 'contacts-email' + '-' + row['QUERYRECID'])
-                    }
-                    self.object_emails_address_list.append(contacts_emails_info)
-
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    contacts_emails_info = {
-                    'vnfp__Type__c' : 'Email',
-                    'vnfp__value__c' : row['Email Addresses\\Email address'],
-                    'vnfp__Contact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                    'vnfp__Implementation_External_ID__c' : str(str(counter)+ '-' + 'contacts-email' + '-' + row['QUERYRECID'])
-                    }
-                    self.object_emails_address_list.append(contacts_emails_info)
-        
+        self.object_emails_address_list.extend(self.map_rows())
         return self.object_emails_address_list
-        
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the emails report to a Legacy Data record.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row.
+        """
+        lookup_id = row['Lookup ID']
+        contacts_emails_info = {
+            'vnfp__Type__c' : 'Email',
+            'vnfp__value__c' : row['Email Addresses\\Email address'],
+            'vnfp__Contact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
+            'vnfp__Implementation_External_ID__c' : str(str(counter)+ '-' + 'contacts-email' + '-' + row['QUERYRECID'])
+        }
+        return contacts_emails_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole emails report to Legacy Data records.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the rows.
+        """
+        return self.frame_records(frame, {
+            'vnfp__Type__c' : 'Email',
+            'vnfp__value__c' : frame['Email Addresses\\Email address'],
+            'vnfp__Contact__r': self.external_id_references(frame['Lookup ID']),
+            'vnfp__Implementation_External_ID__c' : self.counter_ids(frame, 'contacts-email')
+        })
+
 class EmailUpdateStrategy(MappingStrategy):
     """
     A class used to represent an update of emails of contacts mapping strategy.
@@ -89,28 +100,43 @@ class EmailUpdateStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the update of emails of contacts mappings.
         """ 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for counter, row in enumerate(reader, start=1):
-                    valid = bool(row['Email Addresses\\Primary email address'])
-                    new_info = {
-                        'Auctifera__Implementation_External_ID__c': row['Lookup ID'], 
-                        'Email' : row['Email Addresses\\Email address']
-                    }
-                    if valid:
-                        self.object_emails_update_address_list.append(new_info)      
-
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for counter, row in enumerate(reader, start=1):
-                    valid = bool(row['Email Addresses\\Primary email address'])
-                    new_info = {
-                        'Auctifera__Implementation_External_ID__c': row['Lookup ID'], 
-                        'Email' : row['Email Addresses\\Email address']
-                    }
-                    if valid:
-                        self.object_emails_update_address_list.append(new_info)      
-
-        return self.object_emails_update_address_list
\ No newline at end of file
+        self.object_emails_update_address_list.extend(self.map_rows())
+        return self.object_emails_update_address_list
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the emails report to an update of the primary email.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row, or None if it is not the primary value.
+        """
+        valid = bool(row['Email Addresses\\Primary email address'])
+        if not valid:
+            return None
+
+        new_info = {
+            'Auctifera__Implementation_External_ID__c': row['Lookup ID'], 
+            'Email' : row['Email Addresses\\Email address']
+        }
+        return new_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the primary emails of the whole emails report to updates.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the primary values.
+        """
+        frame = frame[frame['Email Addresses\\Primary email address'] != '']
+        return self.frame_records(frame, {
+            'Auctifera__Implementation_External_ID__c': frame['Lookup ID'],
+            'Email' : frame['Email Addresses\\Email address']
+        })
+
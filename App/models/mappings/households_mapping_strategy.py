@@ -1,10 +1,9 @@
-import csv
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings.mapping_strategy import MappingStrategy
 from models.strategies.salesforce_strategy import SalesforceStrategy
-from typing import List, Dict
+from typing import Iterator, List, Dict
 
 class HouseholdsMappingStrategy(MappingStrategy):
     """
@@ -26,6 +25,7 @@ class HouseholdsMappingStrategy(MappingStrategy):
         super().__init__(input_csv)
         self.households_list: List[Dict] = []
         self.houseHolds_external_ids_list: List[str] = []
+        self.households_id: str = ''
         self.salesforce_strategy = SalesforceStrategy()  
 
     def make_mapping(self) -> List[Dict]:
@@ -38,34 +38,57 @@ class HouseholdsMappingStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the households mappings.
         """
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                households_id = self.salesforce_strategy.get_households_id() 
-                counter = 0
-                for counter, row in enumerate(reader, start=1):
-                    external_id = f"{counter}-households-{row['QUERYRECID']}"
-                    self.houseHolds_external_ids_list.append(external_id)
-                    households_info = {
-                        'RecordTypeId': households_id,
-                        'Auctifera__Implementation_External_ID__c': external_id,
-                        'Name': row["Name"]
-                    }
-                    self.households_list.append(households_info)
-        
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                households_id = self.salesforce_strategy.get_households_id() 
-                counter = 0
-                for counter, row in enumerate(reader, start=1):
-                    external_id = f"{counter}-households-{row['QUERYRECID']}"
-                    self.houseHolds_external_ids_list.append(external_id)
-                    households_info = {
-                        'RecordTypeId': households_id,
-                        'Auctifera__Implementation_External_ID__c': external_id,
-                        'Name': row["Name"]
-                    }
-                    self.households_list.append(households_info)
+        self.households_list.extend(self.iter_mapping())
+        return self.households_list, self.houseHolds_external_ids_list
+
+    def iter_mapping(self) -> Iterator[Dict]:
+        """
+        Get the households record type and lazily map the households report.
+
+        The external ids keep being collected in `houseHolds_external_ids_list`,
+        they are needed to map the contacts.
+
+        Returns:
+            Iterator[Dict]: The households mappings.
+        """
+        self.households_id = self.salesforce_strategy.get_households_id()
+        return self.map_rows()
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Dict:
+        """
+        Map a row of the households report to an Account and keep its external id.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Dict: The households mapping.
+        """
+        external_id = f"{counter}-households-{row['QUERYRECID']}"
+        self.houseHolds_external_ids_list.append(external_id)
+        households_info = {
+            'RecordTypeId': self.households_id,
+            'Auctifera__Implementation_External_ID__c': external_id,
+            'Name': row["Name"]
+        }
+        return households_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole households report to Accounts and keep their external ids.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The households mapping.
+        """
+        external_ids = self.counter_ids(frame, 'households').tolist()
+        self.houseHolds_external_ids_list.extend(external_ids)
+        return self.frame_records(frame, {
+            'RecordTypeId': self.households_id,
+            'Auctifera__Implementation_External_ID__c': external_ids,
+            'Name': frame["Name"]
+        })
 
-        return self.households_list, self.houseHolds_external_ids_list
\ No newline at end of file
@@ -1,6 +1,20 @@
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from contextlib import contextmanager
+from itertools import islice, repeat
+import csv
+import gc
+import logging
 import os
+import sys
+import threading
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.cleanup.cleanup_rules import ValueTranslation, column_transforms
+
+try:
+    import pandas
+except ImportError:
+    pandas = None
 
 # Absolute path of the current file
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -13,22 +27,302 @@ base_path = os.sep.join(split_path[:app_index + 1])
 # Create the ABS_PATH with a placeholder for future formatting
 ABS_PATH = os.path.join(base_path, "{}")
 
+# Delimiters used by the Altru exports, the first one wins on a tie
+CANDIDATE_DELIMITERS = (';', ',')
+
+logger = logging.getLogger(__name__)
+
+# Map the reports with the columnar engine (pandas) instead of row by row. The whole report is
+# loaded in memory, rows that can not be mapped in bulk keep being reported like in the row path
+columnar_engine = os.getenv('MIGRATION_COLUMNAR', 'false').lower() == 'true'
+if columnar_engine and pandas is None:
+    logger.warning("MIGRATION_COLUMNAR is set but pandas is not installed, the reports are mapped row by row")
+    columnar_engine = False
+
+# Pauses of the garbage collector in progress in the threads of the process, and if it was enabled before the first one
+gc_pause_lock = threading.Lock()
+gc_pauses = 0
+gc_was_enabled = False
+
+@contextmanager
+def paused_gc() -> Iterator[None]:
+    """
+    Pause the garbage collector while a whole report is loaded or mapped. Those objects have no
+    reference cycles, and building hundreds of thousands of them triggers collections that do not
+    free anything. The collector is process-wide, so the pauses of the threads are counted and it
+    is enabled again when the last one ends.
+
+    Returns:
+        Iterator[None]: context where the garbage collector is paused.
+    """
+    global gc_pauses, gc_was_enabled
+    with gc_pause_lock:
+        if gc_pauses == 0:
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+        gc_pauses += 1
+    try:
+        yield
+    finally:
+        with gc_pause_lock:
+            gc_pauses -= 1
+            if gc_pauses == 0 and gc_was_enabled:
+                gc.enable()
+
 class MappingStrategy(ABC):
     """
     Abstract base class for creating mappings from a data set.
     """
-    
+
     def __init__(self, input_csv: str) -> None:
         """
         Initialize the AbstractMapping with an empty data set and an input CSV file path.
 
         Args:
             input_csv (str): The path to the input CSV file.
-        
+
         Returns:
             None
         """
         self.input_csv: str = input_csv
+        self.row_errors: List[Tuple[int, str]] = []
+        self.transforms: Dict[str, Callable[[str], str]] = column_transforms(self.report_name)
+
+    @property
+    def report_name(self) -> str:
+        """
+        Name of the report, taken from the name of the input CSV file.
+
+        Returns:
+            str: The name of the report.
+        """
+        return os.path.splitext(os.path.basename(self.input_csv))[0]
+
+    @property
+    def columnar(self) -> bool:
+        """
+        Whether the report is mapped with the columnar engine. Only the strategies that define
+        `map_frame(frame) -> List[Dict]` support it: it maps the whole report (a DataFrame read by
+        `read_frame`) with column operations into the same records `map_row` creates for each row.
+        The other strategies map their report row by row.
+
+        Returns:
+            bool: True if the report is mapped with `map_frame`.
+        """
+        return columnar_engine and callable(getattr(self, 'map_frame', None))
+
+    @staticmethod
+    def detect_delimiter(header: str) -> str:
+        """
+        Detect the delimiter of a report from its header line.
+
+        Args:
+            header (str): The first line of the CSV file.
+
+        Returns:
+            str: The delimiter that appears the most in the header.
+        """
+        return max(CANDIDATE_DELIMITERS, key=header.count)
+
+    def report_row_error(self, counter: int, message: str) -> None:
+        """
+        Register a row that could not be mapped, the rest of the file keeps being processed.
+
+        Args:
+            counter (int): Position of the row in the report (starting at 1).
+            message (str): Description of the error.
+
+        Returns:
+            None
+        """
+        self.row_errors.append((counter, message))
+        logger.warning(f"{os.path.basename(self.input_csv)} row {counter}: {message}")
+
+    def read_rows(self) -> Iterator[Tuple[int, Dict[str, str]]]:
+        """
+        Read the input CSV file once, yielding its rows lazily.
+
+        The delimiter is detected from the header, so the file is never parsed twice.
+        Rows that do not have the same number of fields as the header are reported
+        and skipped. The cleanup of the report is applied to the columns of each row.
+
+        Returns:
+            Iterator[Tuple[int, Dict[str, str]]]: The position of the row (starting at 1) and the row.
+        """
+        with open(self.input_csv, 'r', encoding='utf-8-sig', newline='') as f:
+            header = f.readline()
+            if not header.strip():
+                return
+
+            delimiter = self.detect_delimiter(header)
+            fieldnames = next(csv.reader([header], delimiter=delimiter))
+            reader = csv.DictReader(f, fieldnames=fieldnames, delimiter=delimiter)
+            transforms = [(column, transform) for column, transform in self.transforms.items() if column in fieldnames]
+            for counter, row in enumerate(reader, start=1):
+                if None in row or None in row.values():
+                    self.report_row_error(counter, f"expected {len(fieldnames)} fields")
+                    continue
+                for column, transform in transforms:
+                    row[column] = transform(row[column])
+                yield counter, row
+
+    def read_frame(self) -> 'pandas.DataFrame':
+        """
+        Read the whole input CSV file into a DataFrame of strings, indexed by the position of the rows.
+
+        The file is tokenized like in `read_rows`, so the same rows are reported and skipped and the
+        positions of the rows do not change. The cleanup of the report is applied to whole columns.
+
+        Returns:
+            pandas.DataFrame: The rows of the report.
+        """
+        with open(self.input_csv, 'r', encoding='utf-8-sig', newline='') as f:
+            header = f.readline()
+            if not header.strip():
+                return pandas.DataFrame()
+
+            delimiter = self.detect_delimiter(header)
+            fieldnames = next(csv.reader([header], delimiter=delimiter))
+            with paused_gc():
+                rows = [fields for fields in csv.reader(f, delimiter=delimiter) if fields]
+
+        counters = range(1, len(rows) + 1)
+        if any(len(fields) != len(fieldnames) for fields in rows):
+            counters = []
+            for counter, fields in enumerate(rows, start=1):
+                if len(fields) == len(fieldnames):
+                    counters.append(counter)
+                else:
+                    self.report_row_error(counter, f"expected {len(fieldnames)} fields")
+            rows = [rows[counter - 1] for counter in counters]
+
+        frame = pandas.DataFrame(rows, columns=fieldnames, index=pandas.Index(counters), dtype=object)
+        # Like in the rows read with csv.DictReader, the last of repeated columns wins
+        frame = frame.loc[:, ~frame.columns.duplicated(keep='last')]
+        for column, transform in self.transforms.items():
+            if column not in frame:
+                continue
+            if isinstance(transform, ValueTranslation):
+                frame[column] = frame[column].map(transform.table).fillna(transform.default)
+            else:
+                frame[column] = frame[column].map(transform)
+        return frame
+
+    @staticmethod
+    def counter_ids(frame: 'pandas.DataFrame', label: str) -> 'pandas.Series':
+        """
+        Build the external ids made of the position of the row, a label and the QUERYRECID (ex: 1-phone-QUERYRECID).
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+            label (str): label of the object.
+
+        Returns:
+            pandas.Series: The external id of each row.
+        """
+        return frame.index.to_series().astype(str) + f'-{label}-' + frame['QUERYRECID']
+
+    @staticmethod
+    def external_id_references(lookup_ids: 'pandas.Series') -> List[Dict[str, str]]:
+        """
+        Build the references to records by their implementation external id.
+
+        Args:
+            lookup_ids (pandas.Series): external ids of the related records.
+
+        Returns:
+            List[Dict[str, str]]: The reference of each external id.
+        """
+        with paused_gc():
+            return [{'Auctifera__Implementation_External_ID__c': lookup_id} for lookup_id in lookup_ids.tolist()]
+
+    @staticmethod
+    def frame_records(frame: 'pandas.DataFrame', columns: Dict[str, Any]) -> List[Dict]:
+        """
+        Build the records of the rows of a report from its mapped columns.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+            columns (Dict[str, Any]): value of each field of the records, a column or a constant.
+
+        Returns:
+            List[Dict]: The records.
+        """
+        values = [column.tolist() if isinstance(column, pandas.Series) else column for column in columns.values()]
+        values = [value if isinstance(value, list) else repeat(value, len(frame)) for value in values]
+        keys = tuple(columns)
+        with paused_gc():
+            return [dict(zip(keys, record)) for record in zip(*values)]
+
+    def map_rows(self) -> Iterator[Dict]:
+        """
+        Map every row of the input CSV file with `map_row`, or with `map_frame` if the report
+        is mapped with the columnar engine (see `columnar`).
+
+        Rows whose values can not be mapped are reported and skipped without
+        restarting the file.
+
+        Returns:
+            Iterator[Dict]: The mapped records.
+        """
+        if self.columnar:
+            frame = self.read_frame()
+            if not frame.empty:
+                yield from self.map_frame(frame)
+            return
+
+        for counter, row in self.read_rows():
+            try:
+                record = self.map_row(counter, row)
+            except (TypeError, ValueError) as e:
+                self.report_row_error(counter, str(e))
+                continue
+            if record is not None:
+                yield record
+
+    @abstractmethod
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a single row of the report. A strategy that does not map its report row by row
+        overrides `iter_mapping` instead of reading the CSV with `map_rows`, and says so here.
+
+        Args:
+            counter (int): Position of the row in the report (starting at 1).
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapped record, or None if the row must be skipped.
+        """
+        pass
+
+    def iter_mapping(self) -> Iterator[Dict]:
+        """
+        Lazily create the mapping of the input CSV file, subclasses that need some context
+        before mapping (record types, households...) override it.
+
+        Returns:
+            Iterator[Dict]: The mapped records.
+        """
+        return self.map_rows()
+
+    def iter_batches(self, batch_size: int, *args) -> Iterator[List[Dict]]:
+        """
+        Create the mapping in chunks of at most `batch_size` records, so only one chunk
+        is kept in memory at a time.
+
+        Args:
+            batch_size (int): Maximum number of records per chunk.
+            *args: Arguments passed to `iter_mapping`.
+
+        Returns:
+            Iterator[List[Dict]]: The chunks of mapped records.
+        """
+        records = self.iter_mapping(*args)
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                return
+            yield batch
 
     @abstractmethod
     def make_mapping(self, row : str) -> List[Dict]:
@@ -44,4 +338,104 @@ class MappingStrategy(ABC):
         Returns:
             List[Dict]: A list of dictionaries representing the mapping for some object.
         """
-        pass
\ No newline at end of file
+        pass
+
+
+class FusedMappingStrategy(MappingStrategy):
+    """
+    Mapping strategy that creates the mappings of several strategies of the same report
+    (ex: phones and update of primary phones) reading the report only once.
+    """
+
+    def __init__(self, input_csv: str, strategies: List[MappingStrategy]) -> None:
+        """
+        Initialize the fused strategy with the strategies of the report.
+
+        Args:
+            input_csv (str): The path to the input CSV file.
+            strategies (List[MappingStrategy]): strategies of the report, each one is an output.
+
+        Returns:
+            None
+        """
+        super().__init__(input_csv)
+        self.strategies = strategies
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Tuple[Optional[Dict], ...]:
+        """
+        Map a row with every strategy. A strategy that can not map the row reports it, like when
+        it maps the report alone, and the other strategies keep their records of the row.
+
+        Args:
+            counter (int): Position of the row in the report (starting at 1).
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Tuple[Optional[Dict], ...]: The record of each strategy, None if the strategy skips the row.
+        """
+        records = []
+        for strategy in self.strategies:
+            try:
+                records.append(strategy.map_row(counter, row))
+            except (TypeError, ValueError) as e:
+                strategy.report_row_error(counter, str(e))
+                records.append(None)
+        return tuple(records)
+
+    @property
+    def columnar(self) -> bool:
+        """
+        Whether the report is mapped with the columnar engine, every strategy must support it.
+
+        Returns:
+            bool: True if the report is mapped with the `map_frame` of each strategy.
+        """
+        return all(strategy.columnar for strategy in self.strategies)
+
+    def make_mapping(self) -> Tuple[List[Dict], ...]:
+        """
+        Create the mapping of every strategy in a single read of the report.
+
+        Returns:
+            Tuple[List[Dict], ...]: The mapping of each strategy.
+        """
+        if self.columnar:
+            frame = self.read_frame()
+            return tuple([] if frame.empty else strategy.map_frame(frame) for strategy in self.strategies)
+
+        outputs = tuple([] for _ in self.strategies)
+        for records in self.map_rows():
+            for output, record in zip(outputs, records):
+                if record is not None:
+                    output.append(record)
+        return outputs
+
+    def iter_output_batches(self, batch_size: int) -> Iterator[Tuple[int, List[Dict]]]:
+        """
+        Create the mapping of every strategy in a single read, in chunks of at most `batch_size` records.
+
+        Args:
+            batch_size (int): Maximum number of records per chunk.
+
+        Returns:
+            Iterator[Tuple[int, List[Dict]]]: The index of the strategy and a chunk of its mapping.
+        """
+        if self.columnar:
+            for index, records in enumerate(self.make_mapping()):
+                for start in range(0, len(records), batch_size):
+                    yield index, records[start:start + batch_size]
+            return
+
+        buffers = [[] for _ in self.strategies]
+        for records in self.map_rows():
+            for index, record in enumerate(records):
+                if record is None:
+                    continue
+                buffers[index].append(record)
+                if len(buffers[index]) >= batch_size:
+                    yield index, buffers[index]
+                    buffers[index] = []
+
+        for index, buffer in enumerate(buffers):
+            if buffer:
+                yield index, buffer
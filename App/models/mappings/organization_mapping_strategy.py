@@ -1,10 +1,9 @@
-import csv
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings.mapping_strategy import MappingStrategy
 from models.strategies.salesforce_strategy import SalesforceStrategy
-from typing import List, Dict
+from typing import Iterator, List, Dict
 
 class OrganizationMappingStrategy(MappingStrategy):
     """
@@ -24,6 +23,7 @@ class OrganizationMappingStrategy(MappingStrategy):
         """
         super().__init__(input_csv)
         self.account_list: List[Dict] = []
+        self.organization_id: str = ''
         self.salesforce_strategy = SalesforceStrategy()  
 
     def make_mapping(self) -> List[Dict]:
@@ -36,36 +36,60 @@ class OrganizationMappingStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the organization mappings.
         """ 
-        try: 
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                organization_id = self.salesforce_strategy.get_organization_id()
-                for row in reader:
-                    account_info = {
-                        'RecordTypeId': organization_id,
-                        'Auctifera__Implementation_External_ID__c': row['Lookup ID'],
-                        'Name': row["Name"],
-                        'Website': row['Web address'],
-                    }
-                    if row['Email Addresses\\Email address'] != '':
-                        account_info['Auctifera__Email__c'] = row['Email Addresses\\Email address']
+        self.account_list.extend(self.iter_mapping())
+        return self.account_list
 
-                    self.account_list.append(account_info)
-        
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                organization_id = self.salesforce_strategy.get_organization_id()
-                for row in reader:
-                    account_info = {
-                        'RecordTypeId': organization_id,
-                        'Auctifera__Implementation_External_ID__c': row['Lookup ID'],
-                        'Name': row["Name"],
-                        'Website': row['Web address'],
-                    }
-                    if row['Email Addresses\\Email address'] != '':
-                        account_info['Auctifera__Email__c'] = row['Email Addresses\\Email address']
+    def iter_mapping(self) -> Iterator[Dict]:
+        """
+        Get the organization record type and lazily map the organizations report.
+
+        Returns:
+            Iterator[Dict]: The organization mappings.
+        """
+        self.organization_id = self.salesforce_strategy.get_organization_id()
+        return self.map_rows()
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Dict:
+        """
+        Map a row of the organizations report to an Account.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Dict: The organization mapping.
+        """
+        account_info = {
+            'RecordTypeId': self.organization_id,
+            'Auctifera__Implementation_External_ID__c': row['Lookup ID'],
+            'Name': row["Name"],
+            'Website': row['Web address'],
+        }
+        if row['Email Addresses\\Email address'] != '':
+            account_info['Auctifera__Email__c'] = row['Email Addresses\\Email address']
+
+        return account_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole organizations report to Accounts.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The organizations mapping.
+        """
+        records = self.frame_records(frame, {
+            'RecordTypeId': self.organization_id,
+            'Auctifera__Implementation_External_ID__c': frame['Lookup ID'],
+            'Name': frame["Name"],
+            'Website': frame['Web address'],
+        })
+        for account_info, email in zip(records, frame['Email Addresses\\Email address'].tolist()):
+            if email != '':
+                account_info['Auctifera__Email__c'] = email
+
+        return records
 
-                    self.account_list.append(account_info)           
-                   
-        return self.account_list
@@ -1,9 +1,8 @@
-import csv
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings.mapping_strategy import MappingStrategy
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class PhoneStrategy(MappingStrategy):
     """
@@ -32,36 +31,46 @@ class PhoneStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the phones of organizations mappings.
         """ 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                counter = 0
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    organizations_phones_info = {
-                        'vnfp__Type__c' : 'Phone',
-                        'vnfp__value__c' : row['Phones\\Number'],
-                        'vnfp__Account__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                        'vnfp__Implementation_External_ID__c' : str(str(counter)+ '-' + 'phone' + '-' + row['QUERYRECID']) 
-                    }
-                    self.object_phones_list.append(organizations_phones_info)
- 
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                counter = 0
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    organizations_phones_info = {
-                        'vnfp__Type__c' : 'Phone',
-                        'vnfp__value__c' : row['Phones\\Number'],
-                        'vnfp__Account__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                        'vnfp__Implementation_External_ID__c' : str(str(counter)+ '-' + 'phone' + '-' + row['QUERYRECID']) 
-                    }
-                    self.object_phones_list.append(organizations_phones_info)
-
+        self.object_phones_list.extend(self.map_rows())
         return self.object_phones_list
 
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the phones report to a Legacy Data record.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row.
+        """
+        lookup_id = row['Lookup ID']
+        organizations_phones_info = {
+            'vnfp__Type__c' : 'Phone',
+            'vnfp__value__c' : row['Phones\\Number'],
+            'vnfp__Account__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
+            'vnfp__Implementation_External_ID__c' : str(str(counter)+ '-' + 'phone' + '-' + row['QUERYRECID']) 
+        }
+        return organizations_phones_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole phones report to Legacy Data records.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the rows.
+        """
+        return self.frame_records(frame, {
+            'vnfp__Type__c' : 'Phone',
+            'vnfp__value__c' : frame['Phones\\Number'],
+            'vnfp__Account__r': self.external_id_references(frame['Lookup ID']),
+            'vnfp__Implementation_External_ID__c' : self.counter_ids(frame, 'phone')
+        })
+
 class PhoneUpdateStrategy(MappingStrategy):
     """
     A class used to represent an update of phones of organizations mapping strategy.
@@ -89,29 +98,43 @@ class PhoneUpdateStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the update phones of organizations mappings.
         """ 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for counter, row in enumerate(reader, start=1):
-                    valid = bool(row['Phones\\Primary phone number'])
-                    organizations_update_phones_info = {
-                        'Auctifera__Implementation_External_ID__c': row['Lookup ID'], 
-                        'Phone' : row['Phones\\Number']
-                    }
-                    if valid:
-                        self.object_phones_update_list.append(organizations_update_phones_info)
-
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for counter, row in enumerate(reader, start=1):
-                    valid = bool(row['Phones\\Primary phone number'])
-                    organizations_update_phones_info = {
-                        'Auctifera__Implementation_External_ID__c': row['Lookup ID'], 
-                        'Phone' : row['Phones\\Number']
-                    }
-                    if valid:
-                        self.object_phones_update_list.append(organizations_update_phones_info)
-
+        self.object_phones_update_list.extend(self.map_rows())
         return self.object_phones_update_list
 
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the phones report to an update of the primary phone.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row, or None if it is not the primary value.
+        """
+        valid = bool(row['Phones\\Primary phone number'])
+        if not valid:
+            return None
+
+        organizations_update_phones_info = {
+            'Auctifera__Implementation_External_ID__c': row['Lookup ID'], 
+            'Phone' : row['Phones\\Number']
+        }
+        return organizations_update_phones_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the primary phones of the whole phones report to updates.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the primary values.
+        """
+        frame = frame[frame['Phones\\Primary phone number'] != '']
+        return self.frame_records(frame, {
+            'Auctifera__Implementation_External_ID__c': frame['Lookup ID'],
+            'Phone' : frame['Phones\\Number']
+        })
+
@@ -1,9 +1,8 @@
-import csv
 import os
 import sys
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.mappings.mapping_strategy import MappingStrategy
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 class OrganizationAffilationStrategy(MappingStrategy):
     """
@@ -32,38 +31,48 @@ class OrganizationAffilationStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the Relationship of organizations mappings.
         """ 
-        try:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for counter, row in enumerate(reader, start=1):
-                    contact_lookup_id = row['Lookup ID']
-                    organization_lookup_id = row['Relationships\\Related Constituent\\Lookup ID']
-                    organizations_relationship_info = {
-                        'npe5__Contact__r' : {'Auctifera__Implementation_External_ID__c': contact_lookup_id},
-                        'npe5__Organization__r' : {'Auctifera__Implementation_External_ID__c': organization_lookup_id},
-                        'npe5__Primary__c' : False if row['Relationships\\Is primary contact'] != 'Yes' else True,
-                        'npe5__Role__c' : row['Relationships\\Reciprocal relationship type'],
-                        'vnfp__Implementation_External_ID__c' : row['QUERYRECID']
-                    }
-                    self.organizations_relationship_list.append(organizations_relationship_info)
-
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for counter, row in enumerate(reader, start=1):
-                    contact_lookup_id = row['Lookup ID']
-                    organization_lookup_id = row['Relationships\\Related Constituent\\Lookup ID']
-                    organizations_relationship_info = {
-                        'npe5__Contact__r' : {'Auctifera__Implementation_External_ID__c': contact_lookup_id},
-                        'npe5__Organization__r' : {'Auctifera__Implementation_External_ID__c': organization_lookup_id},
-                        'npe5__Primary__c' : False if row['Relationships\\Is primary contact'] != 'Yes' else True,
-                        'npe5__Role__c' : row['Relationships\\Reciprocal relationship type'],
-                        'vnfp__Implementation_External_ID__c' : row['QUERYRECID']
-                    }
-                    self.organizations_relationship_list.append(organizations_relationship_info)
-
+        self.organizations_relationship_list.extend(self.map_rows())
         return self.organizations_relationship_list
-        
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the organizations relationships report to an Affiliation.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row.
+        """
+        contact_lookup_id = row['Lookup ID']
+        organization_lookup_id = row['Relationships\\Related Constituent\\Lookup ID']
+        organizations_relationship_info = {
+            'npe5__Contact__r' : {'Auctifera__Implementation_External_ID__c': contact_lookup_id},
+            'npe5__Organization__r' : {'Auctifera__Implementation_External_ID__c': organization_lookup_id},
+            'npe5__Primary__c' : False if row['Relationships\\Is primary contact'] != 'Yes' else True,
+            'npe5__Role__c' : row['Relationships\\Reciprocal relationship type'],
+            'vnfp__Implementation_External_ID__c' : row['QUERYRECID']
+        }
+        return organizations_relationship_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole organizations relationships report to Affiliations.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the rows.
+        """
+        return self.frame_records(frame, {
+            'npe5__Contact__r' : self.external_id_references(frame['Lookup ID']),
+            'npe5__Organization__r' : self.external_id_references(frame['Relationships\\Related Constituent\\Lookup ID']),
+            'npe5__Primary__c' : frame['Relationships\\Is primary contact'] == 'Yes',
+            'npe5__Role__c' : frame['Relationships\\Reciprocal relationship type'],
+            'vnfp__Implementation_External_ID__c' : frame['QUERYRECID']
+        })
 
 class ContactsRelationshipStrategy(MappingStrategy):
     """
@@ -92,31 +101,44 @@ class ContactsRelationshipStrategy(MappingStrategy):
         Returns:
             List[Dict]: A list of dictionaries representing the Relationship of contacts mappings.
         """ 
-        try: 
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=';')
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    contacts_relationship_info = {
-                        'npe4__Contact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                        'npe4__RelatedContact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                        'npe4__Type__c' : row['Relationships\\Reciprocal relationship type'],
-                        'vnfp__Implementation_External_ID__c' : row['QUERYRECID']
-                    }
-                    self.contacts_relationship_list.append(contacts_relationship_info)
-
-        except Exception:
-            with open(self.input_csv, 'r', encoding='utf-8-sig') as f:
-                reader = csv.DictReader(f, delimiter=',')
-                for counter, row in enumerate(reader, start=1):
-                    lookup_id = row['Lookup ID']
-                    contacts_relationship_info = {
-                        'npe4__Contact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                        'npe4__RelatedContact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
-                        'npe4__Type__c' : row['Relationships\\Reciprocal relationship type'],
-                        'vnfp__Implementation_External_ID__c' : row['QUERYRECID']
-                    }
-                    self.contacts_relationship_list.append(contacts_relationship_info)
-            
+        self.contacts_relationship_list.extend(self.map_rows())
         return self.contacts_relationship_list
-        
+
+    def map_row(self, counter: int, row: Dict[str, str]) -> Optional[Dict]:
+        """
+        Map a row of the contacts relationships report to a Relationship.
+
+        Args:
+            counter (int): Position of the row in the report.
+            row (Dict[str, str]): The row of the report.
+
+        Returns:
+            Optional[Dict]: The mapping of the row.
+        """
+        lookup_id = row['Lookup ID']
+        contacts_relationship_info = {
+            'npe4__Contact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
+            'npe4__RelatedContact__r': {'Auctifera__Implementation_External_ID__c': lookup_id},
+            'npe4__Type__c' : row['Relationships\\Reciprocal relationship type'],
+            'vnfp__Implementation_External_ID__c' : row['QUERYRECID']
+        }
+        return contacts_relationship_info
+
+    def map_frame(self, frame: 'pandas.DataFrame') -> List[Dict]:
+        """
+        Map the whole contacts relationships report to Relationships.
+
+        Args:
+            frame (pandas.DataFrame): The rows of the report.
+
+        Returns:
+            List[Dict]: The mapping of the rows.
+        """
+        references = self.external_id_references(frame['Lookup ID'])
+        return self.frame_records(frame, {
+            'npe4__Contact__r': references,
+            'npe4__RelatedContact__r': [dict(reference) for reference in references],
+            'npe4__Type__c' : frame['Relationships\\Reciprocal relationship type'],
+            'vnfp__Implementation_External_ID__c' : frame['QUERYRECID']
+        })
+
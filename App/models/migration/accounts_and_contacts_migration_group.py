@@ -1,11 +1,16 @@
 import os 
 import sys
-from typing import List
+import logging
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 from models.factories import mapping_strategy_factory
 from models.mappings import contacts_mapping_strategy
 from models.mappings import address_mapping_strategy
 from models.migration.migration_group import migrationGroup
+from models.migration.load_scheduler import LoadScheduler
+from models.migration.mapping_pipeline import MappingPipeline, pipeline_depth
+from models.cache.fingerprint_cache import FingerprintCache, code_version, file_hash
+from models.cache.checkpoint_store import CheckpointStore, checkpoint_enabled, resume_mode, run_key
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 split_path = current_dir.split(os.sep)
@@ -13,6 +18,8 @@ app_index = split_path.index("App")
 base_path = os.sep.join(split_path[:app_index + 1])
 ABS_PATH = os.path.join(base_path, "{}")
 
+logger = logging.getLogger(__name__)
+
 
 accounts_report_names = [
             "Veevart Organizations Report test",
@@ -29,69 +36,382 @@ contacts_report_names = [
             "Veevart Contacts Relationships report test"
 ]
 
+# Streaming mode sends each mapping in batches of MIGRATION_BATCH_SIZE records while its report is read
+streaming_mode = os.getenv('MIGRATION_STREAMING', 'false').lower() == 'true'
+streaming_batch_size = int(os.getenv('MIGRATION_BATCH_SIZE', '10000'))
+
+# Pipeline mode maps the reports in batches ahead of their upload, in threads, while other loads are uploaded
+pipeline_mode = os.getenv('MIGRATION_PIPELINE', 'false').lower() == 'true'
+
+# Mappings that need the results of the loads they depend on, they are mapped when their load starts
+mapped_on_load = ('ContactAddressMapping',)
+
+# Loads running at the same time, 1 sends them one after another in the order of `loads`
+load_workers = int(os.getenv('MIGRATION_LOAD_WORKERS', '4'))
+
+def report_rows(path: str) -> int:
+    """
+    Count the rows of a report without parsing it, an upper bound of the records of its loads.
+
+    Args:
+        path (str): path of the report.
+
+    Returns:
+        int: The lines of the report after the header, 0 if the report does not exist.
+    """
+    if not os.path.exists(path):
+        return 0
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1
+    return max(0, lines - 1)
+
+class ObjectLoad(NamedTuple):
+    """
+    Load of a mapping into a Salesforce object, after the loads of the records it references.
+    """
+    mapping: str
+    object_name: str
+    principal_object: str
+    object: str
+    external_id: str
+    depends_on: Tuple[str, ...] = ()
+
+# Loads sent to Salesforce: every load starts when the loads it depends on finished
+loads = [
+    ObjectLoad('OrganizationMapping', 'Account', 'Organizations', 'Organizations', 'Auctifera__Implementation_External_ID__c'),
+    ObjectLoad('organizationPhoneMapping', 'vnfp__Legacy_Data__c', 'Organizations', 'phones', 'vnfp__Implementation_External_ID__c', ('OrganizationMapping',)),
+    ObjectLoad('organizationUpdatePhoneMapping', 'Account', 'Organizations', 'phones_update', 'Auctifera__Implementation_External_ID__c', ('OrganizationMapping',)),
+    ObjectLoad('organizationAddressMapping', 'npsp__Address__c', 'Organizations', 'address', 'vnfp__Implementation_External_ID__c', ('OrganizationMapping',)),
+    ObjectLoad('HouseholdsMapping', 'Account', 'Households', 'HouseHolds', 'Auctifera__Implementation_External_ID__c'),
+    ObjectLoad('ContactsMapping', 'Contact', 'Contacts', 'Contacts', 'Auctifera__Implementation_External_ID__c', ('HouseholdsMapping',)),
+    ObjectLoad('ContactsPhoneMapping', 'vnfp__Legacy_Data__c', 'Contacts', 'phones', 'vnfp__Implementation_External_ID__c', ('ContactsMapping',)),
+    ObjectLoad('ContactsPhoneUpdateMapping', 'Account', 'Contacts', 'phones_update', 'Auctifera__Implementation_External_ID__c', ('ContactsMapping',)),
+    ObjectLoad('ContactsEmailMapping', 'vnfp__Legacy_Data__c', 'Contacts', 'emails', 'vnfp__Implementation_External_ID__c', ('ContactsMapping',)),
+    ObjectLoad('ContactsEmailUpdateMapping', 'Contact', 'Contacts', 'emails_update', 'Auctifera__Implementation_External_ID__c', ('ContactsMapping',)),
+    ObjectLoad('ContactAddressMapping', 'npsp__Address__c', 'Contacts', 'address', 'vnfp__Implementation_External_ID__c', ('ContactsMapping',)),
+    ObjectLoad('organizationRelationMapping', 'npe5__Affiliation__c', 'Contacts', 'relation', 'vnfp__Implementation_External_ID__c', ('OrganizationMapping', 'ContactsMapping')),
+    ObjectLoad('ContactsRelationshipsMappingStrategy', 'npe4__Relationship__c', 'Organizations', 'relation', 'vnfp__Implementation_External_ID__c', ('ContactsMapping',)),
+]
+
 class AccountsAndContactsMigrationGroup(migrationGroup):
     """
     Adapter class for processing data and sending it to Salesforce using different strategies.
     """
     
-    def __init__(self, report_names: List[str]) -> None:
+    def __init__(self, report_names: List[str], streaming: bool = streaming_mode, batch_size: int = streaming_batch_size,
+                 cache: Optional[FingerprintCache] = None, workers: int = load_workers, pipeline: bool = pipeline_mode,
+                 depth: int = pipeline_depth, checkpoint: bool = checkpoint_enabled, resume: bool = resume_mode) -> None:
         """
         Initialize the FundRaisingMigrationGroup with the given report names.
 
         Args:
             report_names (List[str]): The names of the reports to be processed.
+            streaming (bool): send the mappings in batches while the reports are read.
+            batch_size (int): maximum number of records per batch in streaming mode.
+            cache (Optional[FingerprintCache]): cache of the mappings of unchanged reports, not used in streaming mode.
+            workers (int): maximum number of loads sent at the same time.
+            pipeline (bool): map the batches of the loads ahead of their upload, implies streaming.
+            depth (int): batches a load can be mapped ahead of its upload in pipeline mode.
+            checkpoint (bool): record the batches confirmed by Salesforce in a checkpoint.
+            resume (bool): skip the loads and batches confirmed by the previous run of the same reports.
 
         Returns:
             None
         """
         super().__init__(report_names)
+        self.streaming = streaming or pipeline
+        self.pipelined = pipeline
+        self.depth = depth
+        self.pipeline: Optional[MappingPipeline] = None
+        self.batch_size = batch_size
+        self.cache = cache
+        self.workers = workers
+        self.checkpointing = checkpoint or resume
+        self.resume = resume
         self.dic_households_ids = {}
         self.dic_accounts = {}
         self.dic_households = {}
 
+    def mapping_batches(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, mapping: str) -> Iterable[List[Dict]]:
+        """
+        Get the batches of records of a mapping, streamed from its report in streaming mode
+        or as a single batch from the factory otherwise.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            mapping (str): name of the mapping attribute in the factory.
+
+        Returns:
+            Iterable[List[Dict]]: The batches of the mapping.
+        """
+        if self.pipeline is not None:
+            return (batch for _, batch in self.pipeline_batches(mapping_factory, mapping))
+        if self.streaming:
+            return mapping_factory.stream_mapping(mapping, self.batch_size)
+
+        if mapping == 'ContactAddressMapping':
+            address_strategy = address_mapping_strategy.ContactsAddressStrategy(ABS_PATH.format('data/Veevart Contacts Report Address test.csv'))
+            mapping_factory.ContactAddressMapping = address_strategy.make_mapping(mapping_factory.contacts_accounts_ids)
+
+        records = getattr(mapping_factory, mapping)
+        return [records] if records else []
+
     def process_data(self) -> None:
         """
-        Processes data using the specified strategy and sends it to Salesforce.
+        Processes data using the specified strategy and sends it to Salesforce, every load
+        as soon as the loads it depends on were sent.
+
+        Args:
+            None
+
+        Returns:
+            None
+        """
+        self.strategy.load_metadata()
+        mapping_factory = mapping_strategy_factory.MappingStrategyFactory(cache=self.cache)
+        if not self.streaming:
+            mapping_factory.called_factory(accounts_report_names, contacts_report_names)
+
+        scheduler = LoadScheduler(self.load_dependencies(mapping_factory), self.workers)
+        self.strategy.checkpoint = self.open_checkpoint() if self.checkpointing else None
+        try:
+            self.check_api_usage(mapping_factory)
+            if self.pipelined:
+                self.run_pipeline(mapping_factory, scheduler)
+            else:
+                scheduler.run(lambda mapping: self.send_load(mapping_factory, mapping))
+        finally:
+            if self.strategy.checkpoint is not None:
+                self.strategy.checkpoint.close()
+                self.strategy.checkpoint = None
+
+    def run_pipeline(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, scheduler: LoadScheduler) -> None:
+        """
+        Run the loads while their batches are mapped ahead in the pipeline.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            scheduler (LoadScheduler): scheduler of the loads.
+
+        Returns:
+            None
+        """
+        self.pipeline = MappingPipeline(self.depth)
+        try:
+            for load in scheduler.order:
+                if load not in mapped_on_load and not self.is_skipped(mapping_factory, load):
+                    self.start_mapping(mapping_factory, load)
+            scheduler.run(lambda mapping: self.send_load(mapping_factory, mapping))
+        finally:
+            self.pipeline.close()
+            self.pipeline = None
+
+    def check_api_usage(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory) -> None:
+        """
+        Check that the loads still to send fit the API budget of the org, sized by the rows of their reports.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+
+        Raises:
+            ApiLimitError: if the loads do not fit the budget.
+
+        Returns:
+            None
+        """
+        rows: Dict[str, int] = {}
+        planned = []
+        account_lookups = 0
+        for load in loads:
+            if self.is_skipped(mapping_factory, load.mapping):
+                continue
+            report_name = mapping_strategy_factory.streaming_strategies[load.mapping][1]
+            if report_name not in rows:
+                rows[report_name] = report_rows(ABS_PATH.format(f'data/{report_name}.csv'))
+            planned.append((load.object_name, rows[report_name]))
+            if load.mapping == 'ContactsMapping':
+                account_lookups = rows[report_name]
+
+        self.strategy.check_api_usage(planned, self.batch_size if self.streaming else None, account_lookups)
+
+    def open_checkpoint(self) -> CheckpointStore:
+        """
+        Open the checkpoint of the run, keyed by the reports and the settings the batches depend on.
+
+        Returns:
+            CheckpointStore: The checkpoint, with the progress of the previous run in resume mode.
+        """
+        reports = sorted({report_name for _, report_name in mapping_strategy_factory.streaming_strategies.values()})
+        key = run_key(
+            code_version(),
+            self.strategy.token,
+            str(self.streaming),
+            str(self.batch_size),
+            *(file_hash(ABS_PATH.format(f'data/{report_name}.csv')) for report_name in reports)
+        )
+        return CheckpointStore(key, self.resume)
+
+    @staticmethod
+    def checkpoint_name(mapping: str) -> str:
+        """
+        Get the name of the load of a mapping in the checkpoint, the name of its response log.
+
+        Args:
+            mapping (str): name of the mapping attribute.
+
+        Returns:
+            str: The name of the load.
+        """
+        load = next(load for load in loads if load.mapping == mapping)
+        return f'{load.principal_object}_{load.object}'
+
+    def is_skipped(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, mapping: str) -> bool:
+        """
+        Check if a load was finished by the resumed run, so it is neither mapped nor sent. The loads whose
+        mapping is needed to map other loads in streaming mode (the households) are mapped anyway.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            mapping (str): name of the mapping attribute of the load.
+
+        Returns:
+            bool: True if the load can be skipped.
+        """
+        checkpoint = self.strategy.checkpoint
+        if checkpoint is None:
+            return False
+        group = mapping_factory.fused_group(mapping) if self.streaming else (mapping,)
+        if not all(checkpoint.is_done(self.checkpoint_name(member)) for member in group):
+            return False
+        report_name = mapping_strategy_factory.streaming_strategies[mapping][1]
+        return not (self.streaming and report_name in mapping_strategy_factory.mapping_dependencies.values())
+
+    def start_mapping(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, load: str) -> None:
+        """
+        Start mapping a load in the pipeline, after the loads whose reports its mapping needs.
 
         Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            load (str): name of the load, the first mapping of its fused group.
+
+        Returns:
             None
+        """
+        group = mapping_factory.fused_group(load)
+        if len(group) > 1:
+            batches = lambda: mapping_factory.stream_fused_mappings(group, self.batch_size)
+        else:
+            batches = lambda: ((load, batch) for batch in mapping_factory.stream_mapping(load, self.batch_size))
+
+        needed_report = mapping_strategy_factory.mapping_dependencies.get(mapping_strategy_factory.streaming_strategies[load][1])
+        after = [other for other in mapping_strategy_factory.streaming_strategies
+                 if mapping_strategy_factory.streaming_strategies[other][1] == needed_report and self.pipeline.started(other)]
+        self.pipeline.start(load, batches, after)
+
+    def pipeline_batches(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, load: str) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Get the batches of a load from the pipeline, its mapping is started if it is mapped when the load starts.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            load (str): name of the load.
+
+        Returns:
+            Iterator[Tuple[str, List[Dict]]]: The name of the mapping and the records of each batch.
+        """
+        if not self.pipeline.started(load):
+            self.start_mapping(mapping_factory, load)
+        return self.pipeline.batches(load)
+
+    def load_dependencies(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory) -> Dict[str, List[str]]:
+        """
+        Get the graph of the loads. In streaming mode the mappings of a fused group are sent
+        together, so the group is a single load named after its first mapping.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+
+        Returns:
+            Dict[str, List[str]]: the loads each load depends on, in the order of `loads`.
+        """
+        load_names = {}
+        for load in loads:
+            group = mapping_factory.fused_group(load.mapping)
+            load_names[load.mapping] = group[0] if self.streaming else load.mapping
+
+        dependencies: Dict[str, List[str]] = {}
+        for load in loads:
+            depends_on = dependencies.setdefault(load_names[load.mapping], [])
+            for dependency in load.depends_on:
+                if load_names[dependency] not in depends_on:
+                    depends_on.append(load_names[dependency])
+        return dependencies
+
+    def send_load(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, mapping: str) -> None:
+        """
+        Send a load to Salesforce.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            mapping (str): name of the mapping attribute of the load in the factory.
 
         Returns:
             None
         """
-        
-        global dic_accounts
-
-        mapping_factory = mapping_strategy_factory.MappingStrategyFactory()
-        mapping_factory.called_factory(accounts_report_names, contacts_report_names)
-        if mapping_factory.OrganizationMapping:
-            self.strategy.send_data(mapping_factory.OrganizationMapping, 'Account', 'Organizations', 'Organizations', 'Auctifera__Implementation_External_ID__c')  
-        if mapping_factory.organizationPhoneMapping:
-            self.strategy.send_data(mapping_factory.organizationPhoneMapping, 'vnfp__Legacy_Data__c', 'Organizations', 'phones', 'vnfp__Implementation_External_ID__c')
-        if mapping_factory.organizationUpdatePhoneMapping:
-            self.strategy.send_data(mapping_factory.organizationUpdatePhoneMapping, 'Account', 'Organizations', 'phones_update', 'Auctifera__Implementation_External_ID__c')            
-        if mapping_factory.organizationAddressMapping:
-            self.strategy.send_data(mapping_factory.organizationAddressMapping, 'npsp__Address__c', 'Organizations', 'address', 'vnfp__Implementation_External_ID__c')
-        if mapping_factory.HouseholdsMapping:
-            self.strategy.send_data(mapping_factory.HouseholdsMapping, 'Account', 'Households', 'HouseHolds', 'Auctifera__Implementation_External_ID__c')
-        if mapping_factory.ContactsMapping:
-            results = self.strategy.send_data(mapping_factory.ContactsMapping, 'Contact', 'Contacts', 'Contacts', 'Auctifera__Implementation_External_ID__c')
+        if self.is_skipped(mapping_factory, mapping):
+            logger.info(f"{mapping} was sent by the resumed run, skipping it")
+            if mapping == 'ContactsMapping':
+                contacts_strategy = contacts_mapping_strategy.ContactsMappingStrategy(ABS_PATH.format('data/Veevart Contacts Report Address test'))
+                contacts_strategy.contacts_id_list.extend(self.strategy.checkpoint.done_ids(self.checkpoint_name(mapping)))
+                self.dic_accounts = contacts_strategy.get_contacts_accounts_id()
+                mapping_factory.contacts_accounts_ids = self.dic_accounts
+            return
+
+        group = mapping_factory.fused_group(mapping)
+        if self.streaming and len(group) > 1:
+            self.stream_fused_group(mapping_factory, group)
+            return
+
+        load = next(load for load in loads if load.mapping == mapping)
+        batches = self.mapping_batches(mapping_factory, mapping)
+        if mapping == 'ContactsMapping':
             contacts_strategy = contacts_mapping_strategy.ContactsMappingStrategy(ABS_PATH.format('data/Veevart Contacts Report Address test'))
-            dic_accounts = contacts_strategy.process_contacts_ids(results)
-        if mapping_factory.ContactsPhoneMapping:
-            self.strategy.send_data(mapping_factory.ContactsPhoneMapping, 'vnfp__Legacy_Data__c', 'Contacts', 'phones', 'vnfp__Implementation_External_ID__c')
-        if mapping_factory.ContactsPhoneUpdateMapping:
-            self.strategy.send_data(mapping_factory.ContactsPhoneUpdateMapping, 'Account', 'Contacts', 'phones_update', 'Auctifera__Implementation_External_ID__c')            
-        if mapping_factory.ContactsEmailMapping:
-            self.strategy.send_data(mapping_factory.ContactsEmailMapping, 'vnfp__Legacy_Data__c', 'Contacts', 'emails', 'vnfp__Implementation_External_ID__c')
-        if mapping_factory.ContactsEmailUpdateMapping:
-            self.strategy.send_data(mapping_factory.ContactsEmailUpdateMapping, 'Contact', 'Contacts', 'emails_update', 'Auctifera__Implementation_External_ID__c')
-        AddressData = address_mapping_strategy.ContactsAddressStrategy(ABS_PATH.format('data/Veevart Contacts Report Address test.csv')).make_mapping(dic_accounts)
-        if AddressData:
-            self.strategy.send_data(AddressData, 'npsp__Address__c', 'Contacts', 'address', 'vnfp__Implementation_External_ID__c')
-
-        if mapping_factory.organizationRelationMapping:
-            self.strategy.send_data(mapping_factory.organizationRelationMapping, 'npe5__Affiliation__c', 'Contacts', 'relation', 'vnfp__Implementation_External_ID__c')
-        
-        if mapping_factory.ContactsRelationshipsMappingStrategy:
-            self.strategy.send_data(mapping_factory.ContactsRelationshipsMappingStrategy, 'npe4__Relationship__c', 'Organizations', 'relation', 'vnfp__Implementation_External_ID__c')
+            sent = self.strategy.send_batches(batches, *load[1:5], contacts_strategy.collect_contacts_ids)
+            if sent:
+                self.dic_accounts = contacts_strategy.get_contacts_accounts_id()
+                mapping_factory.contacts_accounts_ids = self.dic_accounts
+        else:
+            self.strategy.send_batches(batches, *load[1:5])
+
+    def stream_fused_group(self, mapping_factory: mapping_strategy_factory.MappingStrategyFactory, group: Tuple[str, ...]) -> None:
+        """
+        Send the mappings of a fused group in batches, reading their report once.
+
+        Args:
+            mapping_factory (MappingStrategyFactory): factory with the mappings.
+            group (Tuple[str, ...]): names of the mapping attributes of the group.
+
+        Returns:
+            None
+        """
+        load_by_mapping = {load.mapping: load for load in loads}
+        senders = {mapping: self.strategy.open_sender(*load_by_mapping[mapping][1:5]) for mapping in group}
+        try:
+            if self.pipeline is not None:
+                batches = self.pipeline_batches(mapping_factory, group[0])
+            else:
+                batches = mapping_factory.stream_fused_mappings(group, self.batch_size)
+            for mapping, batch in batches:
+                senders[mapping].send(batch)
+            for sender in senders.values():
+                sender.drain_retries()
+                sender.finish()
+        finally:
+            for sender in senders.values():
+                sender.close()
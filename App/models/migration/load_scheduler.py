@@ -0,0 +1,113 @@
+import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+class LoadScheduler:
+    """
+    Runs the loads of a dependency graph: each load starts as soon as all the loads it depends on
+    finished, and the loads that are ready at the same time run concurrently.
+    """
+    def __init__(self, dependencies: Dict[str, List[str]], workers: int) -> None:
+        """
+        Initialize the scheduler with the graph of the loads.
+
+        Args:
+            dependencies (Dict[str, List[str]]): the loads each load depends on, in the order the ready loads start.
+            workers (int): maximum number of loads running at the same time, 1 runs them one after another.
+
+        Raises:
+            ValueError: if a load depends on an unknown load or the dependencies have a cycle.
+
+        Returns:
+            None
+        """
+        self.dependencies = dependencies
+        self.workers = max(1, workers)
+        self.order = self.topological_order()
+
+    def topological_order(self) -> List[str]:
+        """
+        Get an order of the loads where every load comes after its dependencies.
+
+        Raises:
+            ValueError: if a load depends on an unknown load or the dependencies have a cycle.
+
+        Returns:
+            List[str]: The loads in order.
+        """
+        for load, depends_on in self.dependencies.items():
+            unknown = [dependency for dependency in depends_on if dependency not in self.dependencies]
+            if unknown:
+                raise ValueError(f"{load} depends on unknown loads: {', '.join(unknown)}")
+
+        order = []
+        pending = dict(self.dependencies)
+        while pending:
+            ready = [load for load, depends_on in pending.items() if all(dependency not in pending for dependency in depends_on)]
+            if not ready:
+                raise ValueError(f"The dependencies of the loads have a cycle: {', '.join(pending)}")
+            order.extend(ready)
+            for load in ready:
+                del pending[load]
+        return order
+
+    def run(self, run_load: Callable[[str], None]) -> None:
+        """
+        Run every load. When a load fails no more loads are started, the running ones
+        are awaited and the error is raised.
+
+        Args:
+            run_load (Callable[[str], None]): function that runs a load.
+
+        Returns:
+            None
+        """
+        done = set()
+        pending = list(self.dependencies)
+        running: Dict[Future, str] = {}
+        error = None
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while pending or running:
+                if error is None:
+                    for load in [load for load in pending if all(dependency in done for dependency in self.dependencies[load])]:
+                        if len(running) >= self.workers:
+                            break
+                        pending.remove(load)
+                        running[executor.submit(self.timed, run_load, load)] = load
+
+                if not running:
+                    break
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    load = running.pop(future)
+                    if future.exception() is not None:
+                        logger.error(f"{load} failed: {future.exception()}")
+                        error = error or future.exception()
+                    else:
+                        done.add(load)
+
+        if error is not None:
+            raise error
+        logger.info(f"{len(done)} loads finished in {time.perf_counter() - start:.2f}s")
+
+    @staticmethod
+    def timed(run_load: Callable[[str], None], load: str) -> None:
+        """
+        Run a load and log the time it took.
+
+        Args:
+            run_load (Callable[[str], None]): function that runs a load.
+            load (str): the load.
+
+        Returns:
+            None
+        """
+        start = time.perf_counter()
+        run_load(load)
+        logger.info(f"{load} loaded in {time.perf_counter() - start:.2f}s")
@@ -0,0 +1,162 @@
+import logging
+import os
+import queue
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Batches a load can be mapped ahead of its upload, the mapping of the load waits while its queue is full
+pipeline_depth = int(os.getenv('MIGRATION_PIPELINE_DEPTH', '2'))
+
+# Seconds between the checks of a closed pipeline by a mapping waiting on a full queue
+close_poll_seconds = 0.1
+
+class MappingFailure:
+    """
+    Error raised while mapping a load, passed through its queue to the upload of the load.
+    """
+    def __init__(self, error: BaseException) -> None:
+        """
+        Initialize the failure with the error of the mapping.
+
+        Args:
+            error (BaseException): the error.
+
+        Returns:
+            None
+        """
+        self.error = error
+
+# Marks the end of the batches of a load in its queue
+END = object()
+
+class MappingPipeline:
+    """
+    Maps the loads ahead of their upload: the batches of each load are produced by a thread into
+    a bounded queue, and the upload of the load consumes them. The reports are parsed while other
+    loads are uploaded, and a load is never mapped more than `depth` batches ahead of its upload.
+    """
+    def __init__(self, depth: int = pipeline_depth) -> None:
+        """
+        Initialize the pipeline without loads.
+
+        Args:
+            depth (int): batches a load can be mapped ahead of its upload.
+
+        Returns:
+            None
+        """
+        self.depth = max(1, depth)
+        self.queues: Dict[str, queue.Queue] = {}
+        self.mapped: Dict[str, threading.Event] = {}
+        self.failed: Dict[str, bool] = {}
+        self.closed = threading.Event()
+
+    def start(self, load: str, batches: Callable[[], Iterable[Tuple[str, List[Dict]]]], after: Sequence[str] = ()) -> None:
+        """
+        Start mapping a load.
+
+        Args:
+            load (str): name of the load.
+            batches (Callable[[], Iterable[Tuple[str, List[Dict]]]]): function that maps the load, it returns
+                the name of the mapping and the records of each batch.
+            after (Sequence[str]): loads that must be mapped before this load, they must be started first.
+
+        Returns:
+            None
+        """
+        self.queues[load] = queue.Queue(maxsize=self.depth)
+        self.mapped[load] = threading.Event()
+        thread = threading.Thread(target=self.produce, args=(load, batches, after), name=f'mapping-{load}', daemon=True)
+        thread.start()
+
+    def started(self, load: str) -> bool:
+        """
+        Check if the mapping of a load was started.
+
+        Args:
+            load (str): name of the load.
+
+        Returns:
+            bool: True if the load is in the pipeline.
+        """
+        return load in self.queues
+
+    def produce(self, load: str, batches: Callable[[], Iterable[Tuple[str, List[Dict]]]], after: Sequence[str]) -> None:
+        """
+        Map a load into its queue, run in the thread of the load.
+
+        Args:
+            load (str): name of the load.
+            batches (Callable[[], Iterable[Tuple[str, List[Dict]]]]): function that maps the load.
+            after (Sequence[str]): loads that must be mapped before this load.
+
+        Returns:
+            None
+        """
+        try:
+            for dependency in after:
+                self.mapped[dependency].wait()
+                if self.failed.get(dependency):
+                    raise RuntimeError(f"{load} was not mapped because the mapping of {dependency} failed")
+
+            for item in batches():
+                if not self.put(load, item):
+                    return
+            self.put(load, END)
+        except Exception as e:
+            logger.error(f"Mapping of {load} failed: {e}")
+            self.failed[load] = True
+            self.put(load, MappingFailure(e))
+        finally:
+            self.mapped[load].set()
+
+    def put(self, load: str, item: object) -> bool:
+        """
+        Put an item in the queue of a load, waiting while the queue is full.
+
+        Args:
+            load (str): name of the load.
+            item (object): batch, end or failure of the load.
+
+        Returns:
+            bool: False if the pipeline was closed before the item could be put.
+        """
+        while not self.closed.is_set():
+            try:
+                self.queues[load].put(item, timeout=close_poll_seconds)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def batches(self, load: str) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Get the batches of a load as they are mapped.
+
+        Args:
+            load (str): name of the load, it must be started.
+
+        Raises:
+            Exception: the error of the mapping of the load.
+
+        Returns:
+            Iterator[Tuple[str, List[Dict]]]: The name of the mapping and the records of each batch.
+        """
+        while True:
+            item = self.queues[load].get()
+            if item is END:
+                return
+            if isinstance(item, MappingFailure):
+                raise item.error
+            yield item
+
+    def close(self) -> None:
+        """
+        Stop the mappings still running, the batches not uploaded are discarded.
+
+        Returns:
+            None
+        """
+        self.closed.set()
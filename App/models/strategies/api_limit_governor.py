@@ -0,0 +1,301 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The API usage of the migration is checked against the daily allocations of the org
+api_governor_enabled = os.getenv('MIGRATION_API_GOVERNOR', 'true').lower() == 'true'
+
+# Share of the daily API requests and Bulk API batches of the org that can be used, counting
+# the usage of other integrations. The loads pause before going over it
+api_budget_share = float(os.getenv('MIGRATION_API_BUDGET_SHARE', '0.8'))
+
+# Seconds between the checks of the limits of the org while the loads are paused
+api_pause_seconds = float(os.getenv('MIGRATION_API_PAUSE_SECONDS', '300'))
+
+# Longest pause, then the migration stops and can be resumed from its checkpoint
+api_max_pause_seconds = float(os.getenv('MIGRATION_API_MAX_PAUSE_SECONDS', '3600'))
+
+# Seconds the limits read from the org are trusted, the usage in between is tracked from the responses
+limits_refresh_seconds = 60
+
+# Records of each batch Salesforce creates for a Bulk API 2.0 job, every one counts as a Bulk API batch
+bulk2_batch_records = 10000
+
+# Sforce-Limit-Info header of the REST responses (ex: api-usage=25/15000)
+limit_info_pattern = re.compile(r'api-usage=(\d+)/(\d+)')
+
+class ApiLimitError(Exception):
+    """
+    Error raised when the migration would use more than its share of the daily allocations of the org.
+    """
+
+def parse_limit_info(header: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parse the API usage of the Sforce-Limit-Info header.
+
+    Args:
+        header (Optional[str]): value of the header.
+
+    Returns:
+        Optional[Tuple[int, int]]: The API requests used and the daily maximum, None without the header.
+    """
+    match = limit_info_pattern.search(header or '')
+    if match is None:
+        return None
+    return int(match.group(1)), int(match.group(2))
+
+def bulk2_batches(records: int) -> int:
+    """
+    Get the Bulk API batches used by a Bulk API 2.0 job.
+
+    Args:
+        records (int): records of the job.
+
+    Returns:
+        int: The batches.
+    """
+    return math.ceil(records / bulk2_batch_records)
+
+class DailyLimit:
+    """
+    Usage of a daily allocation of the org.
+    """
+    def __init__(self) -> None:
+        """
+        Initialize the allocation as unknown.
+
+        Returns:
+            None
+        """
+        self.max: Optional[int] = None
+        self.used = 0
+
+    def budget(self, share: float) -> Optional[int]:
+        """
+        Get the part of the allocation that can be used.
+
+        Args:
+            share (float): share of the allocation.
+
+        Returns:
+            Optional[int]: The budget, None if the allocation is unknown.
+        """
+        return None if self.max is None else int(self.max * share)
+
+    def left(self, share: float) -> Optional[int]:
+        """
+        Get what is left of the budget.
+
+        Args:
+            share (float): share of the allocation.
+
+        Returns:
+            Optional[int]: The requests or batches left, None if the allocation is unknown.
+        """
+        budget = self.budget(share)
+        return None if budget is None else max(0, budget - self.used)
+
+class ApiLimitGovernor:
+    """
+    Keeps the migration under a share of the daily API requests and Bulk API batches of the org.
+
+    The allocations and their usage are read from the /limits resource of the org, and the usage
+    is kept up to date between reads with the Sforce-Limit-Info header of the responses (or by
+    counting the responses without it) and the batches the senders reserve. Before the migration
+    starts, its estimated usage is checked against what is left; before each batch is sent, the
+    load pauses while the batch would go over the budget.
+    """
+    def __init__(self, enabled: bool = api_governor_enabled, share: float = api_budget_share,
+                 pause_seconds: float = api_pause_seconds, max_pause_seconds: float = api_max_pause_seconds,
+                 refresh_seconds: float = limits_refresh_seconds, sleep: Callable[[float], None] = time.sleep) -> None:
+        """
+        Initialize the governor without the limits of the org, they are read on the first check.
+
+        Args:
+            enabled (bool): check the usage, a disabled governor only tracks it.
+            share (float): share of the daily allocations that can be used.
+            pause_seconds (float): seconds between the checks of the limits while paused.
+            max_pause_seconds (float): longest pause before stopping the migration.
+            refresh_seconds (float): seconds the limits read from the org are trusted.
+            sleep (Callable[[float], None]): function used to pause.
+
+        Returns:
+            None
+        """
+        self.enabled = enabled
+        self.share = share
+        self.pause_seconds = pause_seconds
+        self.max_pause_seconds = max_pause_seconds
+        self.refresh_seconds = refresh_seconds
+        self.sleep = sleep
+        self.requests = DailyLimit()
+        self.batches = DailyLimit()
+        self.refreshed_at: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def observe_response(self, response: Any, *args, **kwargs) -> Any:
+        """
+        Update the API requests used with a response of Salesforce, registered as a response hook of the HTTP sessions.
+
+        Args:
+            response (requests.Response): the response.
+
+        Returns:
+            requests.Response: The same response.
+        """
+        usage = parse_limit_info(response.headers.get('Sforce-Limit-Info'))
+        with self.lock:
+            if usage is not None:
+                self.requests.used, self.requests.max = usage
+            elif '/services/oauth2/' not in response.url:
+                self.requests.used += 1
+        return response
+
+    def refresh(self, sf: Any) -> bool:
+        """
+        Read the allocations and the usage of the org from the /limits resource.
+
+        Args:
+            sf (Salesforce): The Salesforce connection.
+
+        Returns:
+            bool: True if the limits were read.
+        """
+        try:
+            limits: Dict[str, Dict[str, int]] = sf.limits()
+        except Exception as e:
+            logger.warning(f"The limits of the org could not be read ({e}), the API usage is not checked")
+            return False
+
+        with self.lock:
+            for limit, name in ((self.requests, 'DailyApiRequests'), (self.batches, 'DailyBulkApiBatches')):
+                if name in limits:
+                    limit.max = limits[name]['Max']
+                    limit.used = limits[name]['Max'] - limits[name]['Remaining']
+            self.refreshed_at = time.monotonic()
+        return True
+
+    def is_stale(self) -> bool:
+        """
+        Check if the limits need to be read again.
+
+        Returns:
+            bool: True if they were never read or were read more than `refresh_seconds` ago.
+        """
+        return self.refreshed_at is None or time.monotonic() - self.refreshed_at >= self.refresh_seconds
+
+    def usage(self) -> Dict[str, Optional[int]]:
+        """
+        Get the usage of the allocations.
+
+        Returns:
+            Dict[str, Optional[int]]: The requests and batches used, their daily maximum and what is left of the budget.
+        """
+        with self.lock:
+            return {
+                'requests_used': self.requests.used, 'requests_max': self.requests.max, 'requests_left': self.requests.left(self.share),
+                'batches_used': self.batches.used, 'batches_max': self.batches.max, 'batches_left': self.batches.left(self.share),
+            }
+
+    def fits(self, requests: int, batches: int) -> bool:
+        """
+        Check if some requests and batches fit the budget, unknown allocations are not checked.
+
+        Args:
+            requests (int): API requests.
+            batches (int): Bulk API batches.
+
+        Returns:
+            bool: True if they fit.
+        """
+        requests_left = self.requests.left(self.share)
+        batches_left = self.batches.left(self.share)
+        return (requests_left is None or requests <= requests_left) and (batches_left is None or batches <= batches_left)
+
+    def check_plan(self, sf: Any, requests: int, batches: int) -> None:
+        """
+        Check the estimated usage of the migration against what is left of the budget, before it starts.
+
+        Args:
+            sf (Salesforce): The Salesforce connection.
+            requests (int): API requests the migration is estimated to use.
+            batches (int): Bulk API batches the migration is estimated to use.
+
+        Raises:
+            ApiLimitError: if the migration does not fit the budget.
+
+        Returns:
+            None
+        """
+        if not self.enabled or not self.refresh(sf):
+            return
+        usage = self.usage()
+        logger.info(f"The migration needs about {requests} API requests and {batches} Bulk API batches, "
+                    f"{usage['requests_left']} requests and {usage['batches_left']} batches are left of "
+                    f"{self.share:.0%} of the daily allocations of the org")
+        with self.lock:
+            fits = self.fits(requests, batches)
+        if not fits:
+            raise ApiLimitError(
+                f"The migration needs about {requests} API requests and {batches} Bulk API batches, but only "
+                f"{usage['requests_left']} requests and {usage['batches_left']} batches are left of {self.share:.0%} "
+                f"of the daily allocations of the org ({usage['requests_used']}/{usage['requests_max']} requests and "
+                f"{usage['batches_used']}/{usage['batches_max']} batches used in the last 24 hours)")
+
+    def reserve(self, sf: Any, requests: int, batches: int) -> None:
+        """
+        Wait until a batch fits the budget and count its Bulk API batches as used. The load pauses
+        while the batch does not fit, reading the limits of the org every `pause_seconds`.
+
+        Args:
+            sf (Salesforce): The Salesforce connection.
+            requests (int): API requests the batch is estimated to use.
+            batches (int): Bulk API batches the batch uses.
+
+        Raises:
+            ApiLimitError: if the batch does not fit after `max_pause_seconds`.
+
+        Returns:
+            None
+        """
+        if not self.enabled:
+            with self.lock:
+                self.batches.used += batches
+            return
+
+        paused = 0.0
+        refreshed = False
+        while True:
+            if self.is_stale():
+                refreshed = self.refresh(sf) or refreshed
+            with self.lock:
+                if self.fits(requests, batches):
+                    self.batches.used += batches
+                    if paused:
+                        logger.info(f"The API usage is back under the budget after {paused:.0f} seconds, resuming the load")
+                    return
+            if not refreshed:
+                # The tracked usage may be behind the org, read it before pausing
+                refreshed = self.refresh(sf)
+                if refreshed:
+                    continue
+            if paused >= self.max_pause_seconds:
+                usage = self.usage()
+                raise ApiLimitError(
+                    f"The API usage of the org did not go under {self.share:.0%} of the daily allocations after "
+                    f"{paused:.0f} seconds ({usage['requests_used']}/{usage['requests_max']} requests and "
+                    f"{usage['batches_used']}/{usage['batches_max']} batches used), resume the migration later")
+            logger.warning(f"The next batch ({requests} API requests, {batches} Bulk API batches) would go over "
+                           f"{self.share:.0%} of the daily allocations of the org, pausing for {self.pause_seconds:.0f} seconds")
+            self.sleep(self.pause_seconds)
+            paused += self.pause_seconds
+            refreshed = self.refresh(sf)
+
+# Governor shared by every connection of the process
+api_governor = ApiLimitGovernor()
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Records of the first batches of each object, the size is then tuned from the measured throughput
+batch_start_records = int(os.getenv('MIGRATION_BULK_BATCH_START', '2000'))
+
+# Limits of the batches of the Bulk API: 10,000 records and 10,000,000 characters of JSON
+batch_max_records = int(os.getenv('MIGRATION_BULK_BATCH_MAX_RECORDS', '10000'))
+batch_max_bytes = int(os.getenv('MIGRATION_BULK_BATCH_MAX_BYTES', '10000000'))
+
+# Smallest batch the tuning can reach
+batch_min_records = 50
+
+# Factor applied to the size of the batches of an object at each tuning step
+batch_growth = 1.5
+
+class ObjectBatches:
+    """
+    Batch size of a Salesforce object and the throughput measured with it.
+    """
+    def __init__(self, size: int) -> None:
+        """
+        Initialize the batches of an object.
+
+        Args:
+            size (int): records per batch.
+
+        Returns:
+            None
+        """
+        self.size = size
+        self.direction = 1
+        self.records_per_second: Optional[float] = None
+        # Largest JSON size (with its separator) of the records measured so far
+        self.record_bytes = 1
+
+class BatchPlanner:
+    """
+    Plans the batch size of each Salesforce object. The size respects the record and JSON size limits
+    of a batch for the records being sent, and is tuned during the run: it keeps growing (or shrinking)
+    while the throughput of the object improves, and turns back when it gets worse.
+    """
+    def __init__(self, start_records: int = batch_start_records, max_records: int = batch_max_records,
+                 max_bytes: int = batch_max_bytes) -> None:
+        """
+        Initialize the planner.
+
+        Args:
+            start_records (int): records per batch of the first batches of each object.
+            max_records (int): maximum records per batch.
+            max_bytes (int): maximum characters of JSON per batch.
+
+        Returns:
+            None
+        """
+        self.start_records = start_records
+        self.max_records = max_records
+        self.max_bytes = max_bytes
+        self.objects: Dict[str, ObjectBatches] = {}
+        self.lock = threading.Lock()
+
+    def batch_size(self, object_name: str, data: List[Dict]) -> int:
+        """
+        Get the records per batch to send some records of an object.
+
+        Args:
+            object_name (str): name of the Salesforce object.
+            data (List[Dict]): records to be sent.
+
+        Returns:
+            int: The records per batch, the largest record measured for the object must fit the size limit of a batch.
+        """
+        # Every record is measured, the largest size of the object is kept between batches
+        # 2 characters for the separator of the records in the JSON list
+        data_bytes = max((len(json.dumps(record, default=str)) + 2 for record in data), default=1)
+        with self.lock:
+            batches = self.objects.setdefault(object_name, ObjectBatches(self.start_records))
+            batches.record_bytes = max(batches.record_bytes, data_bytes)
+            size, record_bytes = batches.size, batches.record_bytes
+        return max(1, min(size, self.max_records, self.max_bytes // record_bytes))
+
+    def planned_size(self, object_name: str) -> int:
+        """
+        Get the records per batch planned for an object, without the size limit of its records.
+
+        Args:
+            object_name (str): name of the Salesforce object.
+
+        Returns:
+            int: The records per batch.
+        """
+        with self.lock:
+            batches = self.objects.get(object_name)
+        return min(self.max_records, batches.size if batches is not None else self.start_records)
+
+    def observe(self, object_name: str, records: int, batch_size: int, seconds: float) -> None:
+        """
+        Tune the batch size of an object with the time taken to process some of its records.
+
+        Args:
+            object_name (str): name of the Salesforce object.
+            records (int): number of records processed.
+            batch_size (int): records per batch used.
+            seconds (float): time taken to process the records.
+
+        Returns:
+            None
+        """
+        # With a single batch the batch size did not limit the throughput
+        if seconds <= 0 or records <= batch_size:
+            return
+
+        records_per_second = records / seconds
+        with self.lock:
+            batches = self.objects.setdefault(object_name, ObjectBatches(self.start_records))
+            if batches.records_per_second is not None and records_per_second < batches.records_per_second:
+                batches.direction = -batches.direction
+            batches.records_per_second = records_per_second
+            size = batch_size * batch_growth if batches.direction > 0 else batch_size / batch_growth
+            batches.size = int(min(self.max_records, max(batch_min_records, size)))
+        logger.info(f"{object_name}: {records_per_second:.0f} records/s with batches of {batch_size}, next batches of {batches.size}")
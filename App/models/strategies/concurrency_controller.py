@@ -0,0 +1,84 @@
+import logging
+import os
+import threading
+from typing import Dict, List
+
+logger = logging.getLogger(__name__)
+
+# Status code of the records that could not be upserted because another batch locked their parent
+LOCK_ERROR = 'UNABLE_TO_LOCK_ROW'
+
+# Rate of records of a batch failing with lock errors from which its object is processed serially
+lock_error_rate = float(os.getenv('MIGRATION_LOCK_ERROR_RATE', '0.01'))
+
+# Size of the batches used to retry the records that failed with lock errors
+lock_retry_batch_size = int(os.getenv('MIGRATION_LOCK_RETRY_BATCH_SIZE', '200'))
+
+def is_lock_error(result: Dict) -> bool:
+    """
+    Check if the result of a record is a lock error.
+
+    Args:
+        result (Dict): result of the upsert of a record.
+
+    Returns:
+        bool: True if the record failed because a row was locked.
+    """
+    return not result['success'] and any(error.get('statusCode') == LOCK_ERROR for error in result.get('errors') or [])
+
+class ConcurrencyController:
+    """
+    Chooses the concurrency mode of the batches of each Salesforce object. Objects are processed in
+    parallel until a batch shows lock contention (more than `lock_error_rate` of its records failing
+    with UNABLE_TO_LOCK_ROW), then that object is processed serially for the rest of the run.
+    """
+    def __init__(self, error_rate: float = lock_error_rate, retry_batch_size: int = lock_retry_batch_size) -> None:
+        """
+        Initialize the controller with every object in parallel mode.
+
+        Args:
+            error_rate (float): rate of lock errors of a batch from which its object is processed serially.
+            retry_batch_size (int): size of the batches used to retry the records that failed with lock errors.
+
+        Returns:
+            None
+        """
+        self.error_rate = error_rate
+        self.retry_batch_size = retry_batch_size
+        self.serial_objects: Dict[str, bool] = {}
+        self.records: Dict[str, int] = {}
+        self.lock_errors: Dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    def use_serial(self, object_name: str) -> bool:
+        """
+        Check if the batches of an object must be processed serially.
+
+        Args:
+            object_name (str): name of the Salesforce object.
+
+        Returns:
+            bool: True if the object showed lock contention.
+        """
+        with self.lock:
+            return self.serial_objects.get(object_name, False)
+
+    def record_batch(self, object_name: str, results: List[Dict]) -> List[int]:
+        """
+        Register the results of a batch, and switch its object to serial mode if it contended.
+
+        Args:
+            object_name (str): name of the Salesforce object.
+            results (List[Dict]): results of the upsert of the batch.
+
+        Returns:
+            List[int]: The positions of the records that failed with lock errors.
+        """
+        locked = [position for position, result in enumerate(results) if is_lock_error(result)]
+        with self.lock:
+            self.records[object_name] = self.records.get(object_name, 0) + len(results)
+            self.lock_errors[object_name] = self.lock_errors.get(object_name, 0) + len(locked)
+            if results and len(locked) / len(results) > self.error_rate and not self.serial_objects.get(object_name):
+                self.serial_objects[object_name] = True
+                logger.warning(f"{object_name}: {len(locked)} of {len(results)} records failed with {LOCK_ERROR}, switching to serial mode")
+        return locked
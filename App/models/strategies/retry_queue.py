@@ -0,0 +1,198 @@
+import logging
+import os
+import time
+from typing import Any, Callable, Dict, List, Tuple
+import requests
+from models.strategies.concurrency_controller import lock_retry_batch_size
+
+logger = logging.getLogger(__name__)
+
+# Status codes of the failures that can succeed when the records are sent again
+RETRYABLE_ERRORS = {
+    'UNABLE_TO_LOCK_ROW',
+    'NOT_PROCESSED',
+    'REQUEST_FAILED',
+    'REQUEST_RUNNING_TOO_LONG',
+    'SERVER_UNAVAILABLE',
+    'QUERY_TIMEOUT',
+}
+
+# Messages of the failures that can succeed when the records are sent again, in lowercase
+RETRYABLE_MESSAGES = ('timed out', 'timeout', 'try again')
+
+# Times the retryable records are sent again before their failure is final
+retry_attempts = int(os.getenv('MIGRATION_RETRY_ATTEMPTS', '3'))
+
+# Seconds waited before the first retry, doubled at each retry up to `retry_max_seconds`
+retry_base_seconds = float(os.getenv('MIGRATION_RETRY_BASE_SECONDS', '2'))
+retry_max_seconds = 60.0
+
+# Batches of the first attempt the queue holds before its records are sent again during the load
+retry_queue_batches = int(os.getenv('MIGRATION_RETRY_QUEUE_BATCHES', '10'))
+
+def is_retryable_error(error: Dict[str, Any]) -> bool:
+    """
+    Check if an error of a record is transient.
+
+    Args:
+        error (Dict[str, Any]): error of the result of a record.
+
+    Returns:
+        bool: True if the record can succeed when it is sent again.
+    """
+    message = (error.get('message') or '').lower()
+    return error.get('statusCode') in RETRYABLE_ERRORS or any(text in message for text in RETRYABLE_MESSAGES)
+
+def is_retryable(result: Dict[str, Any]) -> bool:
+    """
+    Check if the failure of a record is retryable, every error of the record must be transient.
+
+    Args:
+        result (Dict[str, Any]): result of the upsert of a record.
+
+    Returns:
+        bool: True if the record failed and can succeed when it is sent again.
+    """
+    errors = result.get('errors') or []
+    return not result['success'] and bool(errors) and all(is_retryable_error(error) for error in errors)
+
+def is_transient_exception(error: Exception) -> bool:
+    """
+    Check if a request failed for a transient reason: a connection error, a timeout or a server error.
+
+    Args:
+        error (Exception): error raised by the request.
+
+    Returns:
+        bool: True if the request can succeed when it is sent again.
+    """
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)):
+        return True
+    status = getattr(error, 'status', None)
+    return isinstance(status, int) and status >= 500
+
+def failed_request_results(count: int, error: Exception) -> List[Dict[str, Any]]:
+    """
+    Get the results of the records of a request that failed as a whole.
+
+    Args:
+        count (int): number of records of the request.
+        error (Exception): error raised by the request.
+
+    Returns:
+        List[Dict[str, Any]]: The result of each record, retryable if the error is transient.
+    """
+    status_code = 'REQUEST_FAILED' if is_transient_exception(error) else 'REQUEST_ERROR'
+    return [
+        {'success': False, 'created': False, 'id': None, 'errors': [{'statusCode': status_code, 'message': str(error), 'fields': []}]}
+        for _ in range(count)
+    ]
+
+class RetryQueue:
+    """
+    Queue of the records that failed with retryable errors. The records are sent again serially, in
+    batches that get smaller at each attempt, waiting exponentially longer between the attempts.
+    The queue is full at `max_batches` batches of the first attempt, and must be drained then.
+    """
+    def __init__(self, max_attempts: int = retry_attempts, batch_size: int = lock_retry_batch_size,
+                 base_seconds: float = retry_base_seconds, max_seconds: float = retry_max_seconds,
+                 sleep: Callable[[float], None] = time.sleep, max_batches: int = retry_queue_batches) -> None:
+        """
+        Initialize an empty queue.
+
+        Args:
+            max_attempts (int): times the records are sent again before their failure is final.
+            batch_size (int): records per batch of the first attempt, halved at each attempt.
+            base_seconds (float): seconds waited before the first attempt.
+            max_seconds (float): maximum seconds waited before an attempt.
+            sleep (Callable[[float], None]): function used to wait.
+            max_batches (int): batches of the first attempt the queue holds before it is full.
+
+        Returns:
+            None
+        """
+        self.max_attempts = max_attempts
+        self.batch_size = max(1, batch_size)
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.sleep = sleep
+        self.max_records = self.batch_size * max(1, max_batches)
+        self.pending: List[Tuple[int, Dict[str, Any], Dict[str, Any]]] = []
+
+    def __len__(self) -> int:
+        return len(self.pending)
+
+    def is_full(self) -> bool:
+        """
+        Check if the queue holds as many records as it should before they are sent again.
+
+        Returns:
+            bool: True if the queue must be drained.
+        """
+        return len(self.pending) >= self.max_records
+
+    def add(self, position: int, record: Dict[str, Any], result: Dict[str, Any]) -> None:
+        """
+        Queue a record that failed with a retryable error.
+
+        Args:
+            position (int): position of the record among the records sent.
+            record (Dict[str, Any]): the record.
+            result (Dict[str, Any]): the failed result of the record.
+
+        Returns:
+            None
+        """
+        self.pending.append((position, record, result))
+
+    def drain(self, upsert: Callable[[List[Dict[str, Any]], int], List[Dict[str, Any]]]) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Send the queued records again until they succeed, fail with a permanent error or run out of attempts.
+
+        Args:
+            upsert (Callable[[List[Dict[str, Any]], int], List[Dict[str, Any]]]): function that upserts
+                some records serially in batches of the given size.
+
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: The position and the final result of each queued record.
+        """
+        pending, self.pending = self.pending, []
+        results = [result for _, _, result in pending]
+        retrying = list(range(len(pending)))
+        batch_size = self.batch_size
+
+        for attempt in range(self.max_attempts):
+            if not retrying:
+                break
+            self.sleep(min(self.max_seconds, self.base_seconds * 2 ** attempt))
+
+            failed = []
+            for start in range(0, len(retrying), batch_size):
+                batch = retrying[start:start + batch_size]
+                try:
+                    batch_results = upsert([pending[index][1] for index in batch], batch_size)
+                except Exception as e:
+                    if not is_transient_exception(e):
+                        logger.error(f"Retry of {len(batch)} records failed: {e}")
+                    batch_results = failed_request_results(len(batch), e)
+                for index, result in zip(batch, batch_results):
+                    results[index] = result
+                    if is_retryable(result):
+                        failed.append(index)
+
+            logger.info(f"Retry {attempt + 1}: {len(retrying) - len(failed)} of {len(retrying)} records done, "
+                        f"{len(failed)} still failing with retryable errors")
+            retrying = failed
+            batch_size = max(1, batch_size // 2)
+
+        return [(position, result) for (position, _, _), result in zip(pending, results)]
+
+    def discard(self) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Empty the queue without sending the records again.
+
+        Returns:
+            List[Tuple[int, Dict[str, Any]]]: The position and the failed result of each queued record.
+        """
+        pending, self.pending = self.pending, []
+        return [(position, result) for position, _, result in pending]
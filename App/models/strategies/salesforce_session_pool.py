@@ -0,0 +1,271 @@
+import logging
+import os
+import threading
+from typing import Dict, Optional, Tuple
+import requests
+from requests.adapters import HTTPAdapter
+from simple_salesforce import Salesforce
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from models.strategies.api_limit_governor import ApiLimitGovernor, api_governor
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Search for the 'App' directory in the path and slice the path up to that directory
+split_path = current_dir.split(os.sep)
+app_index = split_path.index("App")
+base_path = os.sep.join(split_path[:app_index + 1])
+
+# Create the ABS_PATH with a placeholder for future formatting
+ABS_PATH = os.path.join(base_path, "{}")
+
+logger = logging.getLogger(__name__)
+
+# Keep-alive connections kept open per host, at least the loads and batches sent at the same time
+http_pool_size = int(os.getenv('MIGRATION_HTTP_POOL_SIZE', '10'))
+
+# Allow an instance served over plain HTTP (ex: http://127.0.0.1:8765), only for a local fake org
+allow_plain_http = os.getenv('MIGRATION_ALLOW_PLAIN_HTTP', 'false').lower() == 'true'
+
+class ConnectionStats:
+    """
+    Counters of the HTTP requests sent to Salesforce and the connections opened for them.
+    """
+    def __init__(self) -> None:
+        """
+        Initialize the counters at zero.
+
+        Returns:
+            None
+        """
+        self.requests = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+
+    def count_request(self) -> None:
+        """
+        Count a request.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.requests += 1
+
+    def count_connection(self) -> None:
+        """
+        Count a new connection.
+
+        Returns:
+            None
+        """
+        with self.lock:
+            self.connections += 1
+
+    def snapshot(self) -> Dict[str, int]:
+        """
+        Get the counters.
+
+        Returns:
+            Dict[str, int]: The requests, the connections opened and the requests sent on a reused connection.
+        """
+        with self.lock:
+            return {
+                'requests': self.requests,
+                'connections': self.connections,
+                'reused': max(0, self.requests - self.connections),
+            }
+
+def counting_pool(pool_class: type, stats: ConnectionStats) -> type:
+    """
+    Create a urllib3 connection pool class that counts the connections it opens.
+
+    Args:
+        pool_class (type): HTTPConnectionPool or HTTPSConnectionPool.
+        stats (ConnectionStats): counters of the connections.
+
+    Returns:
+        type: The subclass of the pool class.
+    """
+    class CountingConnectionPool(pool_class):
+        def _new_conn(self):
+            stats.count_connection()
+            return super()._new_conn()
+
+    return CountingConnectionPool
+
+class CountingAdapter(HTTPAdapter):
+    """
+    HTTP adapter with keep-alive connection pools that counts the requests and the connections opened.
+    """
+    def __init__(self, stats: ConnectionStats, pool_size: int) -> None:
+        """
+        Initialize the adapter.
+
+        Args:
+            stats (ConnectionStats): counters of the requests and the connections.
+            pool_size (int): connections kept open per host.
+
+        Returns:
+            None
+        """
+        self.stats = stats
+        super().__init__(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': counting_pool(HTTPConnectionPool, self.stats),
+            'https': counting_pool(HTTPSConnectionPool, self.stats),
+        }
+
+    def send(self, request, *args, **kwargs):
+        self.stats.count_request()
+        return super().send(request, *args, **kwargs)
+
+class PlainHttpAdapter(CountingAdapter):
+    """
+    Counting adapter that sends over plain HTTP the https:// requests of simple_salesforce,
+    mounted only for an instance served over HTTP when plain HTTP is allowed, like the local
+    fake org of the benchmarks.
+    """
+    def send(self, request, *args, **kwargs):
+        if request.url.startswith('https://'):
+            request.url = 'http://' + request.url[len('https://'):]
+        return super().send(request, *args, **kwargs)
+
+class SalesforceSessionPool:
+    """
+    Process-wide pool of the connections to Salesforce. Every strategy gets the same Salesforce
+    client, which sends its requests through a thread-safe HTTP session with keep-alive connections.
+
+    The instance and token files are read again only when they change, and a forked process
+    builds its own client instead of sharing the sockets of its parent. Every response updates
+    the API usage tracked by the governor of the pool.
+    """
+    def __init__(self, pool_size: int = http_pool_size, instance_path: str = ABS_PATH.format('data/salesforce_instance.txt'),
+                 token_path: str = ABS_PATH.format('data/salesforce_token.txt'), governor: Optional[ApiLimitGovernor] = None,
+                 allow_plain_http: bool = allow_plain_http) -> None:
+        """
+        Initialize the pool without a client.
+
+        Args:
+            pool_size (int): keep-alive connections kept open per host.
+            instance_path (str): path of the file with the Salesforce instance.
+            token_path (str): path of the file with the Salesforce access token.
+            governor (Optional[ApiLimitGovernor]): governor of the API usage, the governor of the process by default.
+            allow_plain_http (bool): allow an instance served over plain HTTP, like a local fake org.
+
+        Returns:
+            None
+        """
+        self.pool_size = pool_size
+        self.governor = governor or api_governor
+        self.allow_plain_http = allow_plain_http
+        self.instance_path = instance_path
+        self.token_path = token_path
+        self.stats = ConnectionStats()
+        self.lock = threading.Lock()
+        self.key: Optional[Tuple] = None
+        self.pid: Optional[int] = None
+        self.instance = ''
+        self.access_token = ''
+        self.sf: Optional[Salesforce] = None
+        self.clients_created = 0
+
+    def files_key(self) -> Tuple:
+        """
+        Get the version of the instance and token files, without reading them.
+
+        Returns:
+            Tuple: The modification time and size of the files.
+        """
+        key = []
+        for path in (self.instance_path, self.token_path):
+            stat = os.stat(path)
+            key.append((stat.st_mtime_ns, stat.st_size))
+        return tuple(key)
+
+    def read_instance(self) -> str:
+        """
+        Read the Salesforce instance from a file.
+
+        Raises:
+            ValueError: if the instance is served over plain HTTP and plain HTTP is not allowed.
+
+        Returns:
+            str: The Salesforce instance, without the https scheme. An instance served over plain
+            HTTP (ex: http://127.0.0.1:8765, a local fake org) keeps its http:// scheme.
+        """
+        with open(self.instance_path, 'r') as f:
+            instance: str = f.read().strip()
+
+        if 'https://' in instance:
+            instance = instance.split('https://')[1]
+        elif instance.startswith('http://') and not self.allow_plain_http:
+            raise ValueError(f"The Salesforce instance {instance} is served over plain HTTP, "
+                             f"set MIGRATION_ALLOW_PLAIN_HTTP=true to use a local fake org")
+
+        return instance.rstrip('/')
+
+    def read_access_token(self) -> str:
+        """
+        Read the Salesforce access token from a file.
+
+        Returns:
+            str: The Salesforce access token.
+        """
+        with open(self.token_path, 'r') as f:
+            return f.read().strip()
+
+    def new_session(self, plain_http_host: Optional[str] = None) -> requests.Session:
+        """
+        Create an HTTP session with keep-alive connection pools.
+
+        Args:
+            plain_http_host (Optional[str]): host whose https:// requests are sent over plain HTTP.
+
+        Returns:
+            requests.Session: The session.
+        """
+        session = requests.Session()
+        session.hooks['response'].append(self.governor.observe_response)
+        adapter = CountingAdapter(self.stats, self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if plain_http_host:
+            session.mount(f'https://{plain_http_host}/', PlainHttpAdapter(self.stats, self.pool_size))
+        return session
+
+    def client(self) -> Salesforce:
+        """
+        Get the shared Salesforce client, created the first time or when the instance or token changed.
+
+        Returns:
+            Salesforce: An instance of the Salesforce class from the simple_salesforce library.
+        """
+        key = self.files_key()
+        with self.lock:
+            if self.sf is None or key != self.key or os.getpid() != self.pid:
+                self.instance = self.read_instance()
+                self.access_token = self.read_access_token()
+                host = self.instance[len('http://'):] if self.instance.startswith('http://') else self.instance
+                plain_http_host = host if host != self.instance else None
+                self.sf = Salesforce(instance=host, session_id=self.access_token, session=self.new_session(plain_http_host))
+                self.key = key
+                self.pid = os.getpid()
+                self.clients_created += 1
+            return self.sf
+
+    def log_stats(self) -> None:
+        """
+        Log the reuse of the connections.
+
+        Returns:
+            None
+        """
+        stats = self.stats.snapshot()
+        logger.info(f"Salesforce connections: {stats['requests']} requests on {stats['connections']} connections "
+                    f"({stats['reused']} reused), {self.clients_created} clients created")
+
+# Pool shared by every SalesforceStrategy of the process
+session_pool = SalesforceSessionPool()
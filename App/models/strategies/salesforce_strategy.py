@@ -1,10 +1,26 @@
 from abc import ABC, abstractmethod
+from collections import deque
 import csv
 import io
+import json
+import math
 import os
 import logging
+import sys
+import tempfile
+import time
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
 from simple_salesforce import Salesforce
-from typing import Dict, List
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from models.strategies.concurrency_controller import ConcurrencyController
+from models.strategies.batch_planner import BatchPlanner
+from models.strategies.retry_queue import RetryQueue, failed_request_results, is_retryable, is_transient_exception
+from models.strategies.salesforce_session_pool import SalesforceSessionPool, session_pool
+from models.strategies.api_limit_governor import ApiLimitGovernor, api_governor, bulk2_batches
+from models.cache.metadata_cache import MetadataCache, metadata_cache
+from models.cache.checkpoint_store import CheckpointStore
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 
@@ -23,6 +39,39 @@ logging.basicConfig(level=logging.INFO,
 
 logger = logging.getLogger(__name__)
 
+# Bulk API used to upsert the records: 1 sends JSON batches processed serially, 2 streams CSV into Bulk API 2.0 jobs
+bulk_api_version = os.getenv('MIGRATION_BULK_API', '1')
+
+# Maximum size of the CSV of a Bulk API 2.0 job. Salesforce accepts 150MB per job once base64 encoded,
+# which is 100MB of CSV, and simple_salesforce keeps 1MB of margin
+bulk2_job_bytes = int(os.getenv('MIGRATION_BULK2_JOB_BYTES', 99 * 1024 * 1024))
+
+# Seconds between the checks of the state of a Bulk API 2.0 job
+bulk2_poll_seconds = 1
+
+# Batches of up to this many records are upserted with the sObject Collections API instead of a Bulk API job, 0 always uses the Bulk API
+collections_max_records = int(os.getenv('MIGRATION_COLLECTIONS_MAX_RECORDS', '2000'))
+
+# Records per sObject Collections request, the limit of the API
+collections_request_records = 200
+
+# sObject Collections requests of a batch sent at the same time
+collections_workers = int(os.getenv('MIGRATION_COLLECTIONS_WORKERS', '4'))
+
+# Contacts whose account is queried per SOQL query, 500 ids keep the query under the URL length limit
+account_lookup_chunk = int(os.getenv('MIGRATION_ACCOUNT_LOOKUP_CHUNK', '500'))
+
+# SOQL queries of the accounts of the contacts sent at the same time
+account_lookup_workers = int(os.getenv('MIGRATION_ACCOUNT_LOOKUP_WORKERS', '4'))
+
+# Records per page of the Bulk API 2.0 query of the accounts of every contact, a page is parsed at a time
+account_query_page_records = 50000
+
+# API requests of the migration besides the loads and the lookups (metadata, record types)
+overhead_requests = 10
+
+# Encoder of the lines of the response logs, compact and reused by every batch
+results_encoder = json.JSONEncoder(separators=(',', ':'), default=str)
 
 class DataStrategy(ABC):
     """
@@ -45,54 +94,671 @@ class DataStrategy(ABC):
         """
         pass
 
-class SalesforceStrategy(DataStrategy):
+class BulkUpsertSender:
     """
-    A data strategy implementation for sending data to Salesforce using the Bulk API.
+    Upserts the batches of records of one Salesforce object with the Bulk API, appending the
+    results of each batch to the response log of the object as soon as it completes.
+
+    Batches are processed in parallel by Salesforce unless the object showed lock contention, and
+    the records that fail with lock errors are retried serially in smaller batches. The size of the
+    batches is planned from the size of the records and tuned with the time taken by each send.
+    """
+    def __init__(self, sf: Salesforce, object_name: str, principal_object: str, object: str, external_id: str,
+                 controller: Optional[ConcurrencyController] = None, planner: Optional[BatchPlanner] = None,
+                 checkpoint: Optional[CheckpointStore] = None, governor: Optional[ApiLimitGovernor] = None) -> None:
+        """
+        Initialize the sender of an object.
+
+        Args:
+            sf (Salesforce): The Salesforce connection.
+            object_name (str): The name of the Salesforce object to which data will be sent.
+            principal_object (str): The name of the principal object (contact/organization/households) for report.
+            object(str): name of the object to be sent to salesforce (ex: address of organization)
+            external_id (str): The external ID field to be used for upserting the data.
+            controller (Optional[ConcurrencyController]): concurrency mode of the objects, shared by the senders of a run.
+            planner (Optional[BatchPlanner]): batch size of the objects, shared by the senders of a run.
+            checkpoint (Optional[CheckpointStore]): progress of the run, the batches it confirmed are not sent again.
+            governor (Optional[ApiLimitGovernor]): governor of the API usage, each batch waits until it fits the budget.
+
+        Returns:
+            None
+        """
+        self.sf = sf
+        self.governor = governor
+        self.controller = controller or ConcurrencyController()
+        self.planner = planner or BatchPlanner()
+        self.object_name = object_name
+        self.external_id = external_id
+        self.log_path = ABS_PATH.format(f'logs/{principal_object}_{object}_response.jsonl')
+        self.log_file = None
+        self.records_sent = 0
+        self.retries = RetryQueue(batch_size=self.controller.retry_batch_size)
+        self.checkpoint = checkpoint
+        self.load = f'{principal_object}_{object}'
+        self.batches_sent = 0
+        # Batches with records queued to retry, logged and confirmed by `drain_retries`:
+        # {batch: (first position, records, ids, results of the records not queued)}
+        self.unconfirmed: Dict[int, Tuple[int, int, List[str], List[Dict[str, str]]]] = {}
+        # Results of the records retried during the load because the retry queue was full
+        self.retried: List[Tuple[int, Dict[str, str]]] = []
+
+    def send(self, data: List[Dict[str, any]]) -> List[Dict[str, str]]:
+        """
+        Upsert a batch of records and append its results to the response log. The records that
+        failed with retryable errors are queued, the results of their batch are logged by `drain_retries`,
+        or as soon as the retry queue is full.
+
+        Args:
+            data (List[Dict[str, any]]): The records to be sent to Salesforce.
+
+        Returns:
+            List[Dict[str, str]]: The results of the upsert, or the results of the successful records
+            if the batch was confirmed by the checkpoint of a previous run.
+        """
+        batch = self.batches_sent
+        self.batches_sent += 1
+        if self.checkpoint is not None and self.checkpoint.is_confirmed(self.load, batch):
+            self.records_sent += len(data)
+            return [self.confirmed_result(record_id) for record_id in self.checkpoint.confirmed_ids(self.load, batch)]
+        if self.governor is not None:
+            self.governor.reserve(self.sf, *self.estimated_usage(len(data), self.planner.planned_size(self.object_name)))
+        if self.checkpoint is not None:
+            self.checkpoint.submit(self.load, batch, len(data))
+
+        try:
+            if 0 < len(data) <= collections_max_records:
+                results = self.upsert_collections(data)
+            else:
+                results = self.upsert(data)
+        except Exception as e:
+            if not is_transient_exception(e):
+                raise
+            logger.warning(f"{self.object_name}: upsert of {len(data)} records failed ({e}), queued to retry")
+            results = failed_request_results(len(data), e)
+
+        locked = self.controller.record_batch(self.object_name, results)
+        if locked:
+            self.retry_locked(data, results, locked)
+
+        logged = []
+        queued = len(self.retries)
+        for position, (record, result) in enumerate(zip(data, results)):
+            if is_retryable(result):
+                self.retries.add(self.records_sent + position, record, result)
+            else:
+                logged.append(result)
+
+        ids = [result['id'] for result in results if result['success']]
+        if len(self.retries) > queued:
+            # The log only has the results of confirmed batches, so a resumed run can cut it back
+            self.unconfirmed[batch] = (self.records_sent, len(data), ids, logged)
+        else:
+            self._write_results(logged)
+            self._confirm(batch, ids)
+        self.records_sent += len(data)
+        if self.retries.is_full():
+            self.retried.extend(self._drain())
+        return results
+
+    @classmethod
+    def estimated_usage(cls, records: int, batch_size: int) -> Tuple[int, int]:
+        """
+        Estimate the API requests and the Bulk API batches used to upsert some records.
+
+        Args:
+            records (int): number of records.
+            batch_size (int): records per batch of the Bulk API.
+
+        Returns:
+            Tuple[int, int]: The API requests and the Bulk API batches.
+        """
+        if 0 < records <= collections_max_records:
+            return math.ceil(records / collections_request_records), 0
+        return cls.bulk_usage(records, batch_size)
+
+    @staticmethod
+    def bulk_usage(records: int, batch_size: int) -> Tuple[int, int]:
+        """
+        Estimate the API requests and the Bulk API batches of a Bulk API job: the job is created and
+        closed, and each batch is added, checked at least once and its results downloaded.
+
+        Args:
+            records (int): number of records.
+            batch_size (int): records per batch.
+
+        Returns:
+            Tuple[int, int]: The API requests and the Bulk API batches.
+        """
+        batches = math.ceil(records / batch_size)
+        return 2 + 3 * batches, batches
+
+    @staticmethod
+    def confirmed_result(record_id: str) -> Dict[str, Any]:
+        """
+        Get the result of a record upserted successfully by a previous run.
+
+        Args:
+            record_id (str): The id of the record.
+
+        Returns:
+            Dict[str, Any]: The result of the record.
+        """
+        return {'success': True, 'created': False, 'id': record_id, 'errors': []}
+
+    def drain_retries(self) -> List[Tuple[int, Dict[str, str]]]:
+        """
+        Send again the records that failed with retryable errors and append their final results to the response log.
+
+        Returns:
+            List[Tuple[int, Dict[str, str]]]: The position among the records sent and the final result of each
+            retried record, with the records retried during the load.
+        """
+        retried, self.retried = self.retried + self._drain(), []
+        return retried
+
+    def _drain(self) -> List[Tuple[int, Dict[str, str]]]:
+        """
+        Send again the records of the retry queue, then log and confirm the batches waiting for them.
+
+        Returns:
+            List[Tuple[int, Dict[str, str]]]: The position among the records sent and the final result of each retried record.
+        """
+        if not self.retries:
+            return []
+        logger.info(f"{self.object_name}: retrying {len(self.retries)} records that failed with retryable errors")
+        retried = self.retries.drain(self.upsert_serial)
+        self._write_unconfirmed(retried, confirm=True)
+        return retried
+
+    def _write_unconfirmed(self, retried: List[Tuple[int, Dict[str, str]]], confirm: bool) -> None:
+        """
+        Append the results of the batches waiting for their queued records to the response log, a batch at a time.
+
+        Args:
+            retried (List[Tuple[int, Dict[str, str]]]): position and result of the queued records, in the order of the positions.
+            confirm (bool): the results are final, each batch is confirmed after its results are logged.
+
+        Returns:
+            None
+        """
+        positions = [position for position, _ in retried]
+        for batch, (start, count, ids, logged) in sorted(self.unconfirmed.items()):
+            batch_results = [result for _, result in retried[bisect_left(positions, start):bisect_left(positions, start + count)]]
+            self._write_results(logged + batch_results)
+            if confirm:
+                ids.extend(result['id'] for result in batch_results if result['success'])
+                self._confirm(batch, ids)
+        self.unconfirmed.clear()
+
+    def _confirm(self, batch: int, ids: List[str]) -> None:
+        """
+        Confirm a batch in the checkpoint with the size of the response log, which ends with the results of the batch.
+
+        Args:
+            batch (int): position of the batch in the load.
+            ids (List[str]): ids of the records of the batch upserted successfully.
+
+        Returns:
+            None
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.confirm(self.load, batch, ids, self.log_file.tell())
+
+    def finish(self) -> None:
+        """
+        Record in the checkpoint that every batch of the object was sent, after `drain_retries`.
+
+        Returns:
+            None
+        """
+        if self.checkpoint is not None:
+            self.checkpoint.finish(self.load)
+
+    def upsert(self, data: List[Dict[str, any]]) -> List[Dict[str, str]]:
+        """
+        Upsert a batch of records with the Bulk API, in parallel unless the object showed lock contention,
+        in batches of the size planned for the object.
+
+        Args:
+            data (List[Dict[str, any]]): The records to be sent to Salesforce.
+
+        Returns:
+            List[Dict[str, str]]: The result of each record.
+        """
+        batch_size = self.planner.batch_size(self.object_name, data)
+        start = time.perf_counter()
+        results = self.sf.bulk.__getattr__(self.object_name).upsert(
+            data,
+            self.external_id,
+            batch_size=batch_size,
+            use_serial=self.controller.use_serial(self.object_name)
+        )
+        self.planner.observe(self.object_name, len(data), batch_size, time.perf_counter() - start)
+        return results
+
+    def upsert_collections(self, data: List[Dict[str, any]]) -> List[Dict[str, str]]:
+        """
+        Upsert a small batch of records with sObject Collections requests, sent in parallel unless
+        the object showed lock contention. The batch is sent with the Bulk API if a request fails.
+
+        Args:
+            data (List[Dict[str, any]]): The records to be sent to Salesforce.
+
+        Returns:
+            List[Dict[str, str]]: The result of each record, like the results of the Bulk API.
+        """
+        chunks = [data[start:start + collections_request_records] for start in range(0, len(data), collections_request_records)]
+        workers = 1 if self.controller.use_serial(self.object_name) else collections_workers
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                chunk_results = list(executor.map(self.upsert_collection, chunks))
+        except Exception as e:
+            logger.warning(f"{self.object_name}: sObject Collections upsert failed ({e}), sending the batch with the Bulk API")
+            return self.upsert(data)
+        return [result for results in chunk_results for result in results]
+
+    def upsert_collection(self, data: List[Dict[str, any]]) -> List[Dict[str, str]]:
+        """
+        Upsert up to `collections_request_records` records with a single sObject Collections request.
+
+        Args:
+            data (List[Dict[str, any]]): The records to be sent to Salesforce.
+
+        Returns:
+            List[Dict[str, str]]: The result of each record, like the results of the Bulk API.
+        """
+        records = [{'attributes': {'type': self.object_name}, **record} for record in data]
+        response = self.sf.restful(f'composite/sobjects/{self.object_name}/{self.external_id}', method='PATCH',
+                                   json={'allOrNone': False, 'records': records})
+        if len(response) != len(data):
+            raise ValueError(f"{len(response)} results for {len(data)} records")
+        return [self.collection_result(result) for result in response]
+
+    @staticmethod
+    def collection_result(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert the result of a record of an sObject Collections request to a result of the Bulk API.
+
+        Args:
+            result (Dict[str, Any]): The result of the record.
+
+        Returns:
+            Dict[str, Any]: The result of the record, like the results of the Bulk API.
+        """
+        errors = [
+            {'statusCode': error.get('statusCode'), 'message': error.get('message'), 'fields': error.get('fields', [])}
+            for error in result.get('errors') or []
+        ]
+        return {'success': result['success'], 'created': result.get('created', False), 'id': result.get('id'), 'errors': errors}
+
+    def retry_locked(self, data: List[Dict[str, any]], results: List[Dict[str, str]], locked: List[int]) -> None:
+        """
+        Retry serially, in smaller batches, the records that failed with lock errors.
+
+        Args:
+            data (List[Dict[str, any]]): The records of the batch.
+            results (List[Dict[str, str]]): The results of the batch, updated with the results of the retry.
+            locked (List[int]): The positions of the records that failed with lock errors.
+
+        Returns:
+            None
+        """
+        logger.info(f"{self.object_name}: retrying {len(locked)} records locked by other batches")
+        retry_results = self.upsert_serial([data[position] for position in locked], self.controller.retry_batch_size)
+        for position, result in zip(locked, retry_results):
+            results[position] = result
+
+    def upsert_serial(self, data: List[Dict[str, any]], batch_size: int) -> List[Dict[str, str]]:
+        """
+        Upsert some records with the Bulk API in serial mode.
+
+        Args:
+            data (List[Dict[str, any]]): The records to be sent to Salesforce.
+            batch_size (int): records per batch.
+
+        Returns:
+            List[Dict[str, str]]: The result of each record.
+        """
+        if self.governor is not None:
+            self.governor.reserve(self.sf, *BulkUpsertSender.bulk_usage(len(data), batch_size))
+        return self.sf.bulk.__getattr__(self.object_name).upsert(
+            data,
+            self.external_id,
+            batch_size=batch_size,
+            use_serial=True
+        )
+
+    def _write_results(self, results: List[Dict[str, str]]) -> None:
+        """
+        Append the results of a batch to the response log, a JSON object per line.
+
+        Args:
+            results (List[Dict[str, str]]): The results of the upsert.
+
+        Returns:
+            None
+        """
+        if self.log_file is None:
+            self._open_log()
+        if not results:
+            return
+        self.log_file.write(''.join(results_encoder.encode(result) + '\n' for result in results).encode('utf-8'))
+        self.log_file.flush()
+
+    def _open_log(self) -> None:
+        """
+        Open the response log. When a previous run confirmed batches of the object, its log is
+        continued instead of replaced, cut back to the end of the results of its last confirmed
+        batch, so the batches sent again are not logged twice.
+
+        Returns:
+            None
+        """
+        if self.checkpoint is not None and self.checkpoint.is_started(self.load) and os.path.exists(self.log_path):
+            log_offset = self.checkpoint.log_offset(self.load)
+            if os.path.getsize(self.log_path) > log_offset:
+                logger.info(f"{self.log_path}: removing the results logged after the last confirmed batch")
+                os.truncate(self.log_path, log_offset)
+            self.log_file = open(self.log_path, 'ab')
+            return
+
+        self.log_file = open(self.log_path, 'wb')
+
+    def close(self) -> None:
+        """
+        Close the response log. The records still queued to retry are logged with their failed results.
+
+        Returns:
+            None
+        """
+        if self.retries:
+            self._write_unconfirmed(self.retries.discard(), confirm=False)
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+    def __enter__(self) -> 'BulkUpsertSender':
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+class Bulk2UpsertSender(BulkUpsertSender):
     """
-    def __init__(self) -> None:
+    Upserts the batches of records of one Salesforce object with the Bulk API 2.0. The records are
+    written as CSV into jobs of at most `bulk2_job_bytes`, uploaded one after another, and the CSV
+    results of the jobs are converted to the results of the Bulk API, in the order of the records.
+    """
+    def upsert(self, data: List[Dict[str, any]]) -> List[Dict[str, str]]:
+        """
+        Upsert a batch of records with Bulk API 2.0 jobs.
+
+        Args:
+            data (List[Dict[str, any]]): The records to be sent to Salesforce.
+
+        Returns:
+            List[Dict[str, str]]: The result of each record, like the results of the Bulk API.
+        """
+        bulk2 = getattr(self.sf.bulk2, self.object_name)
+        columns = self.csv_columns(data)
+        results: Dict[str, Deque[Dict[str, Any]]] = {}
+        for job_file in self.write_jobs(data, columns):
+            try:
+                for job in bulk2.upsert(csv_file=job_file, external_id_field=self.external_id, wait=bulk2_poll_seconds):
+                    logger.info(f"{self.object_name} job {job['job_id']}: {job['numberRecordsProcessed']} records processed, {job['numberRecordsFailed']} failed")
+                    self.read_job_results(bulk2, job['job_id'], results)
+            finally:
+                os.remove(job_file)
+
+        return [self.record_result(record, results) for record in data]
+
+    @staticmethod
+    def bulk_usage(records: int, batch_size: int) -> Tuple[int, int]:
+        """
+        Estimate the API requests and the Bulk API batches of a Bulk API 2.0 job: the job is created,
+        uploaded, closed and checked, and its three kinds of results downloaded. Salesforce splits
+        the job in batches of `bulk2_batch_records`, whatever the planned batch size.
+
+        Args:
+            records (int): number of records.
+            batch_size (int): records per batch, not used by the Bulk API 2.0.
+
+        Returns:
+            Tuple[int, int]: The API requests and the Bulk API batches.
+        """
+        return 8, bulk2_batches(records)
+
+    @staticmethod
+    def csv_columns(data: List[Dict[str, any]]) -> List[str]:
+        """
+        Get the CSV columns of the records, relationships are referenced by external id (ex: vnfp__Account__r.Auctifera__Implementation_External_ID__c).
+
+        Args:
+            data (List[Dict[str, any]]): The records.
+
+        Returns:
+            List[str]: The columns of every field of the records, in order of appearance.
+        """
+        columns = {}
+        for record in data:
+            for field, value in record.items():
+                if isinstance(value, dict):
+                    for related_field in value:
+                        columns[f'{field}.{related_field}'] = None
+                else:
+                    columns[field] = None
+        return list(columns)
+
+    @staticmethod
+    def csv_value(value: any) -> str:
+        """
+        Format a value of a record for the CSV of a job.
+
+        Args:
+            value (any): The value of a field.
+
+        Returns:
+            str: The value in the CSV, fields without value are left empty so they are not changed.
+        """
+        if value is None:
+            return ''
+        if isinstance(value, bool):
+            return 'true' if value else 'false'
+        return str(value)
+
+    def csv_row(self, record: Dict[str, any], columns: List[str]) -> List[str]:
+        """
+        Get the CSV row of a record.
+
+        Args:
+            record (Dict[str, any]): The record.
+            columns (List[str]): The columns of the CSV.
+
+        Returns:
+            List[str]: The values of the record in the columns.
+        """
+        fields = {}
+        for field, value in record.items():
+            if isinstance(value, dict):
+                for related_field, related_value in value.items():
+                    fields[f'{field}.{related_field}'] = related_value
+            else:
+                fields[field] = value
+        return [self.csv_value(fields.get(column)) for column in columns]
+
+    def write_jobs(self, data: List[Dict[str, any]], columns: List[str]) -> Iterator[str]:
+        """
+        Write the records as CSV files of at most `bulk2_job_bytes`, one per job. Each file is
+        written when the previous one was uploaded, so only one of them is on disk at a time.
+
+        Args:
+            data (List[Dict[str, any]]): The records.
+            columns (List[str]): The columns of the CSV.
+
+        Returns:
+            Iterator[str]: The path of the CSV file of each job, removed by the caller.
+        """
+        line = io.StringIO()
+        writer = csv.writer(line, lineterminator='\n')
+
+        def render(row: List[str]) -> str:
+            line.seek(0)
+            line.truncate()
+            writer.writerow(row)
+            return line.getvalue()
+
+        header = render(columns)
+        job_file = None
+        job_bytes = 0
+        try:
+            for record in data:
+                text = render(self.csv_row(record, columns))
+                size = len(text.encode('utf-8'))
+                if job_file is not None and job_bytes + size > bulk2_job_bytes:
+                    job_file.close()
+                    path, job_file = job_file.name, None
+                    yield path
+
+                if job_file is None:
+                    job_file = tempfile.NamedTemporaryFile('w', encoding='utf-8', newline='', suffix='.csv', delete=False)
+                    job_file.write(header)
+                    job_bytes = len(header.encode('utf-8'))
+
+                job_file.write(text)
+                job_bytes += size
+
+            if job_file is not None:
+                job_file.close()
+                path, job_file = job_file.name, None
+                yield path
+        finally:
+            if job_file is not None:
+                job_file.close()
+                os.remove(job_file.name)
+
+    def read_job_results(self, bulk2: Any, job_id: str, results: Dict[str, Deque[Dict[str, Any]]]) -> None:
         """
-        Initialize the SalesforceStrategy instance. Reads the Salesforce token and initializes the Salesforce connection.
+        Download the successful, failed and unprocessed records of a job, and keep their results by external id.
+
+        Args:
+            bulk2 (Any): The Bulk API 2.0 interface of the object.
+            job_id (str): The id of the job.
+            results (Dict[str, Deque[Dict[str, Any]]]): The results of each external id, updated with the job.
+
+        Returns:
+            None
         """
-        self.token: str = self._read_token()
-        self.access_token: str = self._read_access_token()
-        self.sf: Salesforce = self._initialize_salesforce()
+        downloads = [
+            (bulk2.get_successful_records, self.successful_result),
+            (bulk2.get_failed_records, self.failed_result),
+            (bulk2.get_unprocessed_records, self.unprocessed_result),
+        ]
+        for download, to_result in downloads:
+            with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as results_file:
+                path = results_file.name
+            try:
+                download(job_id, file=path)
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    for row in csv.DictReader(f):
+                        results.setdefault(row.get(self.external_id, ''), deque()).append(to_result(row))
+            finally:
+                os.remove(path)
 
-    def _read_token(self) -> str:
+    @staticmethod
+    def successful_result(row: Dict[str, str]) -> Dict[str, Any]:
         """
-        Read the Salesforce instance token from a file.
+        Get the result of a successful record of a job.
+
+        Args:
+            row (Dict[str, str]): The row of the record in the successful results.
 
         Returns:
-            str: The Salesforce instance token.
+            Dict[str, Any]: The result of the record.
         """
-        with open(ABS_PATH.format('data/salesforce_instance.txt'), 'r') as f:
-            instance: str = f.read().strip()
+        return {'success': True, 'created': row['sf__Created'] == 'true', 'id': row['sf__Id'], 'errors': []}
 
-        if 'https://' in instance:
-            instance = instance.split('https://')[1]
+    @staticmethod
+    def failed_result(row: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Get the result of a failed record of a job, the errors come like STATUS_CODE:message.
 
-        return instance
+        Args:
+            row (Dict[str, str]): The row of the record in the failed results.
 
-    def _read_access_token(self) -> str:
+        Returns:
+            Dict[str, Any]: The result of the record.
+        """
+        status_code, _, message = row['sf__Error'].partition(':')
+        error = {'statusCode': status_code, 'message': message, 'fields': []}
+        return {'success': False, 'created': False, 'id': row.get('sf__Id') or None, 'errors': [error]}
+
+    @staticmethod
+    def unprocessed_result(row: Dict[str, str]) -> Dict[str, Any]:
         """
-        Read the Salesforce access token from a file.
+        Get the result of a record that was not processed because its job failed or was aborted.
+
+        Args:
+            row (Dict[str, str]): The row of the record in the unprocessed results.
 
         Returns:
-            str: The Salesforce access token.
+            Dict[str, Any]: The result of the record.
+        """
+        error = {'statusCode': 'NOT_PROCESSED', 'message': 'The job ended before the record was processed', 'fields': []}
+        return {'success': False, 'created': False, 'id': None, 'errors': [error]}
 
+    def record_result(self, record: Dict[str, any], results: Dict[str, Deque[Dict[str, Any]]]) -> Dict[str, Any]:
         """
-        with open(ABS_PATH.format('data/salesforce_token.txt'), 'r') as f:
-            return f.read().strip()
+        Get the result of a record, records with the same external id take their results in order.
 
-    def _initialize_salesforce(self) -> Salesforce:
+        Args:
+            record (Dict[str, any]): The record.
+            results (Dict[str, Deque[Dict[str, Any]]]): The results of each external id.
+
+        Returns:
+            Dict[str, Any]: The result of the record.
         """
-        Initialize the Salesforce connection using the instance token and access token.
+        queue = results.get(self.csv_value(record.get(self.external_id)))
+        if queue:
+            return queue.popleft()
+        error = {'statusCode': 'NOT_PROCESSED', 'message': 'The record is not in the results of its job', 'fields': []}
+        return {'success': False, 'created': False, 'id': None, 'errors': [error]}
+
+class SalesforceStrategy(DataStrategy):
+    """
+    A data strategy implementation for sending data to Salesforce using the Bulk API.
+    """
+    def __init__(self, pool: Optional[SalesforceSessionPool] = None, metadata: Optional[MetadataCache] = None,
+                 governor: Optional[ApiLimitGovernor] = None) -> None:
+        """
+        Initialize the SalesforceStrategy instance with the Salesforce connection of the session pool.
+
+        Args:
+            pool (Optional[SalesforceSessionPool]): pool of the connections, the pool of the process by default.
+            metadata (Optional[MetadataCache]): cache of the metadata of the org, the cache of the process by default.
+            governor (Optional[ApiLimitGovernor]): governor of the API usage, the governor of the process by default.
 
         Returns:
-            Salesforce: An instance of the Salesforce class from the simple_salesforce library.
+            None
+        """
+        self.pool = pool or session_pool
+        self.metadata = metadata or metadata_cache
+        self.sf: Salesforce = self.pool.client()
+        self.token: str = self.pool.instance
+        self.access_token: str = self.pool.access_token
+        self.controller = ConcurrencyController()
+        self.planner = BatchPlanner()
+        self.checkpoint: Optional[CheckpointStore] = None
+        self.governor = governor or api_governor
 
+    def load_metadata(self) -> None:
+        """
+        Load the metadata of the org into the metadata cache, so the mappings do not query Salesforce.
+
+        Returns:
+            None
         """
-        return Salesforce(instance=self.token, session_id=self.access_token)
-        
+        self.metadata.load(self.sf, self.token)
+
     def get_organization_id(self) -> str:
         """
         Get the ID of the organization record type in Salesforce.
@@ -100,9 +766,7 @@ class SalesforceStrategy(DataStrategy):
         Returns:
             str: The ID of the organization record type.
         """
-        query = self.sf.query("SELECT Id FROM RecordType WHERE DeveloperName = 'organization' AND IsActive = true")
-        Id = query['records'][0]['Id']
-        return Id
+        return self.metadata.record_type_id(self.sf, self.token, 'organization', 'Account')
 
     def get_households_id(self) -> str:
         """
@@ -111,40 +775,29 @@ class SalesforceStrategy(DataStrategy):
         Returns:
             str: The ID of the organization record type.
         """
-        query = self.sf.query("SELECT Id FROM RecordType WHERE DeveloperName = 'HH_Account' AND IsActive = true")
-        Id = query['records'][0]['Id']
-        return Id
+        return self.metadata.record_type_id(self.sf, self.token, 'HH_Account', 'Account')
 
-    def get_number_of_contacts(self) -> int:
+    def get_account_id(self, contact_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
         """
-        Get numbers of contacts with implementation external id.
+        Get the accounts of the contacts with an implementation external id.
 
-        Returns:
-            dict : return hash table like: {'Auctifera__Implementation_External_ID__c': 'AccountId'}
-        """
-        ans = self.sf.query_all("SELECT COUNT(Id) FROM Contact WHERE Auctifera__Implementation_External_ID__c != '' ")
-        return ans['records'][0]['expr0']
-    
-    def get_account_id(self) -> Dict[str, str]:
-        """
-        Get the ID of the household record type in Salesforce.
+        Args:
+            contact_ids (Optional[Iterable[str]]): ids of the contacts to look up, every contact of the org by default.
 
         Returns:
             dict : return hash table like: {'Auctifera__Implementation_External_ID__c': 'AccountId'}
         """
         query_result = {}
-        query = "SELECT Id, AccountId, Auctifera__Implementation_External_ID__c FROM Contact WHERE Auctifera__Implementation_External_ID__c != null"
-        max_records = self.get_number_of_contacts()
         try:
-            results = self.sf.bulk2.Contact.query(query, max_records=max_records)
-            csv_content = ''.join(results)
-            csv_file = io.StringIO(csv_content)
-            reader = csv.DictReader(csv_file)
-            
-            for row in reader:
+            if contact_ids is None:
+                records = self.query_all_contacts_accounts()
+            else:
+                records = self.query_contacts_accounts(contact_ids)
+
+            for row in records:
                 external_id = row['Auctifera__Implementation_External_ID__c']
                 account_id = row['AccountId']
-                query_result[external_id] = account_id
+                query_result[external_id] = account_id or ''
 
             logger.info("Datos obtenidos correctamente")
 
@@ -153,6 +806,41 @@ class SalesforceStrategy(DataStrategy):
 
         return query_result
 
+    def query_all_contacts_accounts(self) -> Iterator[Dict[str, str]]:
+        """
+        Query the accounts of every contact with an implementation external id with the Bulk API 2.0,
+        parsing the results a page at a time.
+
+        Returns:
+            Iterator[Dict[str, str]]: The Id, AccountId and external id of each contact.
+        """
+        query = "SELECT Id, AccountId, Auctifera__Implementation_External_ID__c FROM Contact WHERE Auctifera__Implementation_External_ID__c != null"
+        for page in self.sf.bulk2.Contact.query(query, max_records=account_query_page_records):
+            yield from csv.DictReader(io.StringIO(page))
+
+    def query_contacts_accounts(self, contact_ids: Iterable[str]) -> Iterator[Dict[str, str]]:
+        """
+        Query the accounts of some contacts by id, in chunks of `account_lookup_chunk` ids queried in parallel.
+
+        Args:
+            contact_ids (Iterable[str]): ids of the contacts.
+
+        Returns:
+            Iterator[Dict[str, str]]: The Id, AccountId and external id of each contact with an external id.
+        """
+        ids = list(dict.fromkeys(contact_ids))
+        chunks = [ids[start:start + account_lookup_chunk] for start in range(0, len(ids), account_lookup_chunk)]
+
+        def query_chunk(chunk: List[str]) -> List[Dict[str, str]]:
+            id_list = ', '.join(f"'{contact_id}'" for contact_id in chunk)
+            query = ("SELECT Id, AccountId, Auctifera__Implementation_External_ID__c FROM Contact "
+                     f"WHERE Id IN ({id_list}) AND Auctifera__Implementation_External_ID__c != null")
+            return self.sf.query_all(query)['records']
+
+        with ThreadPoolExecutor(max_workers=account_lookup_workers) as executor:
+            for records in executor.map(query_chunk, chunks):
+                yield from records
+
     def send_data(self, data:list[dict[str, any]], object_name: str, principal_object: str, object: str ,external_id: str) -> List[Dict[str, str]]:
         """
         Send data to a specified Salesforce object using the bulk API.
@@ -166,14 +854,82 @@ class SalesforceStrategy(DataStrategy):
         Returns:
             None
         """
-    
-        results  = self.sf.bulk.__getattr__(object_name).upsert(
-            data,
-            external_id,
-            batch_size='auto',
-            use_serial=True
-        )
-        with open(ABS_PATH.format(f'logs/{principal_object}_{object}_response.txt'), 'w') as f:
-            f.write(str(results))
-            
-        return results
\ No newline at end of file
+        with self.open_sender(object_name, principal_object, object, external_id) as sender:
+            results = sender.send(data)
+            for position, result in sender.drain_retries():
+                results[position] = result
+            sender.finish()
+            return results
+
+    def open_sender(self, object_name: str, principal_object: str, object: str, external_id: str) -> BulkUpsertSender:
+        """
+        Create a sender to upsert the records of an object in several batches.
+
+        Args:
+            object_name (str): The name of the Salesforce object to which data will be sent.
+            principal_object (str): The name of the principal object (contact/organization/households) for report.
+            object(str): name of the object to be sent to salesforce (ex: address of organization)
+            external_id (str): The external ID field to be used for upserting the data.
+
+        Returns:
+            BulkUpsertSender: The sender of the object, with the Bulk API 2.0 if `bulk_api_version` is 2.
+        """
+        sender = Bulk2UpsertSender if bulk_api_version == '2' else BulkUpsertSender
+        return sender(self.sf, object_name, principal_object, object, external_id, self.controller, self.planner,
+                      self.checkpoint, self.governor)
+
+    def check_api_usage(self, loads: Iterable[Tuple[str, int]], batch_size: Optional[int] = None, account_lookups: int = 0) -> None:
+        """
+        Estimate the API requests and Bulk API batches the loads will use, and check them against
+        what is left of the daily allocations of the org before the loads start.
+
+        Args:
+            loads (Iterable[Tuple[str, int]]): name of the Salesforce object and number of records of each load.
+            batch_size (Optional[int]): records per batch the loads are sent in, each load is sent at once by default.
+            account_lookups (int): contacts whose accounts are queried after their load.
+
+        Raises:
+            ApiLimitError: if the loads do not fit the budget.
+
+        Returns:
+            None
+        """
+        sender = Bulk2UpsertSender if bulk_api_version == '2' else BulkUpsertSender
+        requests = overhead_requests + math.ceil(account_lookups / account_lookup_chunk)
+        batches = 0
+        for object_name, records in loads:
+            size = batch_size or records
+            full, rest = divmod(records, size) if size else (0, 0)
+            for count, sent in ((full, size), (1, rest)):
+                if count and sent:
+                    load_requests, load_batches = sender.estimated_usage(sent, self.planner.planned_size(object_name))
+                    requests += count * load_requests
+                    batches += count * load_batches
+        self.governor.check_plan(self.sf, requests, batches)
+
+    def send_batches(self, batches: Iterable[List[Dict[str, any]]], object_name: str, principal_object: str, object: str, external_id: str,
+                     on_results: Optional[Callable[[List[Dict[str, str]]], None]] = None) -> int:
+        """
+        Send the batches of records of an object as they are produced, so only one batch is kept in memory.
+
+        Args:
+            batches (Iterable[List[Dict[str, any]]]): The batches of records to be sent to Salesforce.
+            object_name (str): The name of the Salesforce object to which data will be sent.
+            principal_object (str): The name of the principal object (contact/organization/households) for report.
+            object(str): name of the object to be sent to salesforce (ex: address of organization)
+            external_id (str): The external ID field to be used for upserting the data.
+            on_results (Optional[Callable]): called with the results of each batch.
+
+        Returns:
+            int: The number of records sent.
+        """
+        with self.open_sender(object_name, principal_object, object, external_id) as sender:
+            for batch in batches:
+                results = sender.send(batch)
+                if on_results is not None:
+                    on_results(results)
+            retried = sender.drain_retries()
+            if on_results is not None and retried:
+                on_results([result for _, result in retried])
+            sender.finish()
+            return sender.records_sent
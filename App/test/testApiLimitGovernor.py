@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import shutil
+sys.path.insert(1, '../')
+from benchmark.fake_salesforce import FakeOrg, FakeSalesforceServer
+from models.strategies.api_limit_governor import ApiLimitError, ApiLimitGovernor, bulk2_batches, parse_limit_info
+from models.strategies.salesforce_session_pool import SalesforceSessionPool
+from models.strategies.salesforce_strategy import Bulk2UpsertSender, BulkUpsertSender
+
+class FakeResponse:
+    def __init__(self, url, header=None):
+        self.url = url
+        self.headers = {'Sforce-Limit-Info': header} if header else {}
+
+class FakeLimits:
+    def __init__(self, limits):
+        self.calls = 0
+        self.results = limits
+
+    def limits(self):
+        self.calls += 1
+        return self.results[min(self.calls, len(self.results)) - 1]
+
+def limits(requests_used, batches_used, requests_max=1000, batches_max=100):
+    return {'DailyApiRequests': {'Max': requests_max, 'Remaining': requests_max - requests_used},
+            'DailyBulkApiBatches': {'Max': batches_max, 'Remaining': batches_max - batches_used}}
+
+#parameters:
+#description: test class of the governor of the daily API requests and Bulk API batches of the org
+#return: result of the test
+class TestApiLimitGovernor(unittest.TestCase):
+
+    def setUp(self):
+        self.pauses = []
+        self.governor = ApiLimitGovernor(share=0.5, pause_seconds=10, max_pause_seconds=30, sleep=self.pauses.append)
+
+    #parameters:
+    #description: test the usage is taken from the Sforce-Limit-Info header, or counted without it
+    #return: result of the test
+    def test_observe_response(self):
+        self.assertEqual(parse_limit_info('api-usage=25/15000'), (25, 15000))
+        self.assertIsNone(parse_limit_info(None))
+
+        self.governor.observe_response(FakeResponse('https://org/services/data/v59.0/limits', 'api-usage=25/15000'))
+        self.governor.observe_response(FakeResponse('https://org/services/async/59.0/job'))
+        self.governor.observe_response(FakeResponse('https://org/services/oauth2/token'))
+        usage = self.governor.usage()
+        self.assertEqual((usage['requests_used'], usage['requests_max'], usage['requests_left']), (26, 15000, 7474))
+
+    #parameters:
+    #description: test the estimated usage of the migration is checked against the share of the allocations before it starts
+    #return: result of the test
+    def test_check_plan(self):
+        sf = FakeLimits([limits(400, 10)])
+        self.governor.check_plan(sf, 100, 40)
+        with self.assertRaises(ApiLimitError):
+            self.governor.check_plan(sf, 101, 40)
+        with self.assertRaises(ApiLimitError):
+            self.governor.check_plan(sf, 100, 41)
+
+        ApiLimitGovernor(enabled=False).check_plan(sf, 10000, 10000)
+        sf.limits = lambda: (_ for _ in ()).throw(RuntimeError('no access'))
+        self.governor.check_plan(sf, 10000, 10000)
+
+    #parameters:
+    #description: test a batch over the budget pauses the load until the usage goes down, and stops it after the longest pause
+    #return: result of the test
+    def test_reserve(self):
+        sf = FakeLimits([limits(0, 49), limits(0, 49), limits(0, 45)])
+        self.governor.reserve(sf, 10, 1)
+        self.governor.reserve(sf, 10, 4)
+        self.assertEqual(self.pauses, [10])
+        self.assertEqual(self.governor.usage()['batches_used'], 49)
+
+        governor = ApiLimitGovernor(share=0.5, pause_seconds=10, max_pause_seconds=30, sleep=self.pauses.append)
+        with self.assertRaises(ApiLimitError):
+            governor.reserve(FakeLimits([limits(0, 50)]), 10, 1)
+        self.assertEqual(self.pauses, [10, 10, 10, 10])
+
+    #parameters:
+    #description: test the estimated usage of the senders counts the requests and the batches of their jobs
+    #return: result of the test
+    def test_estimated_usage(self):
+        self.assertEqual(BulkUpsertSender.estimated_usage(150, 10000), (1, 0))
+        self.assertEqual(BulkUpsertSender.estimated_usage(25000, 10000), (11, 3))
+        self.assertEqual(Bulk2UpsertSender.estimated_usage(25000, 10000), (8, 3))
+        self.assertEqual(bulk2_batches(10000), 1)
+
+    #parameters:
+    #description: test the loads stop before going over the daily allocations of a local fake org
+    #return: result of the test
+    def test_fake_org(self):
+        os.makedirs('test_api_limit_governor', exist_ok=True)
+        self.addCleanup(shutil.rmtree, 'test_api_limit_governor', ignore_errors=True)
+        org = FakeOrg(daily_api_requests=40, daily_bulk_batches=2)
+        with FakeSalesforceServer(org) as server:
+            for name, content in (('salesforce_instance.txt', server.instance_url), ('salesforce_token.txt', 'token')):
+                with open(os.path.join('test_api_limit_governor', name), 'w') as f:
+                    f.write(content)
+            governor = ApiLimitGovernor(share=0.5, max_pause_seconds=0, sleep=self.pauses.append)
+            pool = SalesforceSessionPool(1, 'test_api_limit_governor/salesforce_instance.txt',
+                                         'test_api_limit_governor/salesforce_token.txt', governor=governor, allow_plain_http=True)
+            sf = pool.client()
+
+            with Bulk2UpsertSender(sf, 'Account', 'Organizations', 'governor', 'Ext__c', governor=governor) as sender:
+                self.addCleanup(os.remove, sender.log_path)
+                sender.send([{'Ext__c': f'A{number}', 'Name': 'Organization'} for number in range(2500)])
+                self.assertEqual(governor.usage()['batches_used'], 1)
+                with self.assertRaises(ApiLimitError):
+                    sender.send([{'Ext__c': f'B{number}', 'Name': 'Organization'} for number in range(2500)])
+            self.assertEqual(org.stats['bulk_batches'], 1)
+
+            with BulkUpsertSender(sf, 'Contact', 'Contacts', 'governor', 'Ext__c', governor=governor) as sender:
+                self.addCleanup(os.remove, sender.log_path)
+                with self.assertRaises(ApiLimitError):
+                    for number in range(40):
+                        sender.send([{'Ext__c': f'C{number}', 'LastName': 'Doe'}])
+            self.assertEqual(governor.usage()['requests_used'], org.stats['api_requests'])
+            # The budget can be passed by the read of the limits that stops the load
+            self.assertLessEqual(org.stats['api_requests'], 21)
+
+if __name__ == '__main__':
+    unittest.main()
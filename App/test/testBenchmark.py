@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import csv
+import tempfile
+sys.path.insert(1, '../')
+from benchmark.altru_export_generator import AltruExportGenerator, report_columns
+from benchmark.benchmark import BenchmarkRunner, compare, stages
+
+def read_report(folder, report_name):
+    with open(os.path.join(folder, f'{report_name}.csv'), 'r', newline='', encoding='utf-8-sig') as f:
+        return list(csv.DictReader(f, delimiter=';'))
+
+#parameters:
+#description: test class of the synthetic Altru export and the end-to-end benchmark
+#return: result of the test
+class TestBenchmark(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    #parameters:
+    #description: test the reports of the export point to existing contacts, organizations and households
+    #return: result of the test
+    def test_export_is_consistent(self):
+        rows = AltruExportGenerator(300, seed=1).generate(self.dir.name)
+        reports = {report_name: read_report(self.dir.name, report_name) for report_name in report_columns}
+        self.assertEqual({report_name: len(report) for report_name, report in reports.items()}, rows)
+        self.assertEqual(rows["Veevart Contacts Report test"], 300)
+
+        contacts = {row['Lookup ID'] for row in reports["Veevart Contacts Report test"]}
+        organizations = {row['Lookup ID'] for row in reports["Veevart Organizations Report test"]}
+        households = {row['QUERYRECID'] for row in reports["Veevart HouseHolds Report test"]}
+        self.assertEqual(len(contacts), 300)
+        self.assertFalse(contacts & organizations)
+        members = [row['Households Belonging To\\Household Record ID'] for row in reports["Veevart Contacts Report test"]]
+        self.assertEqual({member for member in members if member}, households)
+
+        for report_name in ("Veevart Contacts Report Phones test", "Veevart Contacts Report Email test",
+                            "Veevart Contacts Report Address test", "Veevart Contacts Relationships report test"):
+            self.assertTrue({row['Lookup ID'] for row in reports[report_name]} <= contacts, report_name)
+        for report_name in ("Veevart Organization Phones Report test", "Veevart Organization Addresses Report test"):
+            self.assertEqual({row['Lookup ID'] for row in reports[report_name]}, organizations, report_name)
+        relationships = reports["Veevart Organizations Relationships report test"]
+        self.assertTrue({row['Lookup ID'] for row in relationships} <= contacts)
+        self.assertEqual({row['Relationships\\Related Constituent\\Lookup ID'] for row in relationships}, organizations)
+
+        for report_name, report in reports.items():
+            if 'QUERYRECID' in report_columns[report_name]:
+                self.assertEqual(len({row['QUERYRECID'] for row in report}), len(report), report_name)
+
+    #parameters:
+    #description: test the same seed generates the same export
+    #return: result of the test
+    def test_export_is_reproducible(self):
+        first = os.path.join(self.dir.name, 'first')
+        second = os.path.join(self.dir.name, 'second')
+        AltruExportGenerator(50, seed=7).generate(first)
+        AltruExportGenerator(50, seed=7).generate(second)
+        for report_name in report_columns:
+            self.assertEqual(read_report(first, report_name), read_report(second, report_name))
+
+    #parameters:
+    #description: test the stages slower or bigger than the baseline beyond the tolerance are regressions
+    #return: result of the test
+    def test_compare(self):
+        baseline = {'runs': {'100': {'stages': {'send': {'seconds': 10, 'peak_rss_mb': 100}}}}}
+        results = {'runs': {'100': {'stages': {'send': {'seconds': 12, 'peak_rss_mb': 130}, 'report': {'seconds': 1, 'peak_rss_mb': 1}}},
+                            '1000': {'stages': {'send': {'seconds': 100, 'peak_rss_mb': 100}}}}}
+        self.assertEqual(compare(results, baseline, 0.25), ['100 rows, send: peak_rss_mb went from 100 to 130'])
+        self.assertEqual(compare(results, baseline, 0.5), [])
+
+    #parameters:
+    #description: test the benchmark runs every stage against the fake org and measures it
+    #return: result of the test
+    def test_runner(self):
+        results = BenchmarkRunner(20, work_dir=self.dir.name).run()
+        self.assertEqual(list(results['stages']), stages)
+        for stage in results['stages'].values():
+            self.assertGreater(stage['seconds'], 0)
+            self.assertGreater(stage['peak_rss_mb'], 0)
+        self.assertGreaterEqual(results['salesforce']['records'], results['export_rows'])
+
+        reports_dir = os.path.join(self.dir.name, 'App', 'reports')
+        self.assertEqual(len(os.listdir(reports_dir)), 13)
+        for report in os.listdir(reports_dir):
+            with open(os.path.join(reports_dir, report), 'r', newline='') as f:
+                errors = next(row for row in csv.reader(f) if row[0] == 'Error')
+            self.assertEqual(errors[4], '0', report)
+
+if __name__ == '__main__':
+    unittest.main()
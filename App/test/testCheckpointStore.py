@@ -0,0 +1,216 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+sys.path.insert(1, '../')
+from models.cache.checkpoint_store import CheckpointStore, run_key
+from models.strategies import salesforce_strategy
+from models.strategies.salesforce_strategy import BulkUpsertSender
+
+#parameters:
+#description: Bulk API of an object that upserts every record
+#return: results of the upsert
+class FakeBulk:
+
+    def __init__(self):
+        self.calls = []
+
+    def upsert(self, data, external_id, batch_size, use_serial):
+        self.calls.append([record['Ext__c'] for record in data])
+        return [{'success': True, 'created': True, 'id': f'id{record["Ext__c"]}', 'errors': []} for record in data]
+
+class FakeHandler:
+
+    def __init__(self, bulk):
+        self.bulk = bulk
+
+    def __getattr__(self, name):
+        return self.bulk
+
+#parameters:
+#description: Bulk API of an object where the given records time out the first time they are sent
+#return: results of the upsert
+class FakeSlowBulk(FakeBulk):
+
+    def __init__(self, slow):
+        super().__init__()
+        self.slow = set(slow)
+
+    def upsert(self, data, external_id, batch_size, use_serial):
+        results = super().upsert(data, external_id, batch_size, use_serial)
+        for record, result in zip(data, results):
+            if record['Ext__c'] in self.slow:
+                self.slow.remove(record['Ext__c'])
+                result.update(success=False, created=False, id=None, errors=[{'statusCode': 'REQUEST_RUNNING_TOO_LONG', 'message': '', 'fields': []}])
+        return results
+
+class FakeSalesforce:
+
+    def __init__(self, bulk=None):
+        self.bulk = FakeHandler(bulk or FakeBulk())
+
+#parameters:
+#description: test class of the checkpoint of the progress of the migration
+#return: result of the test
+class TestCheckpointStore(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'checkpoint', 'checkpoint.jsonl')
+        self.key = run_key('reports', '200')
+        self.collections_max_records = salesforce_strategy.collections_max_records
+        salesforce_strategy.collections_max_records = 0
+
+    def tearDown(self):
+        salesforce_strategy.collections_max_records = self.collections_max_records
+        self.dir.cleanup()
+
+    def write_run(self):
+        store = CheckpointStore(self.key, path=self.path)
+        store.submit('Account_test', 0, 2)
+        store.confirm('Account_test', 0, ['id1', 'id2'])
+        store.submit('Account_test', 1, 2)
+        store.confirm('Account_test', 1, ['id3'])
+        store.finish('Account_test')
+        store.submit('Contact_test', 0, 2)
+        store.close()
+
+    #parameters:
+    #description: test a resumed run reads the confirmed batches and the finished loads of the previous run
+    #return: result of the test
+    def test_resume(self):
+        self.write_run()
+        store = CheckpointStore(self.key, resume=True, path=self.path)
+        self.assertTrue(store.is_done('Account_test'))
+        self.assertFalse(store.is_done('Contact_test'))
+        self.assertTrue(store.is_confirmed('Account_test', 1))
+        self.assertFalse(store.is_started('Contact_test'))
+        self.assertEqual(store.done_ids('Account_test'), ['id1', 'id2', 'id3'])
+        store.close()
+
+    #parameters:
+    #description: test the checkpoint of other reports or settings is not resumed, and a run without resume starts over
+    #return: result of the test
+    def test_other_run(self):
+        self.write_run()
+        store = CheckpointStore(run_key('reports', '100'), resume=True, path=self.path)
+        self.assertFalse(store.is_done('Account_test'))
+        store.close()
+
+        self.write_run()
+        store = CheckpointStore(self.key, path=self.path)
+        self.assertFalse(store.is_confirmed('Account_test', 0))
+        store.close()
+
+    #parameters:
+    #description: test the line cut by a killed run is ignored and replaced by the entries of the resumed run
+    #return: result of the test
+    def test_cut_line(self):
+        self.write_run()
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"load": "Contact_test", "bat')
+
+        store = CheckpointStore(self.key, resume=True, path=self.path)
+        store.confirm('Contact_test', 0, ['c1'])
+        store.close()
+
+        store = CheckpointStore(self.key, resume=True, path=self.path)
+        self.assertEqual(store.confirmed_ids('Contact_test', 0), ['c1'])
+        store.close()
+
+    #parameters:
+    #description: test a resumed sender skips the batches confirmed by the previous run and continues its response log without the incomplete result
+    #return: result of the test
+    def test_sender_skips_confirmed(self):
+        log_path = os.path.join(self.dir.name, 'response.jsonl')
+        data = [[{'Ext__c': '1'}, {'Ext__c': '2'}], [{'Ext__c': '3'}]]
+
+        store = CheckpointStore(self.key, path=self.path)
+        sender = BulkUpsertSender(FakeSalesforce(), 'Account', 'Account', 'test', 'Ext__c', checkpoint=store)
+        sender.log_path = log_path
+        sender.send(data[0])
+        sender.close()
+        store.close()
+        with open(log_path, 'a') as f:
+            f.write('{"id":"killed","succ')
+
+        store = CheckpointStore(self.key, resume=True, path=self.path)
+        sf = FakeSalesforce()
+        sender = BulkUpsertSender(sf, 'Account', 'Account', 'test', 'Ext__c', checkpoint=store)
+        sender.log_path = log_path
+        results = [sender.send(batch) for batch in data]
+        sender.finish()
+        sender.close()
+        store.close()
+
+        self.assertEqual(sf.bulk.bulk.calls, [['3']])
+        self.assertEqual([result['id'] for result in results[0]], ['id1', 'id2'])
+        with open(log_path, 'r') as f:
+            self.assertEqual([json.loads(line)['id'] for line in f], ['id1', 'id2', 'id3'])
+
+        store = CheckpointStore(self.key, resume=True, path=self.path)
+        self.assertTrue(store.is_done('Account_test'))
+        store.close()
+
+    #parameters:
+    #description: stop a sender and its checkpoint as if the run was killed, without closing the sender
+    #return: None
+    def kill(self, sender, store):
+        sender.log_file.close()
+        store.close()
+
+    #parameters:
+    #description: resume a run, send every batch and read the ids of the response log
+    #return: ids of the lines of the log
+    def resume(self, log_path, data):
+        store = CheckpointStore(self.key, resume=True, path=self.path)
+        sender = BulkUpsertSender(FakeSalesforce(), 'Account', 'Account', 'test', 'Ext__c', checkpoint=store)
+        sender.log_path = log_path
+        with sender:
+            for batch in data:
+                sender.send(batch)
+            sender.drain_retries()
+            sender.finish()
+        store.close()
+        with open(log_path, 'r') as f:
+            return [json.loads(line)['id'] for line in f]
+
+    #parameters:
+    #description: test a run killed after logging a batch and before confirming it does not log the batch twice when resumed
+    #return: result of the test
+    def test_killed_before_confirm(self):
+        log_path = os.path.join(self.dir.name, 'response.jsonl')
+        data = [[{'Ext__c': '1'}, {'Ext__c': '2'}], [{'Ext__c': '3'}]]
+
+        store = CheckpointStore(self.key, path=self.path)
+        sender = BulkUpsertSender(FakeSalesforce(), 'Account', 'Account', 'test', 'Ext__c', checkpoint=store)
+        sender.log_path = log_path
+        sender.send(data[0])
+        confirm = store.confirm
+        store.confirm = lambda load, batch, *args: (_ for _ in ()).throw(KeyboardInterrupt()) if batch == 1 else confirm(load, batch, *args)
+        with self.assertRaises(KeyboardInterrupt):
+            sender.send(data[1])
+        self.kill(sender, store)
+
+        self.assertEqual(self.resume(log_path, data), ['id1', 'id2', 'id3'])
+
+    #parameters:
+    #description: test a run killed while a batch waits for its queued records does not log the batch twice when resumed
+    #return: result of the test
+    def test_killed_with_queued_records(self):
+        log_path = os.path.join(self.dir.name, 'response.jsonl')
+        data = [[{'Ext__c': '1'}, {'Ext__c': '2'}], [{'Ext__c': '3'}]]
+
+        store = CheckpointStore(self.key, path=self.path)
+        sender = BulkUpsertSender(FakeSalesforce(FakeSlowBulk(['2'])), 'Account', 'Account', 'test', 'Ext__c', checkpoint=store)
+        sender.log_path = log_path
+        for batch in data:
+            sender.send(batch)
+        self.assertEqual(len(sender.retries), 1)
+        self.kill(sender, store)
+
+        self.assertEqual(sorted(self.resume(log_path, data)), ['id1', 'id2', 'id3'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import unittest
+import sys
+import os
+import csv
+sys.path.insert(1, '../')
+from models.cleanup.rules_cleanup_strategy import RulesCleanupStrategy
+from models.cleanup.cleanup_rules import cleanup_rules, compile_row_cleanup
+
+headers = ['Lookup ID', 'Phones\\Number', 'Phones\\Do not call', 'Phones\\Primary phone number']
+rules = cleanup_rules['Veevart Contacts Report Phones test']
+
+#parameters: 
+#description: test class that clean up the reports of altru
+#return: result of the test
+class TestCleanupStrategy(unittest.TestCase):
+
+    def setUp(self):
+        with open('test_input.csv', 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=';')
+            writer.writerow(headers)
+            writer.writerow(['1', '555', 'No', 'Yes'])
+            writer.writerow(['2', '556', 'Yes', 'No'])
+
+    def tearDown(self):
+        for path in ['test_input.csv', 'test_output.csv']:
+            if os.path.exists(path):
+                os.remove(path)
+
+    #parameters: 
+    #description: read a csv file
+    #return: headers and rows of the file
+    def read(self, path):
+        with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+            reader = csv.reader(f, delimiter=';')
+            return next(reader), list(reader)
+
+    #parameters: 
+    #description: test the report is cleaned in place
+    #return: result of the test
+    def test_cleanup_in_place(self):
+        RulesCleanupStrategy('test_input.csv', 'test_input.csv', rules).cleanup()
+        result_headers, rows = self.read('test_input.csv')
+        self.assertEqual(result_headers, headers)
+        self.assertEqual(rows, [['1', '555', 'False', 'True'], ['2', '556', 'True', 'False']])
+
+    #parameters: 
+    #description: test an interrupted cleanup keeps the original file and leaves no temporary files
+    #return: result of the test
+    def test_cleanup_interrupted(self):
+        with open('test_input.csv', 'a', newline='', encoding='utf-8') as f:
+            f.write('3;557\n')
+        with open('test_input.csv', 'r', encoding='utf-8-sig') as f:
+            original = f.read()
+
+        with self.assertLogs('models.cleanup.cleanup_strategy', 'ERROR'), self.assertRaises(IndexError):
+            RulesCleanupStrategy('test_input.csv', 'test_input.csv', rules).cleanup()
+
+        with open('test_input.csv', 'r', encoding='utf-8-sig') as f:
+            self.assertEqual(f.read(), original)
+        self.assertEqual([name for name in os.listdir('.') if name.endswith('.tmp')], [])
+
+    #parameters: 
+    #description: test the rules are compiled for the columns of the report
+    #return: result of the test
+    def test_compile_row_cleanup(self):
+        clean_row = compile_row_cleanup(headers, rules)
+        self.assertEqual(clean_row(['1', '555', 'True', 'Maybe']), ['1', '555', 'True', 'False'])
+        with self.assertRaises(ValueError):
+            compile_row_cleanup(['Lookup ID'], rules)
+
+if __name__ == '__main__':
+    unittest.main()
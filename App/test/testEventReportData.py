@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+import csv
+import tempfile
+sys.path.insert(1, '../')
+from models.strategies.salesforce_strategy import BulkUpsertSender
+from util.event_report_data import ReportProcessor
+
+class FakeSalesforce:
+    pass
+
+#parameters:
+#description: test class of the reports of the sent data built from the JSON Lines response logs
+#return: result of the test
+class TestEventReportData(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.log_path = os.path.join(self.dir.name, 'Contacts_Contacts_response.jsonl')
+        self.csv_path = os.path.join(self.dir.name, 'Contacts_Contacts_response.csv')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    #parameters:
+    #description: test the results logged by the sender are counted in the report, with messages that have apostrophes and True/None
+    #return: result of the test
+    def test_report(self):
+        error = {'statusCode': 'FIELD_CUSTOM_VALIDATION_EXCEPTION', 'message': "O'Brien's None True", 'fields': []}
+        with BulkUpsertSender(FakeSalesforce(), 'Contact', 'Contacts', 'Contacts', 'Ext__c') as sender:
+            sender.log_path = self.log_path
+            sender._write_results([{'success': True, 'created': True, 'id': 'id1', 'errors': []},
+                                   {'success': True, 'created': False, 'id': 'id2', 'errors': []}])
+            sender._write_results([{'success': False, 'created': False, 'id': None, 'errors': [error]}])
+
+        ReportProcessor(self.log_path, self.csv_path).generate_report_send_data()
+        with open(self.csv_path, 'r', newline='') as f:
+            rows = list(csv.reader(f))
+
+        self.assertEqual(rows[0], ['Operation', 'True', 'False', 'Id', 'Error', 'Message Error'])
+        self.assertEqual(rows[1][:3], ['Success', '2', '1'])
+        self.assertEqual([row[3] for row in rows[2:5]], ['id1', 'id2', ''])
+        self.assertEqual(rows[5][:3], ['Created', '1', '2'])
+        self.assertEqual([row[3] for row in rows[6:9]], ['id1', 'id2', ''])
+        self.assertEqual(rows[9][4], '1')
+        self.assertIn("O'Brien's None True", rows[10][5])
+        self.assertEqual(len(rows), 11)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import sys
+import os
+import shutil
+import requests
+sys.path.insert(1, '../')
+from benchmark import fake_salesforce
+from benchmark.fake_salesforce import FakeOrg, FakeSalesforceServer
+from models.cache.metadata_cache import MetadataCache
+from models.strategies.salesforce_session_pool import SalesforceSessionPool
+from models.strategies.salesforce_strategy import Bulk2UpsertSender, BulkUpsertSender, SalesforceStrategy
+
+#parameters:
+#description: test class of the local stand-in of the Salesforce APIs
+#return: result of the test
+class TestFakeSalesforce(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs('test_fake_salesforce', exist_ok=True)
+        self.org = FakeOrg(lock_error_rate=1.0)
+        self.server = FakeSalesforceServer(self.org)
+        self.server.start()
+        self.write('salesforce_instance.txt', self.server.instance_url)
+        self.write('salesforce_token.txt', 'token')
+        self.pool = SalesforceSessionPool(2, 'test_fake_salesforce/salesforce_instance.txt', 'test_fake_salesforce/salesforce_token.txt',
+                                          allow_plain_http=True)
+        self.sf = self.pool.client()
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree('test_fake_salesforce', ignore_errors=True)
+
+    def write(self, name, content):
+        with open(os.path.join('test_fake_salesforce', name), 'w') as f:
+            f.write(content)
+
+    #parameters:
+    #description: test the records are upserted by external id with the Bulk API, and the parallel batches fail with lock errors
+    #return: result of the test
+    def test_bulk_upsert(self):
+        sender = BulkUpsertSender(self.sf, 'Account', 'Organizations', 'test', 'Ext__c')
+        data = [{'Ext__c': '1', 'Name': 'First'}, {'Ext__c': '2', 'Name': 'Second'}]
+
+        locked = self.sf.bulk.Account.upsert(data, 'Ext__c', batch_size=2, use_serial=False)
+        self.assertEqual([result['errors'][0]['statusCode'] for result in locked], ['UNABLE_TO_LOCK_ROW'] * 2)
+
+        created = sender.upsert_serial(data, 1)
+        updated = sender.upsert_serial([{'Ext__c': '1', 'Name': 'Renamed'}], 1)
+        self.assertTrue(all(result['success'] and result['created'] for result in created))
+        self.assertEqual(updated[0]['id'], created[0]['id'])
+        self.assertFalse(updated[0]['created'])
+        self.assertEqual(self.org.records['Account'][created[0]['id']]['Name'], 'Renamed')
+        self.assertGreater(self.pool.stats.snapshot()['reused'], 0)
+
+    #parameters:
+    #description: test the Bulk API 2.0 jobs and the sObject Collections resolve the relationships by external id
+    #return: result of the test
+    def test_bulk2_and_collections(self):
+        self.org.lock_error_rate = 0
+        Bulk2UpsertSender(self.sf, 'Account', 'Households', 'test', 'Ext__c').upsert([{'Ext__c': 'h1', 'Name': 'Household'}])
+
+        data = [{'Ext__c': 'c1', 'LastName': 'Doe', 'Account': {'Ext__c': 'h1'}}, {'Ext__c': 'c2', 'LastName': 'Roe', 'Account': {'Ext__c': 'none'}}]
+        results = BulkUpsertSender(self.sf, 'Contact', 'Contacts', 'test', 'Ext__c').upsert_collection(data)
+        self.assertTrue(results[0]['success'])
+        self.assertEqual(results[1]['errors'][0]['statusCode'], 'INVALID_FIELD')
+
+        contact = self.org.records['Contact'][results[0]['id']]
+        self.assertEqual(contact['AccountId'], self.org.external_ids[('Account', 'Ext__c', 'h1')])
+
+    #parameters:
+    #description: test the REST and Bulk API 2.0 queries, the composite requests of the metadata and the OAuth token
+    #return: result of the test
+    def test_queries(self):
+        self.org.lock_error_rate = 0
+        self.org.upsert('Contact', 'Auctifera__Implementation_External_ID__c',
+                        [{'Auctifera__Implementation_External_ID__c': f'L{number}', 'LastName': 'Doe'} for number in range(5)], parallel=False)
+        page_records = fake_salesforce.query_page_records
+        fake_salesforce.query_page_records = 2
+        try:
+            strategy = SalesforceStrategy(self.pool, MetadataCache('test_fake_salesforce/metadata', 3600, ['Account']))
+            self.assertEqual(len(strategy.get_account_id()), 5)
+            contact_ids = list(self.org.records['Contact'])[:3]
+            self.assertEqual(sorted(strategy.get_account_id(contact_ids)), ['L0', 'L1', 'L2'])
+            households_id = next(record['Id'] for record in self.org.records['RecordType'].values() if record['DeveloperName'] == 'HH_Account')
+            self.assertEqual(strategy.get_households_id(), households_id)
+        finally:
+            fake_salesforce.query_page_records = page_records
+
+        token = requests.post(f'{self.server.instance_url}/services/oauth2/token', data={'grant_type': 'authorization_code'}).json()
+        self.assertEqual(token['instance_url'], self.server.instance_url)
+        self.assertEqual(requests.get(f'{self.server.instance_url}/services/data/v59.0/query', params={'q': 'SELECT Id FROM Contact'}).status_code, 401)
+
+if __name__ == '__main__':
+    unittest.main()
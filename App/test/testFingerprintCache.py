@@ -0,0 +1,65 @@
+import unittest
+import sys
+import os
+import shutil
+sys.path.insert(1, '../')
+from models.cache.fingerprint_cache import FingerprintCache, file_hash
+from models.cleanup.rules_cleanup_strategy import RulesCleanupStrategy
+from models.cleanup.cleanup_rules import cleanup_rules
+
+rules = cleanup_rules['Veevart Contacts Report Phones test']
+
+#parameters: 
+#description: test class of the cache of the cleanup and the mappings
+#return: result of the test
+class TestFingerprintCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = FingerprintCache('test_cache')
+        with open('test_input.csv', 'w', encoding='utf-8-sig') as f:
+            f.write('Lookup ID;Phones\\Number;Phones\\Do not call;Phones\\Primary phone number\n1;555;No;Yes\n')
+
+    def tearDown(self):
+        shutil.rmtree('test_cache', ignore_errors=True)
+        if os.path.exists('test_input.csv'):
+            os.remove('test_input.csv')
+
+    #parameters: 
+    #description: test a stored mapping is loaded while the report does not change
+    #return: result of the test
+    def test_mapping(self):
+        key = self.cache.fingerprint(['test_input.csv'], 'instance')
+        self.assertIsNone(self.cache.load_mapping('report', key))
+
+        self.cache.store_mapping('report', key, {'phones_mapping': [{'Phone': '555'}]})
+        self.assertEqual(self.cache.load_mapping('report', key), {'phones_mapping': [{'Phone': '555'}]})
+        self.assertNotEqual(self.cache.fingerprint(['test_input.csv'], 'other instance'), key)
+
+        with open('test_input.csv', 'a', encoding='utf-8') as f:
+            f.write('2;556;Yes;No\n')
+        new_key = self.cache.fingerprint(['test_input.csv'], 'instance')
+        self.assertNotEqual(new_key, key)
+        self.assertIsNone(self.cache.load_mapping('report', new_key))
+
+        # The new version of the report replaces the entry of the previous one
+        self.cache.store_mapping('report', new_key, {'phones_mapping': []})
+        self.assertIsNone(self.cache.load_mapping('report', key))
+        self.assertEqual(os.listdir(self.cache.mapping_dir), ['report.pickle'])
+
+    #parameters: 
+    #description: test a report cleaned in place is not cleaned again until it changes
+    #return: result of the test
+    def test_cleanup(self):
+        self.assertFalse(self.cache.is_cleaned('test_input.csv', 'test_input.csv'))
+
+        input_hash = file_hash('test_input.csv')
+        self.assertTrue(RulesCleanupStrategy('test_input.csv', 'test_input.csv', rules).cleanup())
+        self.cache.mark_cleaned('test_input.csv', input_hash)
+        self.assertTrue(self.cache.is_cleaned('test_input.csv', 'test_input.csv'))
+
+        with open('test_input.csv', 'a', encoding='utf-8') as f:
+            f.write('2;556;Yes;No\n')
+        self.assertFalse(self.cache.is_cleaned('test_input.csv', 'test_input.csv'))
+
+if __name__ == '__main__':
+    unittest.main()
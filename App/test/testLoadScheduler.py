@@ -0,0 +1,83 @@
+import unittest
+import sys
+import threading
+import time
+sys.path.insert(1, '../')
+from models.migration.load_scheduler import LoadScheduler
+
+dependencies = {
+    'Organizations': [],
+    'OrganizationPhones': ['Organizations'],
+    'Households': [],
+    'Contacts': ['Households'],
+    'Affiliations': ['Organizations', 'Contacts'],
+}
+
+#parameters: 
+#description: test class of the scheduler of the loads
+#return: result of the test
+class TestLoadScheduler(unittest.TestCase):
+
+    def setUp(self):
+        self.started = []
+        self.finished = []
+        self.lock = threading.Lock()
+
+    def run_load(self, load):
+        with self.lock:
+            self.started.append(load)
+        time.sleep(0.05)
+        with self.lock:
+            self.finished.append(load)
+
+    #parameters: 
+    #description: test every load starts after the loads it depends on finished
+    #return: result of the test
+    def test_dependency_order(self):
+        LoadScheduler(dependencies, 4).run(self.run_load)
+        self.assertCountEqual(self.started, dependencies)
+        for load, depends_on in dependencies.items():
+            for dependency in depends_on:
+                self.assertLess(self.finished.index(dependency), self.started.index(load))
+
+    #parameters: 
+    #description: test a single worker runs the loads one after another in the given order
+    #return: result of the test
+    def test_serial_order(self):
+        LoadScheduler(dependencies, 1).run(self.run_load)
+        self.assertEqual(self.started, list(dependencies))
+        self.assertEqual(self.finished, list(dependencies))
+
+    #parameters: 
+    #description: test the independent loads run at the same time
+    #return: result of the test
+    def test_concurrency(self):
+        LoadScheduler(dependencies, 4).run(self.run_load)
+        self.assertEqual(set(self.started[:2]), {'Organizations', 'Households'})
+        self.assertEqual(set(self.finished[:2]), {'Organizations', 'Households'})
+
+    #parameters: 
+    #description: test invalid graphs are rejected
+    #return: result of the test
+    def test_invalid_graph(self):
+        with self.assertRaises(ValueError):
+            LoadScheduler({'Contacts': ['Households']}, 4)
+        with self.assertRaises(ValueError):
+            LoadScheduler({'Contacts': ['Households'], 'Households': ['Contacts']}, 4)
+
+    #parameters: 
+    #description: test a failed load stops its dependents and its error is raised
+    #return: result of the test
+    def test_error(self):
+        def run_load(load):
+            if load == 'Households':
+                raise RuntimeError('Households failed')
+            self.run_load(load)
+
+        with self.assertRaises(RuntimeError):
+            LoadScheduler(dependencies, 4).run(run_load)
+        self.assertNotIn('Contacts', self.started)
+        self.assertNotIn('Affiliations', self.started)
+
+if __name__ == '__main__':
+    unittest.main()
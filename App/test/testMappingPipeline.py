@@ -0,0 +1,93 @@
+import unittest
+import sys
+import threading
+import time
+sys.path.insert(1, '../')
+from models.migration.mapping_pipeline import MappingPipeline
+
+#parameters: 
+#description: test class of the pipeline between the mapping and the upload of the loads
+#return: result of the test
+class TestMappingPipeline(unittest.TestCase):
+
+    def setUp(self):
+        self.pipeline = MappingPipeline(2)
+        self.produced = []
+
+    def tearDown(self):
+        self.pipeline.close()
+
+    def batches(self, load, count):
+        def produce():
+            for index in range(count):
+                self.produced.append((load, index))
+                yield load, [{'Id': index}]
+        return produce
+
+    #parameters: 
+    #description: test the batches of a load are received in order
+    #return: result of the test
+    def test_batches(self):
+        self.pipeline.start('Account', self.batches('Account', 5))
+        received = [batch[0]['Id'] for _, batch in self.pipeline.batches('Account')]
+        self.assertEqual(received, [0, 1, 2, 3, 4])
+
+    #parameters: 
+    #description: test a load is not mapped more than the depth of the pipeline ahead of its upload
+    #return: result of the test
+    def test_backpressure(self):
+        self.pipeline.start('Account', self.batches('Account', 10))
+        time.sleep(0.2)
+        # 2 batches in the queue and 1 waiting to be put
+        self.assertEqual(len(self.produced), 3)
+        self.assertEqual(len(list(self.pipeline.batches('Account'))), 10)
+
+    #parameters: 
+    #description: test a load is mapped after the loads it is mapped after
+    #return: result of the test
+    def test_after(self):
+        released = threading.Event()
+
+        def households():
+            released.wait()
+            self.produced.append(('Households', 0))
+            yield 'Households', [{'Id': 0}]
+
+        self.pipeline.start('Households', households)
+        self.pipeline.start('Contacts', self.batches('Contacts', 1), after=['Households'])
+        time.sleep(0.1)
+        self.assertEqual(self.produced, [])
+        released.set()
+        self.assertEqual(len(list(self.pipeline.batches('Contacts'))), 1)
+        self.assertEqual(self.produced, [('Households', 0), ('Contacts', 0)])
+
+    #parameters: 
+    #description: test the error of a mapping is raised by its upload and by the loads mapped after it
+    #return: result of the test
+    def test_failure(self):
+        def households():
+            yield 'Households', [{'Id': 0}]
+            raise ValueError('wrong row')
+
+        self.pipeline.start('Households', households)
+        self.pipeline.start('Contacts', self.batches('Contacts', 1), after=['Households'])
+        received = []
+        with self.assertRaises(ValueError):
+            for item in self.pipeline.batches('Households'):
+                received.append(item)
+        self.assertEqual(len(received), 1)
+        with self.assertRaises(RuntimeError):
+            list(self.pipeline.batches('Contacts'))
+
+    #parameters: 
+    #description: test closing the pipeline stops the mappings waiting on a full queue
+    #return: result of the test
+    def test_close(self):
+        self.pipeline.start('Account', self.batches('Account', 10))
+        time.sleep(0.2)
+        self.pipeline.close()
+        self.assertTrue(self.pipeline.mapped['Account'].wait(1))
+        self.assertEqual(len(self.produced), 3)
+
+if __name__ == '__main__':
+    unittest.main()
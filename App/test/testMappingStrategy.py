@@ -0,0 +1,188 @@
+import unittest
+import sys
+import os
+import csv
+import gc
+import threading
+sys.path.insert(1, '../')
+from models.mappings.phone_mapping_strategy import PhoneStrategy, PhoneUpdateStrategy
+from models.mappings import mapping_strategy
+from models.mappings.mapping_strategy import FusedMappingStrategy
+from models.factories.mapping_strategy_factory import map_report
+from models.entities.origin_platform import OriginPlatform
+from entities.object import SalesforceObject
+
+headers = ['Lookup ID', 'Phones\\Number', 'QUERYRECID', 'Phones\\Primary phone number']
+
+#parameters:
+#description: strategy that only maps its report row by row, without map_frame
+#return: mapped record
+class RowPhoneStrategy(mapping_strategy.MappingStrategy):
+
+    def map_row(self, counter, row):
+        return {'Phone': row['Phones\\Number']}
+
+    def make_mapping(self):
+        return list(self.map_rows())
+
+#parameters:
+#description: phones strategy that can not map the row of the Lookup ID 2
+#return: mapped record
+class FailingPhoneStrategy(PhoneStrategy):
+
+    def map_row(self, counter, row):
+        if row['Lookup ID'] == '2':
+            raise ValueError('invalid phone')
+        return super().map_row(counter, row)
+
+#parameters: 
+#description: test class that read the reports of altru in the mapping strategies
+#return: result of the test
+class TestMappingStrategy(unittest.TestCase):
+
+    #parameters: 
+    #description: write a phones report with the given delimiter
+    #return: path of the report
+    def write_report(self, rows, delimiter=';'):
+        with open('test_input.csv', 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f, delimiter=delimiter)
+            writer.writerow(headers)
+            writer.writerows(rows)
+        return 'test_input.csv'
+
+    def tearDown(self):
+        if os.path.exists('test_input.csv'):
+            os.remove('test_input.csv')
+
+    #parameters: 
+    #description: test the delimiter is detected from the header
+    #return: result of the test
+    def test_detect_delimiter(self):
+        self.assertEqual(PhoneStrategy.detect_delimiter('a;b;c\n'), ';')
+        self.assertEqual(PhoneStrategy.detect_delimiter('a,b,c\n'), ',')
+        self.assertEqual(PhoneStrategy.detect_delimiter('a\n'), ';')
+
+    #parameters: 
+    #description: test reports separated by commas are mapped
+    #return: result of the test
+    def test_map_comma_report(self):
+        path = self.write_report([['1', '555', 'q1', 'True']], delimiter=',')
+        result = PhoneStrategy(path).make_mapping()
+        self.assertEqual(result[0]['vnfp__Implementation_External_ID__c'], '1-phone-q1')
+
+    #parameters: 
+    #description: test malformed rows are reported without stopping the mapping
+    #return: result of the test
+    def test_row_errors(self):
+        path = self.write_report([['1', '555', 'q1', 'True'], ['2', '556'], ['3', '557', 'q3', '']])
+        strategy = PhoneStrategy(path)
+        result = strategy.make_mapping()
+        self.assertEqual([r['vnfp__Implementation_External_ID__c'] for r in result], ['1-phone-q1', '3-phone-q3'])
+        self.assertEqual(strategy.row_errors, [(2, 'expected 4 fields')])
+
+    #parameters: 
+    #description: test only the primary phones are updated
+    #return: result of the test
+    def test_phone_update(self):
+        path = self.write_report([['1', '555', 'q1', 'True'], ['3', '557', 'q3', '']])
+        result = PhoneUpdateStrategy(path).make_mapping()
+        self.assertEqual(result, [{'Auctifera__Implementation_External_ID__c': '1', 'Phone': '555'}])
+
+    #parameters: 
+    #description: test a report mapped in a worker returns only its own mappings, not the households of the contacts
+    #return: result of the test
+    def test_map_report(self):
+        path = self.write_report([['1', '555', 'q1', 'True']])
+        mapping = map_report(SalesforceObject.Account, OriginPlatform.Altru, "Veevart Organization Phones Report test", path, ['h1', 'h2'])
+        self.assertEqual(sorted(mapping), ['organizationPhoneMapping', 'organizationUpdatePhoneMapping'])
+
+    #parameters: 
+    #description: test the phones and the update of phones are mapped in one read
+    #return: result of the test
+    def test_fused_mapping(self):
+        path = self.write_report([['1', '555', 'q1', 'True'], ['3', '557', 'q3', '']])
+        strategy = FusedMappingStrategy(path, [PhoneStrategy(path), PhoneUpdateStrategy(path)])
+        phones, updates = strategy.make_mapping()
+        self.assertEqual(len(phones), 2)
+        self.assertEqual(updates, PhoneUpdateStrategy(path).make_mapping())
+
+    #parameters: 
+    #description: test a row that a fused strategy can not map is kept in the mapping of the other strategies
+    #return: result of the test
+    def test_fused_row_error(self):
+        path = self.write_report([['1', '555', 'q1', 'True'], ['2', '556', 'q2', 'True']])
+        failing = FailingPhoneStrategy(path)
+        phones, updates = FusedMappingStrategy(path, [failing, PhoneUpdateStrategy(path)]).make_mapping()
+        self.assertEqual([phone['vnfp__Implementation_External_ID__c'] for phone in phones], ['1-phone-q1'])
+        self.assertEqual(updates, PhoneUpdateStrategy(path).make_mapping())
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(failing.row_errors, [(2, 'invalid phone')])
+
+    #parameters: 
+    #description: test the fused mapping is created in batches of each output
+    #return: result of the test
+    def test_fused_batches(self):
+        path = self.write_report([['1', '555', 'q1', 'True'], ['2', '556', 'q2', ''], ['3', '557', 'q3', '']])
+        strategy = FusedMappingStrategy(path, [PhoneStrategy(path), PhoneUpdateStrategy(path)])
+        batches = list(strategy.iter_output_batches(2))
+        self.assertEqual([(index, len(batch)) for index, batch in batches], [(0, 2), (0, 1), (1, 1)])
+
+    #parameters: 
+    #description: test the cleanup of the report is applied while it is read
+    #return: result of the test
+    def test_cleanup_in_read(self):
+        path = self.write_report([['1', '555', 'q1', 'Yes'], ['2', '556', 'q2', 'No'], ['3', '557', 'q3', 'True']])
+        report_path = 'Veevart Contacts Report Phones test.csv'
+        os.replace(path, report_path)
+        try:
+            rows = [row for _, row in PhoneStrategy(report_path).read_rows()]
+        finally:
+            os.remove(report_path)
+        self.assertEqual([row['Phones\\Primary phone number'] for row in rows], ['True', 'False', 'True'])
+
+    #parameters: 
+    #description: test the garbage collector stays paused until the pauses of every thread end
+    #return: result of the test
+    def test_paused_gc(self):
+        entered, release = threading.Event(), threading.Event()
+
+        def pause():
+            with mapping_strategy.paused_gc():
+                entered.set()
+                release.wait()
+
+        thread = threading.Thread(target=pause)
+        thread.start()
+        entered.wait()
+        with mapping_strategy.paused_gc():
+            release.set()
+            thread.join()
+            self.assertFalse(gc.isenabled())
+        self.assertTrue(gc.isenabled())
+
+    #parameters: 
+    #description: test the columnar engine creates the same mapping and reports the same rows
+    #return: result of the test
+    @unittest.skipIf(mapping_strategy.pandas is None, 'pandas is not installed')
+    def test_columnar_engine(self):
+        path = self.write_report([['1', '555', 'q1', 'True'], [], ['2', '556'], ['3', '557', 'q3', ''], ['4', '558', 'q4', 'True', 'x']])
+        strategies = [PhoneStrategy(path), PhoneUpdateStrategy(path)]
+        expected = [strategy.make_mapping() for strategy in strategies]
+        mapping_strategy.columnar_engine = True
+        try:
+            columnar = [PhoneStrategy(path), PhoneUpdateStrategy(path)]
+            self.assertEqual([strategy.make_mapping() for strategy in columnar], expected)
+            self.assertEqual(columnar[0].row_errors, strategies[0].row_errors)
+            fused = FusedMappingStrategy(path, [PhoneStrategy(path), PhoneUpdateStrategy(path)])
+            self.assertEqual(list(fused.make_mapping()), expected)
+
+            # The strategies without map_frame keep mapping row by row
+            self.assertFalse(RowPhoneStrategy(path).columnar)
+            self.assertEqual(RowPhoneStrategy(path).make_mapping(), [{'Phone': '555'}, {'Phone': '557'}])
+            fused = FusedMappingStrategy(path, [PhoneStrategy(path), RowPhoneStrategy(path)])
+            self.assertEqual(fused.make_mapping()[1], [{'Phone': '555'}, {'Phone': '557'}])
+        finally:
+            mapping_strategy.columnar_engine = False
+
+if __name__ == '__main__':
+    unittest.main()
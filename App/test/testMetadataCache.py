@@ -0,0 +1,84 @@
+import unittest
+import sys
+import shutil
+sys.path.insert(1, '../')
+from models.cache.metadata_cache import MetadataCache
+
+class FakeSalesforce:
+    sf_version = '59.0'
+
+    def __init__(self):
+        self.requests = []
+
+    def restful(self, path, method='GET', json=None):
+        self.requests.append((path, method, json))
+        results = [{'statusCode': 200, 'result': {'done': True, 'records': [
+            {'attributes': {'type': 'RecordType'}, 'Id': '012A', 'DeveloperName': 'organization', 'SobjectType': 'Account'},
+            {'attributes': {'type': 'RecordType'}, 'Id': '012B', 'DeveloperName': 'HH_Account', 'SobjectType': 'Account'},
+            {'attributes': {'type': 'RecordType'}, 'Id': '012C', 'DeveloperName': 'organization', 'SobjectType': 'Opportunity'},
+        ]}}]
+        for request in json['batchRequests'][1:]:
+            sobject = request['url'].split('/')[2]
+            if sobject == 'npsp__Address__c':
+                results.append({'statusCode': 404, 'result': [{'errorCode': 'NOT_FOUND'}]})
+            else:
+                results.append({'statusCode': 200, 'result': {'name': sobject}})
+        return {'hasErrors': True, 'results': results}
+
+#parameters: 
+#description: test class of the cache of the metadata of the orgs
+#return: result of the test
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.sf = FakeSalesforce()
+        self.sobjects = ['Account', 'npsp__Address__c']
+        self.cache = MetadataCache('test_metadata', 3600, self.sobjects)
+
+    def tearDown(self):
+        shutil.rmtree('test_metadata', ignore_errors=True)
+
+    #parameters: 
+    #description: test the record types and the describes are loaded in a single request
+    #return: result of the test
+    def test_single_request(self):
+        self.assertEqual(self.cache.record_type_id(self.sf, 'org1', 'organization', 'Account'), '012A')
+        self.assertEqual(self.cache.record_type_id(self.sf, 'org1', 'HH_Account'), '012B')
+        self.assertEqual(self.cache.describe(self.sf, 'org1', 'Account'), {'name': 'Account'})
+        self.assertIsNone(self.cache.describe(self.sf, 'org1', 'npsp__Address__c'))
+        self.assertEqual(len(self.sf.requests), 1)
+        path, method, body = self.sf.requests[0]
+        self.assertEqual((path, method), ('composite/batch', 'POST'))
+        self.assertEqual(len(body['batchRequests']), 3)
+
+    #parameters: 
+    #description: test the metadata is read from the file of the org by another process
+    #return: result of the test
+    def test_persisted(self):
+        self.cache.load(self.sf, 'org1')
+        other = MetadataCache('test_metadata', 3600, self.sobjects)
+        self.assertEqual(other.record_type_id(self.sf, 'org1', 'organization', 'Account'), '012A')
+        self.assertEqual(len(self.sf.requests), 1)
+
+        # Another org has its own metadata
+        other.load(self.sf, 'org2')
+        self.assertEqual(len(self.sf.requests), 2)
+
+    #parameters: 
+    #description: test the metadata is loaded again once it expires
+    #return: result of the test
+    def test_ttl(self):
+        cache = MetadataCache('test_metadata', 0, self.sobjects)
+        cache.load(self.sf, 'org1')
+        cache.load(self.sf, 'org1')
+        self.assertEqual(len(self.sf.requests), 2)
+
+    #parameters: 
+    #description: test a missing record type is reported
+    #return: result of the test
+    def test_missing_record_type(self):
+        with self.assertRaises(ValueError):
+            self.cache.record_type_id(self.sf, 'org1', 'HH_Account', 'Contact')
+
+if __name__ == '__main__':
+    unittest.main()
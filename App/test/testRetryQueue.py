@@ -0,0 +1,97 @@
+import unittest
+import sys
+import requests
+sys.path.insert(1, '../')
+from models.strategies.retry_queue import RetryQueue, is_retryable, is_transient_exception
+
+def failure(status_code, message=''):
+    return {'success': False, 'created': False, 'id': None, 'errors': [{'statusCode': status_code, 'message': message, 'fields': []}]}
+
+def success(record):
+    return {'success': True, 'created': True, 'id': f'id{record["Ext__c"]}', 'errors': []}
+
+#parameters: 
+#description: test class of the queue of the records to retry
+#return: result of the test
+class TestRetryQueue(unittest.TestCase):
+
+    def setUp(self):
+        self.sleeps = []
+        self.batches = []
+        self.queue = RetryQueue(max_attempts=3, batch_size=4, base_seconds=1, max_seconds=3, sleep=self.sleeps.append)
+
+    #parameters: 
+    #description: test the failures are classified as retryable or permanent
+    #return: result of the test
+    def test_classify(self):
+        self.assertTrue(is_retryable(failure('UNABLE_TO_LOCK_ROW')))
+        self.assertTrue(is_retryable(failure('UNKNOWN_EXCEPTION', 'Request timed out, try again')))
+        self.assertFalse(is_retryable(failure('REQUIRED_FIELD_MISSING', 'Required fields are missing: [Name]')))
+        self.assertFalse(is_retryable(success({'Ext__c': '1'})))
+        self.assertTrue(is_transient_exception(requests.exceptions.ReadTimeout()))
+        self.assertFalse(is_transient_exception(ValueError()))
+
+    #parameters: 
+    #description: test the records are retried in smaller batches with exponential backoff until they succeed
+    #return: result of the test
+    def test_drain(self):
+        attempts = {}
+
+        def upsert(records, batch_size):
+            self.batches.append((len(records), batch_size))
+            results = []
+            for record in records:
+                attempts[record['Ext__c']] = attempts.get(record['Ext__c'], 0) + 1
+                if record['Ext__c'] == 'bad':
+                    results.append(failure('INVALID_FIELD'))
+                elif attempts[record['Ext__c']] < int(record['Ext__c']):
+                    results.append(failure('UNABLE_TO_LOCK_ROW'))
+                else:
+                    results.append(success(record))
+            return results
+
+        for position, ext in enumerate(['1', '2', '2', '3', 'bad', '4']):
+            self.queue.add(position * 10, {'Ext__c': ext}, failure('UNABLE_TO_LOCK_ROW'))
+        retried = dict(self.queue.drain(upsert))
+
+        self.assertEqual(self.sleeps, [1, 2, 3])
+        self.assertEqual(self.batches, [(4, 4), (2, 4), (2, 2), (1, 2), (1, 1), (1, 1)])
+        self.assertEqual(len(self.queue), 0)
+        self.assertTrue(retried[0]['success'])
+        self.assertEqual(retried[40]['errors'][0]['statusCode'], 'INVALID_FIELD')
+        # The record needing 4 attempts runs out of attempts
+        self.assertEqual(retried[50]['errors'][0]['statusCode'], 'UNABLE_TO_LOCK_ROW')
+        self.assertEqual(sum(result['success'] for result in retried.values()), 4)
+
+    #parameters: 
+    #description: test the queue is full at the records of its batches of the first attempt
+    #return: result of the test
+    def test_full(self):
+        queue = RetryQueue(batch_size=4, max_batches=2)
+        for position in range(7):
+            queue.add(position, {'Ext__c': str(position)}, failure('UNABLE_TO_LOCK_ROW'))
+        self.assertFalse(queue.is_full())
+        queue.add(7, {'Ext__c': '7'}, failure('UNABLE_TO_LOCK_ROW'))
+        self.assertTrue(queue.is_full())
+        queue.discard()
+        self.assertFalse(queue.is_full())
+
+    #parameters: 
+    #description: test a request that fails as a whole keeps its records in the queue
+    #return: result of the test
+    def test_failed_request(self):
+        calls = []
+
+        def upsert(records, batch_size):
+            calls.append(len(records))
+            if len(calls) == 1:
+                raise requests.exceptions.ConnectionError('Connection reset by peer')
+            return [success(record) for record in records]
+
+        self.queue.add(0, {'Ext__c': '1'}, failure('REQUEST_FAILED'))
+        retried = self.queue.drain(upsert)
+        self.assertEqual(calls, [1, 1])
+        self.assertTrue(retried[0][1]['success'])
+
+if __name__ == '__main__':
+    unittest.main()
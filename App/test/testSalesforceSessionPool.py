@@ -0,0 +1,101 @@
+import unittest
+import sys
+import os
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+sys.path.insert(1, '../')
+from models.strategies.salesforce_session_pool import SalesforceSessionPool
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+#parameters: 
+#description: test class of the pool of the connections to Salesforce
+#return: result of the test
+class TestSalesforceSessionPool(unittest.TestCase):
+
+    def setUp(self):
+        os.makedirs('test_session_pool', exist_ok=True)
+        self.write('salesforce_instance.txt', 'https://test.my.salesforce.com')
+        self.write('salesforce_token.txt', 'token-1')
+        self.pool = SalesforceSessionPool(2, 'test_session_pool/salesforce_instance.txt', 'test_session_pool/salesforce_token.txt')
+
+    def tearDown(self):
+        shutil.rmtree('test_session_pool', ignore_errors=True)
+
+    def write(self, name, content):
+        with open(os.path.join('test_session_pool', name), 'w') as f:
+            f.write(content)
+
+    #parameters: 
+    #description: test every strategy gets the same client while the token does not change
+    #return: result of the test
+    def test_shared_client(self):
+        client = self.pool.client()
+        self.assertIs(self.pool.client(), client)
+        self.assertEqual(self.pool.instance, 'test.my.salesforce.com')
+        self.assertEqual(self.pool.access_token, 'token-1')
+
+        # The modification time may not change within the resolution of the file system
+        time.sleep(0.01)
+        self.write('salesforce_token.txt', 'token-22')
+        self.assertIsNot(self.pool.client(), client)
+        self.assertEqual(self.pool.access_token, 'token-22')
+        self.assertEqual(self.pool.clients_created, 2)
+
+    #parameters: 
+    #description: test an instance served over plain HTTP is refused unless plain HTTP is allowed
+    #return: result of the test
+    def test_plain_http(self):
+        self.write('salesforce_instance.txt', 'http://127.0.0.1:8765')
+        with self.assertRaises(ValueError):
+            self.pool.client()
+
+        pool = SalesforceSessionPool(2, 'test_session_pool/salesforce_instance.txt', 'test_session_pool/salesforce_token.txt',
+                                     allow_plain_http=True)
+        pool.client()
+        self.assertEqual(pool.instance, 'http://127.0.0.1:8765')
+
+    #parameters: 
+    #description: test the requests of several threads reuse the keep-alive connections
+    #return: result of the test
+    def test_connection_reuse(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f'http://127.0.0.1:{server.server_address[1]}/services/data'
+        session = self.pool.new_session()
+
+        def get():
+            for _ in range(10):
+                session.get(url).raise_for_status()
+
+        try:
+            threads = [threading.Thread(target=get) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        stats = self.pool.stats.snapshot()
+        self.assertEqual(stats['requests'], 20)
+        self.assertLessEqual(stats['connections'], 2)
+        self.assertEqual(stats['reused'], 20 - stats['connections'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,300 @@
+import unittest
+import sys
+import os
+import csv
+import json
+import requests
+sys.path.insert(1, '../')
+from models.strategies import salesforce_strategy
+from models.strategies.salesforce_strategy import Bulk2UpsertSender, BulkUpsertSender
+from models.strategies.concurrency_controller import ConcurrencyController
+from models.strategies.batch_planner import BatchPlanner
+from models.strategies.retry_queue import RetryQueue
+
+#parameters: 
+#description: Bulk API 2.0 of an object that fails the records without name
+#return: results of the jobs
+class FakeBulk2:
+
+    def __init__(self):
+        self.jobs = []
+
+    def upsert(self, csv_file, external_id_field, wait):
+        with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+            self.jobs.append(list(csv.DictReader(f)))
+        job_id = str(len(self.jobs) - 1)
+        return [{'job_id': job_id, 'numberRecordsProcessed': len(self.jobs[-1]), 'numberRecordsFailed': 0}]
+
+    def write(self, job_id, file, columns, rows):
+        with open(file, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns + list(self.jobs[int(job_id)][0]))
+            writer.writerows(rows)
+
+    def get_successful_records(self, job_id, file):
+        rows = [[f'id{row["Ext__c"]}', 'true'] + list(row.values()) for row in self.jobs[int(job_id)] if row['Name']]
+        self.write(job_id, file, ['sf__Id', 'sf__Created'], reversed(rows))
+
+    def get_failed_records(self, job_id, file):
+        rows = [['', 'REQUIRED_FIELD_MISSING:Name is required'] + list(row.values()) for row in self.jobs[int(job_id)] if not row['Name']]
+        self.write(job_id, file, ['sf__Id', 'sf__Error'], rows)
+
+    def get_unprocessed_records(self, job_id, file):
+        self.write(job_id, file, [], [])
+
+#parameters: 
+#description: Bulk API of an object where the parallel batches lock the odd records
+#return: results of the upsert
+class FakeBulk:
+
+    def __init__(self):
+        self.calls = []
+
+    def upsert(self, data, external_id, batch_size, use_serial):
+        self.calls.append((len(data), batch_size, use_serial))
+        lock_error = {'statusCode': 'UNABLE_TO_LOCK_ROW', 'message': 'unable to obtain exclusive access to this record', 'fields': []}
+        return [{'success': False, 'created': False, 'id': None, 'errors': [lock_error]}
+                if not use_serial and int(record['Ext__c']) % 2 else
+                {'success': True, 'created': True, 'id': f'id{record["Ext__c"]}', 'errors': []}
+                for record in data]
+
+#parameters: 
+#description: Bulk API of an object whose first request times out and that cannot process the records without name
+#return: results of the upsert
+class FakeFlakyBulk:
+
+    def __init__(self):
+        self.calls = []
+
+    def upsert(self, data, external_id, batch_size, use_serial):
+        self.calls.append((len(data), batch_size, use_serial))
+        if len(self.calls) == 1:
+            raise requests.exceptions.ReadTimeout('Read timed out')
+        return [{'success': True, 'created': True, 'id': f'id{record["Ext__c"]}', 'errors': []} if record['Name'] else
+                {'success': False, 'created': False, 'id': None, 'errors': [{'statusCode': 'REQUIRED_FIELD_MISSING', 'message': 'Name is required', 'fields': ['Name']}]}
+                for record in data]
+
+#parameters: 
+#description: handler of the objects of a Bulk API
+#return: interface of an object
+class FakeHandler:
+
+    def __init__(self, **objects):
+        self.objects = objects
+
+    def __getattr__(self, name):
+        return self.objects[name]
+
+class FakeSalesforce:
+
+    def __init__(self):
+        self.bulk = FakeHandler(Account=FakeBulk())
+        self.bulk2 = FakeHandler(Account=FakeBulk2())
+        self.queries = []
+        self.collections = []
+
+    def restful(self, path, method, json):
+        self.collections.append((path, method, len(json['records'])))
+        if any(record['Name'] == 'down' for record in json['records']):
+            raise ConnectionError('Connection reset by peer')
+        return [{'id': f'id{record["Ext__c"]}', 'success': True, 'created': False, 'errors': []} if record['Name'] else
+                {'success': False, 'errors': [{'statusCode': 'REQUIRED_FIELD_MISSING', 'message': 'Name is required', 'fields': ['Name']}]}
+                for record in json['records']]
+
+    def query_all(self, query):
+        self.queries.append(query)
+        ids = [contact_id.strip(" '") for contact_id in query.split('IN (')[1].split(')')[0].split(',')]
+        return {'records': [{'Id': contact_id, 'AccountId': f'acc{contact_id}' if contact_id != 'c3' else None,
+                             'Auctifera__Implementation_External_ID__c': f'L{contact_id}'} for contact_id in ids]}
+
+#parameters: 
+#description: pool of the connections that hands out a fake client
+#return: the client
+class FakeSessionPool:
+
+    def __init__(self, sf):
+        self.sf = sf
+        self.instance = 'test.my.salesforce.com'
+        self.access_token = 'token'
+
+    def client(self):
+        return self.sf
+
+#parameters: 
+#description: test class of the upsert of records with the Bulk API 2.0
+#return: result of the test
+class TestSalesforceStrategy(unittest.TestCase):
+
+    def setUp(self):
+        self.sf = FakeSalesforce()
+        self.sender = Bulk2UpsertSender(self.sf, 'Account', 'test', 'bulk2', 'Ext__c')
+        self.sender.log_path = 'test_response.txt'
+        self.job_bytes = salesforce_strategy.bulk2_job_bytes
+        self.collections_max_records = salesforce_strategy.collections_max_records
+        salesforce_strategy.collections_max_records = 0
+
+    def tearDown(self):
+        salesforce_strategy.bulk2_job_bytes = self.job_bytes
+        salesforce_strategy.collections_max_records = self.collections_max_records
+        self.sender.close()
+        if os.path.exists('test_response.txt'):
+            os.remove('test_response.txt')
+
+    #parameters: 
+    #description: test the records are sent as CSV and the results keep the order of the records
+    #return: result of the test
+    def test_upsert(self):
+        data = [
+            {'Ext__c': '1', 'Name': 'First\nline', 'Parent__r': {'Ext__c': 'p1'}, 'Active__c': True},
+            {'Ext__c': '2', 'Name': ''},
+            {'Ext__c': '3', 'Name': 'Third', 'Active__c': False},
+        ]
+        results = self.sender.send(data)
+
+        job = self.sf.bulk2.Account.jobs[0]
+        self.assertEqual(list(job[0]), ['Ext__c', 'Name', 'Parent__r.Ext__c', 'Active__c'])
+        self.assertEqual([row['Active__c'] for row in job], ['true', '', 'false'])
+        self.assertEqual(job[0]['Name'], 'First\nline')
+        self.assertEqual([result['id'] for result in results], ['id1', None, 'id3'])
+        self.assertEqual(results[1]['errors'], [{'statusCode': 'REQUIRED_FIELD_MISSING', 'message': 'Name is required', 'fields': []}])
+
+    #parameters: 
+    #description: test the records are split in jobs by the size of the CSV
+    #return: result of the test
+    def test_split_jobs(self):
+        salesforce_strategy.bulk2_job_bytes = 35
+        data = [{'Ext__c': str(i), 'Name': f'Name {i}'} for i in range(5)]
+        results = self.sender.send(data)
+
+        self.assertEqual([len(job) for job in self.sf.bulk2.Account.jobs], [2, 2, 1])
+        self.assertTrue(all(result['success'] for result in results))
+        self.assertEqual(self.sender.records_sent, 5)
+
+    #parameters: 
+    #description: test the records locked in parallel mode are retried serially and the object switches to serial mode
+    #return: result of the test
+    def test_lock_contention(self):
+        controller = ConcurrencyController(error_rate=0.1, retry_batch_size=2)
+        sender = BulkUpsertSender(self.sf, 'Account', 'test', 'bulk', 'Ext__c', controller)
+        sender.log_path = 'test_response.txt'
+        with sender:
+            results = sender.send([{'Ext__c': str(i)} for i in range(4)])
+            self.assertEqual([result['id'] for result in results], ['id0', 'id1', 'id2', 'id3'])
+            self.assertTrue(controller.use_serial('Account'))
+            sender.send([{'Ext__c': '5'}])
+
+        self.assertEqual(self.sf.bulk.Account.calls, [(4, 2000, False), (2, 2, True), (1, 2000, True)])
+        self.assertEqual(controller.lock_errors['Account'], 2)
+
+    #parameters: 
+    #description: test the batch size respects the size limit of a batch and follows the throughput
+    #return: result of the test
+    def test_batch_planner(self):
+        planner = BatchPlanner(start_records=1000, max_records=10000, max_bytes=1000)
+        self.assertEqual(planner.batch_size('Account', [{'Name': 'x' * 90}, {'Name': 'y'}]), 9)
+        # The largest record measured for the object keeps limiting the next batches
+        self.assertEqual(planner.batch_size('Account', [{'Name': 'y'}]), 9)
+        self.assertEqual(planner.batch_size('Contact', [{'Name': 'y'}] * 10000), 66)
+        data = [{'Name': 'y'}] * 10000
+        data[1] = {'Name': 'x' * 90}
+        self.assertEqual(planner.batch_size('Lead', data), 9)
+
+        planner = BatchPlanner(start_records=1000)
+        data = [{'Name': 'x'}]
+        planner.observe('Account', 4000, 1000, 2.0)
+        self.assertEqual(planner.batch_size('Account', data), 1500)
+        planner.observe('Account', 4000, 1500, 1.0)
+        self.assertEqual(planner.batch_size('Account', data), 2250)
+        planner.observe('Account', 4000, 2250, 4.0)
+        self.assertEqual(planner.batch_size('Account', data), 1500)
+        planner.observe('Account', 100, 1500, 10.0)
+        self.assertEqual(planner.batch_size('Account', data), 1500)
+        self.assertEqual(planner.batch_size('Contact', data), 1000)
+
+    #parameters: 
+    #description: test small batches are upserted with sObject Collections requests of 200 records
+    #return: result of the test
+    def test_collections(self):
+        salesforce_strategy.collections_max_records = 500
+        sender = BulkUpsertSender(self.sf, 'Account', 'test', 'collections', 'Ext__c', ConcurrencyController(), BatchPlanner())
+        sender.log_path = 'test_response.txt'
+        data = [{'Name': f'n{index}' if index % 100 else '', 'Ext__c': str(index)} for index in range(450)]
+        with sender:
+            results = sender.send(data)
+
+        self.assertEqual([call[2] for call in self.sf.collections], [200, 200, 50])
+        self.assertEqual(self.sf.collections[0][:2], ('composite/sobjects/Account/Ext__c', 'PATCH'))
+        self.assertEqual(self.sf.bulk.Account.calls, [])
+        self.assertEqual(results[1], {'success': True, 'created': False, 'id': 'id1', 'errors': []})
+        self.assertEqual(results[100]['errors'][0]['statusCode'], 'REQUIRED_FIELD_MISSING')
+        self.assertIsNone(results[100]['id'])
+        self.assertEqual(sum(result['success'] for result in results), 445)
+
+        # A failed request sends the batch with the Bulk API
+        with sender:
+            results = sender.send([{'Name': 'down', 'Ext__c': '2'}])
+        self.assertEqual(self.sf.bulk.Account.calls, [(1, 2000, False)])
+        self.assertEqual(results[0]['id'], 'id2')
+
+    #parameters: 
+    #description: test the records of a request that timed out are retried and their results merged in the log
+    #return: result of the test
+    def test_retry_queue(self):
+        self.sf.bulk = FakeHandler(Contact=FakeFlakyBulk())
+        strategy = salesforce_strategy.SalesforceStrategy(pool=FakeSessionPool(self.sf))
+        sender = strategy.open_sender('Contact', 'test', 'retry', 'Ext__c')
+        sender.log_path = 'test_response.txt'
+        sender.retries = RetryQueue(batch_size=2, sleep=lambda seconds: None)
+        data = [{'Name': 'a', 'Ext__c': '1'}, {'Name': '', 'Ext__c': '2'}, {'Name': 'c', 'Ext__c': '3'}]
+        with sender:
+            results = sender.send(data)
+            self.assertEqual(results[0]['errors'][0]['statusCode'], 'REQUEST_FAILED')
+            retried = sender.drain_retries()
+
+        self.assertEqual(self.sf.bulk.Contact.calls, [(3, 2000, False), (2, 2, True), (1, 2, True)])
+        self.assertEqual([position for position, _ in retried], [0, 1, 2])
+        self.assertEqual(retried[1][1]['errors'][0]['statusCode'], 'REQUIRED_FIELD_MISSING')
+        with open('test_response.txt') as f:
+            log = [json.loads(line) for line in f]
+        self.assertEqual([result['id'] for result in log], ['id1', None, 'id3'])
+
+    #parameters: 
+    #description: test a full retry queue is drained during the load and its results returned with the last retries
+    #return: result of the test
+    def test_full_retry_queue(self):
+        self.sf.bulk = FakeHandler(Contact=FakeFlakyBulk())
+        strategy = salesforce_strategy.SalesforceStrategy(pool=FakeSessionPool(self.sf))
+        sender = strategy.open_sender('Contact', 'test', 'retry', 'Ext__c')
+        sender.log_path = 'test_response.txt'
+        sender.retries = RetryQueue(batch_size=2, sleep=lambda seconds: None, max_batches=1)
+        with sender:
+            sender.send([{'Name': 'a', 'Ext__c': '1'}, {'Name': 'b', 'Ext__c': '2'}])
+            self.assertEqual(len(sender.retries), 0)
+            with open('test_response.txt') as f:
+                self.assertEqual([json.loads(line)['id'] for line in f], ['id1', 'id2'])
+            sender.send([{'Name': 'c', 'Ext__c': '3'}])
+            retried = sender.drain_retries()
+
+        self.assertEqual(self.sf.bulk.Contact.calls, [(2, 2000, False), (2, 2, True), (1, 2000, False)])
+        self.assertEqual([(position, result['id']) for position, result in retried], [(0, 'id1'), (1, 'id2')])
+        self.assertEqual(sender.drain_retries(), [])
+
+    #parameters: 
+    #description: test the accounts of the upserted contacts are queried by id in chunks
+    #return: result of the test
+    def test_account_lookup(self):
+        strategy = salesforce_strategy.SalesforceStrategy(pool=FakeSessionPool(self.sf))
+        chunk = salesforce_strategy.account_lookup_chunk
+        salesforce_strategy.account_lookup_chunk = 2
+        try:
+            accounts = strategy.get_account_id(['c1', 'c2', 'c3', 'c1', 'c4', 'c5'])
+        finally:
+            salesforce_strategy.account_lookup_chunk = chunk
+
+        self.assertEqual(len(self.sf.queries), 3)
+        self.assertEqual(accounts, {'Lc1': 'accc1', 'Lc2': 'accc2', 'Lc3': '', 'Lc4': 'accc4', 'Lc5': 'accc5'})
+        self.assertEqual(strategy.get_account_id([]), {})
+        self.assertEqual(len(self.sf.queries), 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,112 +1,100 @@
 import csv
-import os
 import json
+import shutil
+import tempfile
+from contextlib import ExitStack
+from itertools import islice
+from typing import Any, Dict, Iterator, List
+
+# Lines of the response log parsed at a time to build a report
+results_chunk_lines = 10000
 
 class ReportProcessor:
     """
-    fix logs of salesforce, generate json files and generate reports of sent data
+    generate reports of sent data from the response logs of salesforce (JSON Lines, a result per line)
 
     Args:
-        txt_path (str): The path to the text file.
-        json_path (str): The path to the JSON file.
-        csv_path (str): The path to the
-        
+        results_path (str): The path to the JSON Lines response log.
+        csv_path (str): The path to the CSV report.
+
     Returns:
         None
     """
-    
-    def __init__(self, txt_path, json_path, csv_path):
-        self.txt_path = txt_path
-        self.json_path = json_path
+
+    def __init__(self, results_path, csv_path):
+        self.results_path = results_path
         self.csv_path = csv_path
 
-    def convert_to_json(self) -> None:
+    def read_results(self) -> Iterator[List[Dict[str, Any]]]:
         """
-        Convert a text file to JSON format by fixing logs from Salesforce and generating a JSON file.
+        Read the results of the response log in chunks of `results_chunk_lines` lines, each chunk is parsed at once.
 
         Args:
             None
 
         Returns:
-            None
+            Iterator[List[Dict[str, Any]]]: The results of the records of each chunk.
         """
-        try:
-            with open(self.txt_path, 'r') as file, open(self.json_path, 'w') as file_json:
-                for line in file:
-                    new_line = line.replace("'", '"').replace("True", 'true').replace("False", 'false').replace("None", 'null')
-                    file_json.write(new_line)
-        except FileNotFoundError as e:
-            print(f"Error: {e}")
-        except IOError as e:
-            print(f"Error: {e}")
-        except Exception as e:
-            print(f"An unexpected error occurred: {e}")
+        with open(self.results_path, 'r', encoding='utf-8') as file:
+            while True:
+                lines = list(islice(file, results_chunk_lines))
+                if not lines:
+                    return
+                yield json.loads('[' + ','.join(line for line in lines if line.strip()) + ']')
 
-    def generate_report_send_data(self, report_name: str) -> None:
+    def generate_report_send_data(self) -> None:
         """
-        Generate a report of submitted data from the JSON file and save it to a CSV file.
+        Generate a report of submitted data from the response log and save it to a CSV file. The
+        log is parsed once, a chunk at a time, and the rows of each section of the report are
+        written to a temporary file until the counts of the section headers are known.
 
         Args:
-            report_name (str): The name of the report.
+            None
 
         Returns:
             None
         """
         try:
-            json_path = os.path.join(os.path.dirname(self.json_path), f"{report_name}.json")
-            with open(json_path) as json_file:
-                data = json.load(json_file)
-                success_true = 0
-                success_false = 0
-                created_true = 0
-                created_false = 0
-                success_ids_true = []
-                success_ids_false = []
-                created_ids_true = []
-                created_ids_false = []
-                errors_list = []
-
-                for item in data:
-                    if item['success']:
-                        success_true += 1
-                        success_ids_true.append(item['id'])
-                    else:
-                        success_false += 1
-                        success_ids_false.append(item['id'])
-                    
-                    if item['created']:
-                        created_true += 1
-                        created_ids_true.append(item['id'])
-                    else:
-                        created_false += 1
-                        created_ids_false.append(item['id'])
-                    
-                    if item['errors']:
-                        for error in item['errors']:
-                            errors_list.append({'id': item['id'], 'error': error})
-
-            csv_file_path = os.path.join(os.path.dirname(self.csv_path), f"{report_name}.csv")
-            
-            with open(csv_file_path, mode='w', newline='') as file:
-                writer = csv.writer(file)
-                
-                writer.writerow(['Operation', 'True', 'False', 'Id', 'Error', 'Message Error'])
-
-                writer.writerow(['Success', success_true, success_false, '', '', ''])
-                for id in success_ids_true:
-                    writer.writerow(['', '', '', id, '', ''])
-                for id in success_ids_false:
-                    writer.writerow(['', '', '', id, '', ''])
-                
-                writer.writerow(['Created', created_true, created_false, '', '', ''])
-                for id in created_ids_true:
-                    writer.writerow(['', '', '', id, '', ''])
-                for id in created_ids_false:
-                    writer.writerow(['', '', '', id, '', ''])
-
-                writer.writerow(['Error', '', '', '', len(errors_list), ''])
-                for error in errors_list:
-                    writer.writerow(['', '', '', error['id'], 1, json.dumps(error['error'])])
+            success_true = 0
+            success_false = 0
+            created_true = 0
+            created_false = 0
+            errors_count = 0
+            sections = ['success_true', 'success_false', 'created_true', 'created_false', 'errors']
+
+            with ExitStack() as stack:
+                files = {section: stack.enter_context(tempfile.TemporaryFile('w+', newline='')) for section in sections}
+                writers = {section: csv.writer(files[section]) for section in sections}
+
+                for results in self.read_results():
+                    rows = {section: [] for section in sections}
+                    for item in results:
+                        row = ['', '', '', item['id'], '', '']
+                        rows['success_true' if item['success'] else 'success_false'].append(row)
+                        rows['created_true' if item['created'] else 'created_false'].append(row)
+                        if item['errors']:
+                            for error in item['errors']:
+                                rows['errors'].append(['', '', '', item['id'], 1, json.dumps(error)])
+                    for section in sections:
+                        writers[section].writerows(rows[section])
+                    success_true += len(rows['success_true'])
+                    success_false += len(rows['success_false'])
+                    created_true += len(rows['created_true'])
+                    created_false += len(rows['created_false'])
+                    errors_count += len(rows['errors'])
+
+                with open(self.csv_path, mode='w', newline='') as file:
+                    writer = csv.writer(file)
+
+                    writer.writerow(['Operation', 'True', 'False', 'Id', 'Error', 'Message Error'])
+                    headers = {'success_true': ['Success', success_true, success_false, '', '', ''],
+                               'created_true': ['Created', created_true, created_false, '', '', ''],
+                               'errors': ['Error', '', '', '', errors_count, '']}
+                    for section in sections:
+                        if section in headers:
+                            writer.writerow(headers[section])
+                        files[section].seek(0)
+                        shutil.copyfileobj(files[section], file)
 
         except FileNotFoundError as e:
             print(f"Error: {e}")
@@ -115,4 +103,4 @@ class ReportProcessor:
         except IOError as e:
             print(f"Error: {e}")
         except Exception as e:
-            print(f"An unexpected error occurred: {e}")
\ No newline at end of file
+            print(f"An unexpected error occurred: {e}")
@@ -17,3 +17,46 @@ python3 testAuthSalesforce.py
 
 # Run the test for the data processor
 python3 testDataProcessor.py
+
+# Run the test for the mapping strategies
+python3 testMappingStrategy.py
+
+# Run the test for the cleanup strategies
+python3 testCleanupStrategy.py
+
+# Run the test for the cache of the cleanup and the mappings
+python3 testFingerprintCache.py
+
+# Run the test for the upsert of records in Salesforce
+python3 testSalesforceStrategy.py
+
+
+# Run the test for the scheduler of the loads
+python3 testLoadScheduler.py
+
+# Run the test for the pipeline between the mapping and the upload
+python3 testMappingPipeline.py
+
+# Run the test for the pool of the connections to Salesforce
+python3 testSalesforceSessionPool.py
+
+# Run the test for the cache of the metadata of Salesforce
+python3 testMetadataCache.py
+
+# Run the test for the retry of the records that failed with retryable errors
+python3 testRetryQueue.py
+
+# Run the test for the checkpoint of the progress of the migration
+python3 testCheckpointStore.py
+
+# Run the test for the local stand-in of the Salesforce APIs
+python3 testFakeSalesforce.py
+
+# Run the test for the synthetic Altru export and the benchmark
+python3 testBenchmark.py
+
+# Run the test for the governor of the API usage
+python3 testApiLimitGovernor.py
+
+# Run the test for the reports of the sent data
+python3 testEventReportData.py
\ No newline at end of file